@@ -8,6 +8,9 @@ __all__ = [
 
 from fastapi_listing.factory import strategy_factory, interceptor_factory
 from fastapi_listing.strategies import QueryStrategy, PaginationStrategy, SortingOrderStrategy
+from fastapi_listing.paginator import HedgedPaginationStrategy, CountCachingPaginationStrategy, \
+    IdHydratingPaginationStrategy, IdSnapshotPaginationStrategy, BoundaryIndexPaginationStrategy, \
+    DatabaseJsonPaginationStrategy
 from fastapi_listing.interceptors import IterativeFilterInterceptor, IndiSorterInterceptor
 from fastapi_listing.service.config import MetaInfo
 from fastapi_listing.service import ListingService, FastapiListing  # noqa: F401
@@ -16,6 +19,12 @@ from fastapi_listing.service import ListingService, FastapiListing  # noqa: F401
 strategy_factory.register_strategy("default_paginator", PaginationStrategy)
 strategy_factory.register_strategy("default_sorter", SortingOrderStrategy)
 strategy_factory.register_strategy("default_query", QueryStrategy)
+strategy_factory.register_strategy("hedged_paginator", HedgedPaginationStrategy)
+strategy_factory.register_strategy("count_cache_paginator", CountCachingPaginationStrategy)
+strategy_factory.register_strategy("id_hydrating_paginator", IdHydratingPaginationStrategy)
+strategy_factory.register_strategy("id_snapshot_paginator", IdSnapshotPaginationStrategy)
+strategy_factory.register_strategy("boundary_index_paginator", BoundaryIndexPaginationStrategy)
+strategy_factory.register_strategy("database_json_paginator", DatabaseJsonPaginationStrategy)
 interceptor_factory.register_interceptor("iterative_filter_interceptor", IterativeFilterInterceptor)
 interceptor_factory.register_interceptor("indi_sorter_interceptor", IndiSorterInterceptor)
 
@@ -5,4 +5,11 @@ from fastapi_listing.abstracts.paginator import AbsPaginatingStrategy
 from fastapi_listing.abstracts.sorter import AbsSortingStrategy
 from fastapi_listing.abstracts.interceptor import AbstractFilterInterceptor, AbstractSorterInterceptor
 from fastapi_listing.abstracts.adapters import AbstractListingFeatureParamsAdapter
+from fastapi_listing.abstracts.replica_policy import AbsReplicaPolicy
+from fastapi_listing.abstracts.cache import AbsCacheBackend
+from fastapi_listing.abstracts.validator import AbsPageValidator
+from fastapi_listing.abstracts.encoder import AbsPageEncoder
+from fastapi_listing.abstracts.row_encoder import AbsRowStreamEncoder
+from fastapi_listing.abstracts.job_store import AbsExportJobStore
+from fastapi_listing.abstracts.enricher import AbsPageEnricher, AbsBatchEnricher
 from fastapi_listing.abstracts.listing import ListingBase, ListingServiceBase
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Dict, Iterable
+
+
+class AbsCacheBackend(ABC):
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def incr(self, key: str, initial: int = 0) -> int:
+        pass
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Found entries of given keys, overwrite with a single round trip (e.g. MGET) for remote stores."""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl=ttl)
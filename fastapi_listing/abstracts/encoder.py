@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class AbsPageEncoder(ABC):
+    vary: Optional[str] = None
+    """Request header(s) picking the representation, sent as Vary with every response of the listing."""
+
+    @abstractmethod
+    def encode(self, listing, page: dict) -> Any:
+        """Return http response carrying given page of a listing, page rows are still raw query rows."""
+        pass
+
+    def representation(self, listing) -> Optional[str]:
+        """Media type encode is going to answer listing's request with, None for a regular json page."""
+        return None
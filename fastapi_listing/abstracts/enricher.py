@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class AbsPageEnricher(ABC):
+
+    @abstractmethod
+    def enrich(self, listing, rows: List[Any], cache: Dict[Any, Any]) -> List[Any]:
+        """
+        Return rows of a page with values of a single batched lookup attached, runs before serialization.
+        cache is shared by all enrichers of a request.
+        """
+        pass
+
+
+class AbsBatchEnricher(AbsPageEnricher):
+
+    @abstractmethod
+    def load(self, listing, keys: List[Any]) -> Dict[Any, Any]:
+        """Return {key: value} for keys of page rows with a single batched lookup."""
+        pass
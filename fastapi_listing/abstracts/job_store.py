@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class AbsExportJobStore(ABC):
+
+    @abstractmethod
+    def save(self, job: Any) -> None:
+        """Create or overwrite state of an export job."""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Any]:
+        """Return state of an export job or None when unknown."""
+        pass
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        pass
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Any
+
+
+class AbsReplicaPolicy(ABC):
+
+    @abstractmethod
+    def choose(self, replicas: Sequence[Any]) -> Any:
+        pass
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Any, List, Tuple
+
+
+class AbsRowStreamEncoder(ABC):
+
+    @abstractmethod
+    def encode_rows(self, rows: List[dict], fields: List[Tuple[str, str, Any]]) -> bytes:
+        """Return a chunk of export rows encoded, rows are dicts keyed by response keys of fields."""
+        pass
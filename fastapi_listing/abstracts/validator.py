@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Any, Optional, Tuple
+
+
+class AbsPageValidator(ABC):
+
+    @abstractmethod
+    def compute(self, listing, listing_meta_info, get_query: Callable[[], Any]) -> Optional[Tuple[str, Any]]:
+        """Return (etag, last modified datetime or None) of the page a listing request is going to produce."""
+        pass
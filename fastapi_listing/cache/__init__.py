@@ -0,0 +1,19 @@
+__all__ = [
+    "InMemoryCacheBackend",
+    "PickledCacheBackend",
+    "ModelGenerations",
+    "model_generations",
+    "ListingResponseCache",
+    "CountCache",
+    "SpaceSaving",
+    "Prewarmer",
+    "RowCache",
+]
+
+from fastapi_listing.cache.backends import InMemoryCacheBackend, PickledCacheBackend
+from fastapi_listing.cache.generations import ModelGenerations, model_generations
+from fastapi_listing.cache.response import ListingResponseCache
+from fastapi_listing.cache.count import CountCache
+from fastapi_listing.cache.hotness import SpaceSaving
+from fastapi_listing.cache.prewarm import Prewarmer
+from fastapi_listing.cache.rows import RowCache
@@ -0,0 +1,95 @@
+__all__ = ["InMemoryCacheBackend", "PickledCacheBackend"]
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from fastapi_listing.abstracts import AbsCacheBackend
+
+
+class InMemoryCacheBackend(AbsCacheBackend):
+    """
+    In-process LRU cache with per entry TTL.
+    Least recently used entries get evicted once max_entries is reached and expired entries are dropped on access.
+    Thread safe, but every worker process has its own copy. Use a shared backend (redis/memcached) by
+    extending AbsCacheBackend when you run multiple workers and need cross worker invalidation.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries should be at least 1")
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._store: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._store)
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl is not None else None
+
+    def _dump(self, value: Any) -> Any:
+        return value
+
+    def _load(self, value: Any) -> Any:
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+        return self._load(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        value = self._dump(value)
+        with self._lock:
+            self._store[key] = (self._expiry(ttl), value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._store.pop(key, None)
+
+    def incr(self, key: str, initial: int = 0) -> int:
+        with self._lock:
+            item = self._store.get(key)
+            if item is None or (item[0] is not None and item[0] <= time.monotonic()):
+                expires_at, value = None, initial
+            else:
+                expires_at, value = item[0], self._load(item[1])
+            value += 1
+            self._store[key] = (expires_at, self._dump(value))
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+class PickledCacheBackend(InMemoryCacheBackend):
+    """
+    Local stand-in for out of process cache stores.
+    Values go through pickle on the way in and out exactly like they would with a network cache,
+    so anything that works with it will work with a remote backend as well and callers never share objects.
+    """
+
+    def _dump(self, value: Any) -> Any:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _load(self, value: Any) -> Any:
+        return pickle.loads(value)
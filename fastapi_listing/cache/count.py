@@ -0,0 +1,56 @@
+__all__ = ["CountCache", "CachedCount"]
+
+import random
+import time
+from typing import Optional, NamedTuple
+
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+
+
+class CachedCount(NamedTuple):
+    count: int
+    computed_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the count was computed."""
+        return max(time.time() - self.computed_at, 0.0)
+
+
+class CountCache:
+    """
+    Cache for total counts, independent of page data.
+
+    Total count for a filter set barely changes second to second, while a user flipping through pages asks
+    for it on every page. Entries keep the time they were computed at so responses can tell how old a count is.
+
+    ttl - seconds a count is reused.
+    jitter - fraction of ttl randomly added or removed per entry so counts cached together don't expire together.
+    max_entries - size limit of the default in-process backend, least recently used counts are evicted first.
+    """
+
+    def __init__(self, backend: Optional[AbsCacheBackend] = None, *, ttl: float = 60.0, jitter: float = 0.1,
+                 max_entries: int = 10_000):
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter should be a fraction of ttl between 0 and 1")
+        self.backend = backend or InMemoryCacheBackend(max_entries=max_entries)
+        self.ttl = ttl
+        self.jitter = jitter
+
+    def entry_ttl(self) -> float:
+        return self.ttl * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def get(self, key: str) -> Optional[CachedCount]:
+        entry = self.backend.get(f"fl:count:{key}")
+        if entry is None:
+            return None
+        return CachedCount(*entry)
+
+    def set(self, key: str, count: int) -> CachedCount:
+        entry = CachedCount(count, time.time())
+        self.backend.set(f"fl:count:{key}", tuple(entry), ttl=self.entry_ttl())
+        return entry
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(f"fl:count:{key}")
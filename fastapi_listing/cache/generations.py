@@ -0,0 +1,61 @@
+__all__ = ["ModelGenerations", "model_generations", "model_key"]
+
+import time
+from typing import Any, Optional, Iterable, List
+
+from fastapi_listing import signals
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+
+
+def model_key(model: Any) -> str:
+    """Name used to track generations of a model, a table or a plain string."""
+    if isinstance(model, str):
+        return model
+    return getattr(model, "__tablename__", None) or getattr(model, "name", None) or model.__name__
+
+
+class ModelGenerations:
+    """
+    Per model generation counters. Every dao write bumps the generation of dao's model,
+    cache entries keep the generation they were computed with in their key so a write makes them unreachable.
+
+    Generations start from a time based seed instead of zero, if a counter gets lost (eviction/restart)
+    it never comes back with a value that old cache entries were built with.
+    """
+
+    def __init__(self, backend: Optional[AbsCacheBackend] = None):
+        self.backend = backend or InMemoryCacheBackend(max_entries=100_000)
+
+    def set_backend(self, backend: AbsCacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(model) -> str:
+        return f"fl:gen:{model_key(model)}"
+
+    def get(self, model) -> int:
+        key = self._key(model)
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = time.time_ns()
+            self.backend.set(key, generation)
+        return generation
+
+    def get_many(self, models: Iterable[Any]) -> List[int]:
+        return [self.get(model) for model in models]
+
+    def bump(self, model) -> int:
+        return self.backend.incr(self._key(model), initial=time.time_ns())
+
+
+model_generations = ModelGenerations()
+
+
+def _bump_on_write(dao):
+    model = getattr(dao, "model", None)
+    if model is not None:
+        model_generations.bump(model)
+
+
+signals.register_write_listener(_bump_on_write)
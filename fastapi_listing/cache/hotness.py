@@ -0,0 +1,67 @@
+__all__ = ["SpaceSaving"]
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-saving top-K frequency tracker (Metwally et al.).
+
+    Monitors at most capacity keys. An unseen key replaces the least frequent monitored key and inherits its count
+    as the error bound, so heavy hitters are always monitored while memory stays bounded no matter how many distinct
+    requests come in. Every monitored key may carry a payload, e.g. what is needed to recompute it.
+
+    decay() scales all counts down so keys that stopped being hot fall out in favour of new ones.
+    """
+
+    def __init__(self, capacity: int = 512):
+        if capacity < 1:
+            raise ValueError("capacity should be at least 1")
+        self.capacity = capacity
+        # key -> [count, error, payload]
+        self._counters: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._counters)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._counters
+
+    def offer(self, key: str, payload_factory: Optional[Callable[[], Any]] = None) -> float:
+        """Count an occurrence of key, payload_factory is only called when key starts being monitored."""
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is not None:
+                counter[0] += 1
+                return counter[0]
+            count, error = 1, 0.0
+            if len(self._counters) >= self.capacity:
+                victim = min(self._counters, key=lambda k: self._counters[k][0])
+                error = self._counters.pop(victim)[0]
+                count += error
+            payload = payload_factory() if payload_factory is not None else None
+            self._counters[key] = [count, error, payload]
+            return count
+
+    def payload(self, key: str) -> Any:
+        counter = self._counters.get(key)
+        return counter[2] if counter is not None else None
+
+    def top(self, k: int) -> List[Tuple[str, float, float]]:
+        """k most frequent keys as (key, count, error), count - error is the guaranteed lower bound."""
+        with self._lock:
+            items = [(key, counter[0], counter[1]) for key, counter in self._counters.items()]
+        items.sort(key=lambda item: item[1], reverse=True)
+        return items[:k]
+
+    def decay(self, factor: float = 0.5, min_count: float = 0.5):
+        """Scale counts by factor and forget keys falling under min_count."""
+        with self._lock:
+            for key in list(self._counters):
+                counter = self._counters[key]
+                counter[0] *= factor
+                counter[1] *= factor
+                if counter[0] < min_count:
+                    del self._counters[key]
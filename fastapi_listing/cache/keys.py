@@ -0,0 +1,52 @@
+__all__ = ["read_client_params", "listing_request_key"]
+
+from typing import Optional, Sequence, Any
+
+from fastapi_listing.cache.generations import model_generations
+from fastapi_listing.utils import canonical_json, fingerprint
+
+
+def read_client_params(listing_meta_info) -> Optional[dict]:
+    """Canonical client params of current listing request, None when params can't be read."""
+    adapter = listing_meta_info.feature_params_adapter
+    try:
+        if hasattr(adapter, "canonical_params"):
+            return adapter.canonical_params(listing_meta_info.default_page_size)
+        filters = adapter.get("filter") or []
+        sorts = adapter.get("sort") or []
+        pagination = adapter.get("pagination") or {"page": 1, "pageSize": listing_meta_info.default_page_size}
+    except Exception:
+        # malformed params, let the listing pipeline report it
+        return None
+    token_keys = getattr(adapter, "request_token_keys", ())
+    pagination = {key: value for key, value in pagination.items() if key not in token_keys}
+    return dict(filter=sorted(filters, key=canonical_json), sort=sorts, pagination=pagination)
+
+
+def listing_request_key(listing, listing_meta_info, *, namespace: Optional[str] = None,
+                        scope_key: str = "cache_scope", depends_on: Sequence[Any] = (),
+                        generations: bool = True) -> Optional[str]:
+    """
+    Hash identifying the page a listing request is going to produce.
+    Built out of listing namespace (or dao class), canonical client params, strategies, fields,
+    user supplied scope read from extra_context[scope_key] and generations of dao model and depends_on models
+    (left out with generations=False to identify a request across writes).
+    None when client params can't be read.
+    """
+    params = read_client_params(listing_meta_info)
+    if params is None:
+        return None
+    dao_cls = type(listing.dao)
+    parts = dict(
+        params,
+        namespace=namespace or f"{dao_cls.__module__}.{dao_cls.__qualname__}",
+        strategies=[type(listing_meta_info.query_strategy).__qualname__,
+                    type(listing_meta_info.paginating_strategy).__qualname__],
+        count=listing_meta_info.fire_count_qry,
+        fields=listing.fields_to_fetch,
+        custom_fields=listing.custom_fields,
+        scope=listing_meta_info.extra_context.get(scope_key),
+    )
+    if generations:
+        parts["generations"] = model_generations.get_many((listing.dao.model,) + tuple(depends_on))
+    return fingerprint(parts)
@@ -0,0 +1,187 @@
+__all__ = ["Prewarmer", "ListingRecipe"]
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, List, Set, Type, Any
+
+from sqlalchemy.orm import Session
+
+from fastapi_listing.cache.hotness import SpaceSaving
+from fastapi_listing.cache.keys import listing_request_key, read_client_params
+from fastapi_listing.middlewares import manager, SessionProvider
+from fastapi_listing.service.adapters import CoreListingParamsAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class _ReplayParamsAdapter(CoreListingParamsAdapter):
+    # serves recipe params as parsed on the captured request, parsing them again would unquote values twice.
+    # they already passed limits of the listing's own params adapter when they got captured
+    max_param_bytes = None
+    max_param_items = None
+    params_key = "listing_recipe_params"
+
+    def __init__(self, request, extra_context):
+        super().__init__(request, extra_context)
+        self.dependency = self.extra_context[self.params_key]
+
+    def parse(self, key: str, raw: Any):
+        return raw
+
+
+class ListingRecipe(NamedTuple):
+    """Everything needed to run a listing request again without the http request."""
+    listing_cls: Type
+    dao_cls: Type
+    fields_to_fetch: List[str]
+    custom_fields: bool
+    meta_data: dict
+    params: dict
+    pydantic_serializer: Optional[Type] = None
+
+    @classmethod
+    def capture(cls, listing, listing_meta_data: dict, listing_meta_info) -> Optional["ListingRecipe"]:
+        """Recipe of a listing request, None when its client params can't be read."""
+        params = read_client_params(listing_meta_info)
+        if params is None:
+            return None
+        extra_context = dict(listing_meta_data["extra_context"])
+        # request body is replayed through parsed params, no need to keep it around
+        extra_context.pop(getattr(listing_meta_info.feature_params_adapter, "body_key", None), None)
+        return cls(type(listing), type(listing.dao), list(listing.fields_to_fetch), listing.custom_fields,
+                   dict(listing_meta_data, extra_context=extra_context), params, listing.pydantic_serializer)
+
+    def build_listing(self, dao):
+        """Listing of the recipe over given dao, without an http request."""
+        return self.listing_cls(None, dao, pydantic_serializer=self.pydantic_serializer,
+                                fields_to_fetch=self.fields_to_fetch, custom_fields=self.custom_fields)
+
+    def build_meta_data(self) -> dict:
+        # parsed client params travel through extra_context, listing never mutates them
+        extra_context = dict(self.meta_data["extra_context"], **{_ReplayParamsAdapter.params_key: self.params})
+        return dict(self.meta_data, feature_params_adapter=_ReplayParamsAdapter, extra_context=extra_context)
+
+
+class Prewarmer:
+    """
+    Keeps the hottest listing requests warm in their ListingResponseCache.
+
+    Canonical listing requests are counted with a space-saving top-K tracker. A background thread periodically
+    re-runs the top_k hottest requests through the regular listing pipeline (same query strategy, filters, sorter and
+    paginator) on its own session and stores fresh pages, so popular pages never go cold.
+    Together with ListingResponseCache(stale_ttl=...) expired pages are served stale while a refresh is scheduled.
+
+    Refreshes run without an http request: query strategies and filters relying on request should fall back to
+    extra_context (it is replayed as it was on the tracked request).
+
+    session_factory - session callable used by refreshes, typically the read replica one.
+    top_k - number of hottest requests kept warm.
+    capacity - number of distinct requests monitored by the tracker.
+    interval - seconds between prewarm rounds, keep it under response cache ttl.
+    min_hits - minimum (decayed) hits for a request to be prewarmed.
+    decay - hit counts are multiplied by it after every round so hotness adapts to traffic.
+
+    prewarmer = Prewarmer(get_replica, top_k=20, interval=10)
+    response_cache = ListingResponseCache(ttl=15, stale_ttl=60, prewarmer=prewarmer)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        prewarmer.start()
+        yield
+        prewarmer.close()
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], *, top_k: int = 20, capacity: int = 512,
+                 interval: float = 10.0, min_hits: float = 2, decay: float = 0.5, max_workers: int = 2):
+        self.session_factory = session_factory
+        self.top_k = top_k
+        self.interval = interval
+        self.min_hits = min_hits
+        self.decay = decay
+        self.tracker = SpaceSaving(capacity)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fastapi-listing-prewarm")
+        self._inflight: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, listing, listing_meta_data: dict, listing_meta_info, namespace: Optional[str] = None,
+              scope_key: str = "cache_scope") -> Optional[str]:
+        """Count a listing request, returns its generation independent hot key."""
+        hot_key = listing_request_key(listing, listing_meta_info, namespace=namespace, scope_key=scope_key,
+                                      generations=False)
+        if hot_key is None:
+            return None
+
+        self.tracker.offer(hot_key, lambda: ListingRecipe.capture(listing, listing_meta_data, listing_meta_info))
+        return hot_key
+
+    def refresh(self, hot_key: str) -> bool:
+        """Schedule a refresh of a tracked request, returns False when nothing got scheduled."""
+        recipe: Optional[ListingRecipe] = self.tracker.payload(hot_key)
+        if recipe is None:
+            return False
+        with self._lock:
+            if hot_key in self._inflight:
+                return False
+            self._inflight.add(hot_key)
+        try:
+            self._executor.submit(self._refresh, hot_key, recipe)
+        except RuntimeError:
+            # closed, application is shutting down
+            with self._lock:
+                self._inflight.discard(hot_key)
+            return False
+        return True
+
+    def is_refreshing(self, hot_key: str) -> bool:
+        return hot_key in self._inflight
+
+    def warm(self, recipe: ListingRecipe) -> Any:
+        with manager(self.session_factory, None, True, True):
+            listing = recipe.build_listing(recipe.dao_cls(read_db=SessionProvider.read_session))
+            return listing.warm_response(recipe.build_meta_data())
+
+    def _refresh(self, hot_key: str, recipe: ListingRecipe):
+        try:
+            self.warm(recipe)
+        except Exception:  # noqa
+            logger.exception("prewarming listing %s failed", recipe.listing_cls.__qualname__)
+        finally:
+            with self._lock:
+                self._inflight.discard(hot_key)
+
+    def run_once(self) -> int:
+        """Single prewarm round, returns number of refreshes scheduled."""
+        scheduled = 0
+        for hot_key, hits, _ in self.tracker.top(self.top_k):
+            if hits >= self.min_hits and self.refresh(hot_key):
+                scheduled += 1
+        self.tracker.decay(self.decay)
+        return scheduled
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:  # noqa
+                logger.exception("prewarm round failed")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="fastapi-listing-prewarmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if self._thread is not None and wait:
+            self._thread.join()
+        self._thread = None
+
+    def close(self, wait: bool = True):
+        """Stop prewarm rounds and shut refresh workers down, call it on application shutdown."""
+        self.stop(wait)
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,102 @@
+__all__ = ["ListingResponseCache"]
+
+import copy
+import time
+from typing import Optional, Sequence, Any, Tuple
+
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+from fastapi_listing.cache.keys import listing_request_key
+from fastapi_listing.ctyping import BasePage
+
+
+class ListingResponseCache:
+    """
+    Caches listing pages around FastapiListing.get_response.
+
+    Cache key is built out of
+    - listing namespace (listing service class or dao class for inline listings),
+    - canonicalized filter, sort and pagination params (filter order doesn't matter),
+    - fields to fetch,
+    - user supplied scope read from extra_context[scope_key] (e.g. tenant or user id for per user listings),
+    - generations of dao model and depends_on models.
+    Every dao write bumps generation of dao's model so pages computed before the write are never served again.
+    Add models used in joins to depends_on so their writes invalidate the listing as well.
+    Generations live in process by default: writes made by other workers or processes don't invalidate pages cached
+    here, even with a shared backend, until model_generations.set_backend(shared_backend) is called on every worker.
+
+    backend - any AbsCacheBackend, defaults to an in-process LRU.
+    ttl - seconds a cached page stays fresh.
+    stale_ttl - seconds an expired page may still be served while prewarmer refreshes it (stale-while-revalidate),
+    needs a prewarmer.
+    prewarmer - Prewarmer tracking hot requests of this cache and keeping them warm.
+    """
+
+    def __init__(self, backend: Optional[AbsCacheBackend] = None, *, ttl: float = 30.0,
+                 namespace: Optional[str] = None, scope_key: str = "cache_scope", depends_on: Sequence[Any] = (),
+                 stale_ttl: float = 0.0, prewarmer=None):
+        if stale_ttl and prewarmer is None:
+            raise ValueError("stale_ttl needs a prewarmer to revalidate stale pages")
+        self.backend = backend or InMemoryCacheBackend(max_entries=1024)
+        self.ttl = ttl
+        self.namespace = namespace
+        self.scope_key = scope_key
+        self.depends_on = tuple(depends_on)
+        self.stale_ttl = stale_ttl
+        self.prewarmer = prewarmer
+
+    def for_listing(self, listing_cls: type) -> "ListingResponseCache":
+        """Same cache (shared backend) namespaced for given listing service class."""
+        if self.namespace:
+            return self
+        bound = copy.copy(self)
+        bound.namespace = f"{listing_cls.__module__}.{listing_cls.__qualname__}"
+        return bound
+
+    def build_key(self, listing, listing_meta_info) -> Optional[str]:
+        key = listing_request_key(listing, listing_meta_info, namespace=self.namespace,
+                                  scope_key=self.scope_key, depends_on=self.depends_on)
+        return f"fl:resp:{key}" if key else None
+
+    def lookup(self, key: str) -> Tuple[Optional[BasePage], bool]:
+        """Cached page and whether it is stale."""
+        entry = self.backend.get(key)
+        if entry is None:
+            return None, False
+        page, fresh_until = entry
+        return page, time.time() > fresh_until
+
+    def get(self, key: str) -> Optional[BasePage]:
+        page, stale = self.lookup(key)
+        return None if stale else page
+
+    @staticmethod
+    def copy_page(page: BasePage) -> BasePage:
+        """Copy of page and its data list, cached pages never share them with callers."""
+        page = dict(page)  # type: ignore
+        if isinstance(page.get("data"), list):
+            page["data"] = list(page["data"])
+        return page
+
+    def set(self, key: str, page: BasePage) -> None:
+        # in-process backends keep objects as they are, caller goes on using its page
+        self.backend.set(key, (self.copy_page(page), time.time() + self.ttl), ttl=self.ttl + self.stale_ttl)
+
+    def fetch(self, listing, listing_meta_data, listing_meta_info) -> Tuple[Optional[str], Optional[BasePage]]:
+        """
+        Cache key and cached page of a listing request, page is None on a miss.
+        Tracks request hotness and serves stale pages while scheduling their refresh when a prewarmer is set.
+        """
+        key = self.build_key(listing, listing_meta_info)
+        if key is None:
+            return None, None
+        hot_key = None
+        if self.prewarmer is not None:
+            hot_key = self.prewarmer.track(listing, listing_meta_data, listing_meta_info,
+                                           namespace=self.namespace, scope_key=self.scope_key)
+        page, stale = self.lookup(key)
+        if page is not None and stale:
+            if hot_key is None or not self.prewarmer.refresh(hot_key) and not self.prewarmer.is_refreshing(hot_key):
+                # nobody is going to revalidate it, treat as a miss
+                return key, None
+        return key, page
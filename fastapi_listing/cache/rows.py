@@ -0,0 +1,27 @@
+__all__ = ["RowCache"]
+
+from typing import Optional, Dict, Any, Iterable
+
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+
+
+class RowCache:
+    """
+    Per model cache of listing rows keyed by primary key.
+    Keys carry model generations, so any dao write of the model makes its cached rows unreachable.
+
+    ttl - seconds a row is reused.
+    max_entries - size limit of the default in-process LRU backend.
+    """
+
+    def __init__(self, backend: Optional[AbsCacheBackend] = None, *, ttl: float = 300.0, max_entries: int = 100_000):
+        self.backend = backend or InMemoryCacheBackend(max_entries=max_entries)
+        self.ttl = ttl
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return self.backend.get_many(keys)
+
+    def set_many(self, rows: Dict[str, Any]) -> None:
+        if rows:
+            self.backend.set_many(rows, ttl=self.ttl)
@@ -0,0 +1,151 @@
+__all__ = ["HttpCachePolicy", "GenerationValidator", "UpdatedAtValidator"]
+
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional, Sequence, Any, Tuple, Dict
+
+from sqlalchemy import func
+from starlette.requests import Request
+from starlette.responses import Response
+
+from fastapi_listing.abstracts import AbsPageValidator
+from fastapi_listing.cache.generations import model_key
+from fastapi_listing.cache.keys import listing_request_key
+from fastapi_listing.ctyping import SqlAlchemyQuery
+from fastapi_listing.utils import fingerprint
+
+
+class GenerationValidator(AbsPageValidator):
+    """
+    Page fingerprint out of canonical client params and generations of dao model and depends_on models.
+    Costs no query at all, every dao write of an involved model changes it.
+    Only writes going through daos (or records_write) are seen, and only by workers sharing generations:
+    with several workers set a shared backend first, model_generations.set_backend(...), otherwise a worker
+    keeps answering 304 for pages another worker has written to.
+    """
+
+    def __init__(self, depends_on: Sequence[Any] = (), scope_key: str = "cache_scope"):
+        self.depends_on = tuple(depends_on)
+        self.scope_key = scope_key
+
+    def compute(self, listing, listing_meta_info, get_query: Callable[[], SqlAlchemyQuery]
+                ) -> Optional[Tuple[str, Optional[datetime.datetime]]]:
+        key = listing_request_key(listing, listing_meta_info, scope_key=self.scope_key, depends_on=self.depends_on)
+        return (key, None) if key else None
+
+
+class UpdatedAtValidator(AbsPageValidator):
+    """
+    Page fingerprint out of canonical client params plus max(updated_at) and count over the filtered set.
+    Costs a single aggregate query (served by an index on the column), sees writes made outside of daos as well.
+    Deletes are caught by the count. Last-Modified is max(updated_at).
+    Dao models without the column fall back to a GenerationValidator fingerprint.
+    """
+
+    def __init__(self, column: str = "updated_at", scope_key: str = "cache_scope"):
+        self.column = column
+        self.scope_key = scope_key
+        self.fallback = GenerationValidator(scope_key=scope_key)
+
+    def compute(self, listing, listing_meta_info, get_query: Callable[[], SqlAlchemyQuery]
+                ) -> Optional[Tuple[str, Optional[datetime.datetime]]]:
+        column = getattr(listing.dao.model, self.column, None)
+        if column is None:
+            return self.fallback.compute(listing, listing_meta_info, get_query)
+        key = listing_request_key(listing, listing_meta_info, scope_key=self.scope_key, generations=False)
+        if key is None:
+            return None
+        last_modified, count = get_query().order_by(None).with_entities(func.max(column), func.count()).one()
+        if isinstance(last_modified, datetime.date) and not isinstance(last_modified, datetime.datetime):
+            last_modified = datetime.datetime.combine(last_modified, datetime.time())
+        return fingerprint([key, str(last_modified), count]), last_modified
+
+
+class HttpCachePolicy:
+    """
+    HTTP conditional requests for listing pages.
+
+    validator computes a cheap fingerprint of the page a request is going to produce. Requests whose
+    If-None-Match (or If-Modified-Since) matches are answered with 304 before the page is fetched or serialized.
+    Other responses get ETag, Last-Modified, Cache-Control and a Surrogate-Key header listing involved tables
+    so shared caches and CDNs can purge pages by table.
+
+    validator - AbsPageValidator, defaults to UpdatedAtValidator() which sees writes of every worker
+    (of dao models having an updated_at column).
+    GenerationValidator saves its query but needs generations shared between workers.
+    cache_control - Cache-Control header value, None to leave it out.
+    surrogate_keys - extra surrogate keys, dao model table is always included.
+    surrogate_key_header - header used to emit surrogate keys, e.g. 'Cache-Tag' for cloudflare.
+    """
+
+    def __init__(self, validator: Optional[AbsPageValidator] = None, *,
+                 cache_control: Optional[str] = "private, no-cache",
+                 surrogate_keys: Sequence[Any] = (), surrogate_key_header: Optional[str] = "Surrogate-Key"):
+        self.validator = validator or UpdatedAtValidator()
+        self.cache_control = cache_control
+        self.surrogate_keys = tuple(surrogate_keys)
+        self.surrogate_key_header = surrogate_key_header
+
+    @staticmethod
+    def http_date(value: datetime.datetime) -> str:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return format_datetime(value.astimezone(datetime.timezone.utc), usegmt=True)
+
+    def headers(self, listing, etag: str, last_modified: Optional[datetime.datetime],
+                vary: Optional[str] = None) -> Dict[str, str]:
+        headers = {"ETag": f'"{etag}"'}
+        if vary:
+            headers["Vary"] = vary
+        if last_modified is not None:
+            headers["Last-Modified"] = self.http_date(last_modified)
+        if self.cache_control:
+            headers["Cache-Control"] = self.cache_control
+        if self.surrogate_key_header:
+            keys = [model_key(listing.dao.model)] + [model_key(key) for key in self.surrogate_keys]
+            headers[self.surrogate_key_header] = " ".join(dict.fromkeys(keys))
+        return headers
+
+    @staticmethod
+    def is_not_modified(request: Optional[Request], etag: str, last_modified: Optional[datetime.datetime]) -> bool:
+        if request is None:
+            return False
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # weak comparison, If-None-Match takes precedence over If-Modified-Since
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag).strip('"') == etag for tag in tags)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+
+    def evaluate(self, listing, listing_meta_info, get_query: Callable[[], SqlAlchemyQuery]) -> Optional[Response]:
+        """
+        304 response when client's copy is still valid, otherwise sets validator headers on listing's response
+        (when given) and returns None.
+        """
+        computed = self.validator.compute(listing, listing_meta_info, get_query)
+        if computed is None:
+            return None
+        etag, last_modified = computed
+        encoder = listing_meta_info.page_encoder
+        representation = encoder.representation(listing) if encoder is not None else None
+        if representation:
+            # columnar and json copies of a page are different entities, they never share an ETag
+            etag = fingerprint([etag, representation])
+        # 304 carries Vary as well, shared caches keep validated representations apart
+        headers = self.headers(listing, etag, last_modified, encoder.vary if encoder is not None else None)
+        if self.is_not_modified(listing.request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+        if listing.response is not None:
+            listing.response.headers.update(headers)
+        return None
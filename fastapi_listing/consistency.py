@@ -0,0 +1,116 @@
+__all__ = ["ReadYourWrites", "consistency_state"]
+
+import base64
+import binascii
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+from fastapi_listing import signals
+
+
+class ConsistencyState:
+    """Mutable per request holder, shared by the middleware and threadpool copies of the request context."""
+
+    def __init__(self, policy: "ReadYourWrites", position: Optional[str] = None):
+        self.policy = policy
+        self.position = position
+        self.written = False
+        # cached routing decision, None means not decided yet
+        self.replica_caught_up: Optional[bool] = None
+
+
+_consistency_state: ContextVar[Optional[ConsistencyState]] = ContextVar("_consistency_state", default=None)
+
+
+def consistency_state() -> Optional[ConsistencyState]:
+    return _consistency_state.get()
+
+
+class ReadYourWrites:
+    """
+    Read-your-writes consistency on top of replica reads.
+
+    Every successful dao write records a position and hands it to the client as a consistency token
+    (response header and cookie). While a client presents a token whose position the replica hasn't caught
+    up with yet, SessionProvider.read_session routes its reads to master. Once the replica catches up reads
+    go back to replica so hit rates stay high.
+
+    Default positions are timestamps and a replica is considered caught up lag_window seconds after the write.
+    Extend and overwrite write_position/replica_caught_up to work with real replication positions
+    e.g. for mysql GTIDs:
+
+        def write_position(self, dao):
+            return dao._write_db.execute(text("SELECT @@GLOBAL.gtid_executed")).scalar()
+
+        def replica_caught_up(self, position, replica_session):
+            return replica_session.execute(text("SELECT GTID_SUBSET(:pos, @@GLOBAL.gtid_executed)"),
+                                           {"pos": position}).scalar() == 1
+
+    and for postgres use pg_current_wal_lsn() on master and compare with pg_last_wal_replay_lsn() on replica.
+
+    app.add_middleware(DaoSessionBinderMiddleware, master=get_db, replica=get_replica,
+                       consistency=ReadYourWrites(lag_window=2))
+    """
+
+    def __init__(self, lag_window: float = 2.0, *, header_name: str = "X-Consistency-Token",
+                 cookie_name: Optional[str] = "fastapi_listing_ct", token_max_age: int = 60):
+        self.lag_window = lag_window
+        self.header_name = header_name
+        self.cookie_name = cookie_name
+        self.token_max_age = token_max_age
+
+    def write_position(self, dao) -> str:
+        """Position of the write just performed by dao on master."""
+        return repr(time.time())
+
+    def replica_caught_up(self, position: str, replica_session: Session) -> bool:
+        """Tells if replica has applied everything up to position."""
+        try:
+            written_at = float(position)
+        except ValueError:
+            return True
+        # a token from the future can't pin a client to master for longer than lag_window
+        return time.time() - min(written_at, time.time()) >= self.lag_window
+
+    @staticmethod
+    def encode_token(position: str) -> str:
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_token(token: str) -> Optional[str]:
+        try:
+            return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    def read_token(self, request: Request) -> Optional[str]:
+        token = request.headers.get(self.header_name)
+        if not token and self.cookie_name:
+            token = request.cookies.get(self.cookie_name)
+        if not token:
+            return None
+        return self.decode_token(token)
+
+    def attach_token(self, response: Response, position: str):
+        token = self.encode_token(position)
+        response.headers[self.header_name] = token
+        if self.cookie_name:
+            response.set_cookie(self.cookie_name, token, max_age=self.token_max_age, httponly=True, samesite="lax")
+
+
+def _record_write(dao):
+    state = _consistency_state.get()
+    if state is None:
+        return
+    state.position = state.policy.write_position(dao)
+    state.written = True
+    # anything read after a write in the same request should see it
+    state.replica_caught_up = False
+
+
+signals.register_write_listener(_record_write)
@@ -7,9 +7,14 @@ __all__ = [
     "BasePage",
     "Page",
     "PageWithoutCount",
+    "PageWithCountAge",
+    "PageWithCountToken",
+    "PageWithSnapshot",
+    "PageWithoutCountWithSnapshot",
+    "PageWithPageToken",
 ]
 
-from typing import TypeVar, List, Dict, Union, Sequence, Generic
+from typing import TypeVar, List, Dict, Union, Sequence, Generic, Optional
 from typing_extensions import TypedDict
 from fastapi import Request
 from abc import ABC
@@ -57,3 +62,23 @@ class PageWithoutCount(BasePage):
     hasNext: bool
     currentPageSize: int
     currentPageNumber: int
+
+
+class PageWithCountAge(Page):
+    countAge: float
+
+
+class PageWithCountToken(Page):
+    countToken: Optional[str]
+
+
+class PageWithSnapshot(Page):
+    snapshot: str
+
+
+class PageWithoutCountWithSnapshot(PageWithoutCount):
+    snapshot: str
+
+
+class PageWithPageToken(Page):
+    pageToken: str
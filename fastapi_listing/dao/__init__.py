@@ -1,7 +1,8 @@
-from .generic_dao import GenericDao
+from .generic_dao import GenericDao, records_write
 from fastapi_listing.dao.dao_registry import dao_factory
 
 __all__ = [
     "GenericDao",
+    "records_write",
     "dao_factory"
 ]
@@ -1,4 +1,4 @@
-from fastapi_listing.middlewares import SessionProvider
+from fastapi_listing.middlewares import SessionProvider, request_dao_registry
 from fastapi_listing.dao import GenericDao
 
 
@@ -13,22 +13,35 @@ class DaoObjectFactory:
             raise ValueError(f"Dao name {key} already in use with {self._dao[key].__name__}!")
         self._dao[key] = builder
 
-    def create(self, key, *, replica=True, master=False, both=False) -> GenericDao:
+    def create(self, key, *, replica=True, master=False, both=False, fresh=False) -> GenericDao:
+        """
+        Within a request context dao objects are cached per request, repeated calls with same key and sessions
+        return the same dao object so any state (identity map, memoized lookups) it carries lives through the request.
+        Pass fresh=True to always build a new object.
+        """
         dao_ = self._dao.get(key)
         if not dao_:
             raise ValueError(key)
 
         if both:
-            dao_obj = dao_(read_db=SessionProvider.read_session, write_db=SessionProvider.session)
+            sessions = dict(read_db=SessionProvider.read_session, write_db=SessionProvider.session)
 
         elif master:
-            dao_obj = dao_(write_db=SessionProvider.session)
+            sessions = dict(write_db=SessionProvider.session)
 
         elif replica:
-            dao_obj = dao_(read_db=SessionProvider.read_session)
+            sessions = dict(read_db=SessionProvider.read_session)
         else:
             raise ValueError("Invalid creation type for dao object allowed types 'replica', 'master', or 'both'")
 
+        registry = request_dao_registry()
+        if registry is None or fresh:
+            return dao_(**sessions)
+        # sessions are part of the key, read-your-writes may swap read session to master mid request
+        registry_key = (key, sessions.get("read_db"), sessions.get("write_db"))
+        dao_obj = registry.get(registry_key)
+        if dao_obj is None:
+            dao_obj = registry[registry_key] = dao_(**sessions)
         return dao_obj
 
 
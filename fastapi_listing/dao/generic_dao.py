@@ -1,7 +1,30 @@
+import functools
+
 from fastapi_listing.abstracts import DaoAbstract
 from sqlalchemy.orm import Session
 
 from fastapi_listing.ctyping import SqlAlchemyModel
+from fastapi_listing.middlewares import is_master_session
+from fastapi_listing import signals
+
+
+def records_write(method):
+    """
+    Decorate dao methods that write to the database so that write listeners
+    (read-your-writes consistency, cache invalidation) learn about it.
+    create, update and delete of GenericDao subclasses are decorated implicitly.
+    """
+    if getattr(method, "__records_write__", False):
+        return method
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        signals.notify_write(self)
+        return result
+
+    wrapper.__records_write__ = True
+    return wrapper
 
 
 # noinspection PyAbstractClass
@@ -26,6 +49,13 @@ class GenericDao(DaoAbstract):
     A naive layer for handling data related ops.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method_name in ("create", "update", "delete"):
+            method = cls.__dict__.get(method_name)
+            if callable(method):
+                setattr(cls, method_name, records_write(method))
+
     def __init__(self, read_db=None, write_db=None):
         """
         if you have a master slave architecture:
@@ -80,3 +110,18 @@ class GenericDao(DaoAbstract):
         fields_to_read can be left or used.
         """
         return self._read_db.query(*fields_to_read)
+
+    def release_read_session(self) -> None:
+        """
+        Give the read session connection back to the pool.
+        Closing a session does not make it unusable, it will check out a new connection
+        if it gets queried again. Already loaded rows and objects stay readable but
+        are detached: reading lazy relationships, deferred columns or expired attributes
+        of returned entities after release raises DetachedInstanceError.
+
+        Read sessions that are shared with the write side (same session object) are never
+        closed here as closing them would roll back pending writes.
+        """
+        if self._read_db is None or self._read_db is self._write_db or is_master_session(self._read_db):
+            return
+        self._read_db.close()
@@ -0,0 +1,17 @@
+__all__ = [
+    "PageEncoder",
+    "RawJson",
+    "FastJsonPageEncoder",
+    "ValidatedPageEncoder",
+    "NdjsonRowEncoder",
+    "CsvRowEncoder",
+    "export_encoders",
+    "ColumnarJsonPageEncoder",
+    "ArrowPageEncoder",
+    "NegotiatingPageEncoder",
+]
+
+from fastapi_listing.encoders.base import PageEncoder, RawJson
+from fastapi_listing.encoders.json_encoders import FastJsonPageEncoder, ValidatedPageEncoder
+from fastapi_listing.encoders.export import NdjsonRowEncoder, CsvRowEncoder, export_encoders
+from fastapi_listing.encoders.columnar import ColumnarJsonPageEncoder, ArrowPageEncoder, NegotiatingPageEncoder
@@ -0,0 +1,93 @@
+__all__ = ["PageEncoder", "RawJson", "HAS_ORJSON", "json_default", "dumps", "splice_page"]
+
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from abc import abstractmethod
+from typing import Any, Optional
+
+from starlette.responses import Response
+
+from fastapi_listing.abstracts import AbsPageEncoder
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+
+class RawJson(bytes):
+    """Page data already encoded to a json array (e.g. by the database), page encoders splice it in as is."""
+
+
+def json_default(value: Any) -> Any:
+    """Json representation of column values json can't encode, same as pydantic's json mode."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact json bytes, encoded with orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=json_default)
+    return json.dumps(obj, separators=(",", ":"), default=json_default, ensure_ascii=False).encode()
+
+
+def splice_page(page: dict, data: bytes) -> bytes:
+    """Json of page envelope with already encoded data array spliced in as is."""
+    envelope = dumps({key: value for key, value in page.items() if key != "data"})
+    return envelope[:-1] + (b',"data":' if len(envelope) > 2 else b'"data":') + data + b"}"
+
+
+class PageEncoder(AbsPageEncoder):
+    """
+    Base of encoders rendering listing pages into a raw response, bypassing response_model serialization.
+    Headers set on FastapiListing's response (e.g. by http_cache) are carried over.
+    Pages carrying RawJson data are passed through without touching rows. Subclasses implement encode_data.
+    """
+
+    media_type: str = "application/json"
+
+    def __init__(self, serializer: Optional[Any] = None):
+        self.serializer = serializer
+
+    def representation(self, listing) -> Optional[str]:
+        return None if self.media_type == "application/json" else self.media_type
+
+    def get_serializer(self, listing) -> Optional[Any]:
+        return self.serializer or getattr(listing, "pydantic_serializer", None)
+
+    @abstractmethod
+    def encode_data(self, listing, rows: list) -> bytes:
+        """Return json array of page rows, rows are still raw query rows."""
+        pass
+
+    def render(self, listing, body: bytes, media_type: Optional[str] = None) -> Response:
+        response = Response(content=body, media_type=media_type or self.media_type)
+        if listing.response is not None:
+            # raw headers keep repeated ones, e.g. a Set-Cookie per cookie
+            carried = [(key, value) for key, value in listing.response.raw_headers if key != b"content-length"]
+            names = {key for key, _ in carried}
+            response.raw_headers = [(key, value) for key, value in response.raw_headers if key not in names] + carried
+        return response
+
+    def encode(self, listing, page: dict) -> Response:
+        data = page["data"]
+        if not isinstance(data, RawJson):
+            data = self.encode_data(listing, data)
+        return self.render(listing, splice_page(page, data))
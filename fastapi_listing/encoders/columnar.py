@@ -0,0 +1,152 @@
+__all__ = ["ColumnarJsonPageEncoder", "ArrowPageEncoder", "NegotiatingPageEncoder", "HAS_PYARROW"]
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.responses import Response
+
+from fastapi_listing.abstracts import AbsPageEncoder
+from fastapi_listing.encoders.base import RawJson, dumps, splice_page, json_default
+from fastapi_listing.encoders.json_encoders import FastJsonPageEncoder
+
+try:
+    import pyarrow
+    import pyarrow.ipc  # noqa
+    HAS_PYARROW = True
+except ImportError:
+    pyarrow = None
+    HAS_PYARROW = False
+
+
+class ColumnarJsonPageEncoder(FastJsonPageEncoder):
+    """
+    Column oriented json page, data is {"columns": [keys...], "values": [[row values...], ...]} so keys are sent
+    once per page instead of once per row. Page metadata (hasNext, totalCount...) stays as is.
+    """
+
+    media_type = "application/vnd.fastapi-listing.columnar+json"
+
+    @staticmethod
+    def row_values(row, fields: List[Tuple[str, str, Any]]) -> list:
+        mapping = getattr(row, "_mapping", None)
+        if mapping is None:
+            return [getattr(row, name, default) for name, _, default in fields]
+        return [mapping.get(name, default) for name, _, default in fields]
+
+    def get_columns(self, listing, data: Any) -> Tuple[List[str], List[list]]:
+        if isinstance(data, RawJson):
+            # page already assembled by the database, reshape its objects
+            rows = json.loads(data)
+            columns = list(rows[0]) if rows else [key for _, key, _ in self.get_fields(listing)]
+            return columns, [[row.get(column) for column in columns] for row in rows]
+        fields = self.get_fields(listing)
+        return [key for _, key, _ in fields], [self.row_values(row, fields) for row in data]
+
+    def encode(self, listing, page: dict) -> Any:
+        columns, values = self.get_columns(listing, page["data"])
+        return self.render(listing, splice_page(page, dumps({"columns": columns, "values": values})))
+
+
+class ArrowPageEncoder(ColumnarJsonPageEncoder):
+    """
+    Page as an Arrow IPC stream holding a single record batch of the projected columns, ready for pandas/polars
+    and arrow based frontends. Page metadata (hasNext, totalCount...) is stored as json in schema metadata under
+    b"fastapi_listing.page". Columns mixing value types arrow can't unify go out as string columns, values json
+    encoded. Needs pyarrow.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    metadata_key = b"fastapi_listing.page"
+
+    def __init__(self, serializer: Optional[Any] = None):
+        if not HAS_PYARROW:
+            raise ImportError("ArrowPageEncoder needs pyarrow, install it with 'pip install fastapi-listing[arrow]'")
+        super().__init__(serializer)
+
+    @staticmethod
+    def column_array(column: list) -> Any:
+        try:
+            return pyarrow.array(column)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            # mixed types, e.g. an untyped json column
+            return pyarrow.array([value if value is None or isinstance(value, str) else
+                                  dumps(value).decode() for value in column], type=pyarrow.string())
+
+    def encode(self, listing, page: dict) -> Any:
+        columns, values = self.get_columns(listing, page["data"])
+        arrays = [self.column_array(list(column)) for column in zip(*values)] if values else \
+            [pyarrow.array([]) for _ in columns]
+        metadata = {self.metadata_key: json.dumps({key: value for key, value in page.items() if key != "data"},
+                                                  default=json_default)}
+        batch = pyarrow.record_batch(arrays, names=columns, metadata=metadata)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return self.render(listing, sink.getvalue().to_pybytes())
+
+
+class NegotiatingPageEncoder(AbsPageEncoder):
+    """
+    Picks a page encoder by request Accept header.
+
+    Arrow (when pyarrow is installed) and columnar json are offered by default, requests not asking for any of
+    them get default encoder's response, or the page as is (serialized by response_model) when default is None.
+    Responses carry Vary: Accept so shared caches keep formats apart.
+
+    page_encoder = NegotiatingPageEncoder(default=FastJsonPageEncoder())
+    """
+
+    vary = "Accept"
+
+    def __init__(self, encoders: Optional[Dict[str, AbsPageEncoder]] = None,
+                 default: Optional[AbsPageEncoder] = None):
+        if encoders is None:
+            encoders = {ColumnarJsonPageEncoder.media_type: ColumnarJsonPageEncoder()}
+            if HAS_PYARROW:
+                encoders[ArrowPageEncoder.media_type] = ArrowPageEncoder()
+        self.encoders = encoders
+        self.default = default
+
+    @staticmethod
+    def parse_accept(accept: str) -> List[str]:
+        """Media types of an Accept header ordered by preference, q=0 ones left out."""
+        ranked = []
+        for position, item in enumerate(accept.split(",")):
+            media_type, *params = [part.strip() for part in item.split(";")]
+            quality = 1.0
+            for param in params:
+                name, _, value = param.partition("=")
+                if name.strip() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if media_type and quality > 0:
+                ranked.append((-quality, position, media_type.lower()))
+        return [media_type for _, _, media_type in sorted(ranked)]
+
+    def representation(self, listing) -> Optional[str]:
+        encoder = self.select(listing.request)
+        return encoder.representation(listing) if encoder is not None else None
+
+    def select(self, request) -> Optional[AbsPageEncoder]:
+        accept = request.headers.get("accept") if request is not None else None
+        for media_type in self.parse_accept(accept or ""):
+            if media_type in self.encoders:
+                return self.encoders[media_type]
+            if media_type in ("application/json", "*/*", "application/*"):
+                break
+        return self.default
+
+    def encode(self, listing, page: dict) -> Any:
+        encoder = self.select(listing.request)
+        if listing.response is not None:
+            listing.response.headers["Vary"] = self.vary
+        if encoder is None:
+            if not isinstance(page.get("data"), RawJson):
+                return page
+            encoder = FastJsonPageEncoder()
+        response = encoder.encode(listing, page)
+        if isinstance(response, Response):
+            response.headers["Vary"] = self.vary
+        return response
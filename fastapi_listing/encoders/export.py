@@ -0,0 +1,130 @@
+__all__ = ["RowStreamEncoder", "NdjsonRowEncoder", "CsvRowEncoder", "export_encoders", "get_export_encoder",
+           "iter_query_rows", "validated_fields", "validated_row_dict"]
+
+import csv
+import datetime
+import io
+from itertools import islice
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Iterable, Union
+
+from sqlalchemy.orm import Session
+
+from fastapi_listing.abstracts import AbsRowStreamEncoder
+from fastapi_listing.ctyping import SqlAlchemyQuery
+from fastapi_listing.encoders.base import dumps
+from fastapi_listing.encoders.json_encoders import FastJsonPageEncoder
+from fastapi_listing.utils import IS_PYDANTIC_V2
+
+
+def iter_query_rows(query: SqlAlchemyQuery, chunk_size: int,
+                    session_factory: Optional[Callable[[], Session]] = None) -> Iterator[Any]:
+    """
+    Rows of query fetched chunk_size at a time over a server side cursor (yield_per enables stream_results).
+    With session_factory rows are read on a session owned by the stream and closed once it ends.
+    """
+    if session_factory is None:
+        yield from query.yield_per(chunk_size)
+        return
+    session = session_factory()
+    try:
+        yield from query.with_session(session).yield_per(chunk_size)
+    finally:
+        session.close()
+
+
+def validated_fields(serializer) -> List[Tuple[str, str, Any]]:
+    """(field name, response key, default) of keys serializer dumps: fields not excluded and computed fields."""
+    if IS_PYDANTIC_V2:
+        fields = [(name, field.serialization_alias or field.alias or name, None)
+                  for name, field in serializer.model_fields.items() if not field.exclude]
+        return fields + [(name, field.alias or name, None) for name, field in serializer.model_computed_fields.items()]
+    return [(name, field.alias or name, None) for name, field in serializer.__fields__.items()
+            if not field.field_info.exclude]
+
+
+def validated_row_dict(serializer) -> Callable[[Any], dict]:
+    """Row to dict validating it through serializer, validators and custom fields are applied like in responses."""
+    if IS_PYDANTIC_V2:
+        return lambda row: serializer.model_validate(row, from_attributes=True).model_dump(by_alias=True)
+    return lambda row: serializer.from_orm(row).dict(by_alias=True)
+
+
+class RowStreamEncoder(AbsRowStreamEncoder):
+    """
+    Encodes an export row stream chunk by chunk, memory stays bound by chunk_size.
+    Subclasses implement encode_rows.
+    """
+
+    media_type: str = "application/octet-stream"
+    extension: str = "bin"
+
+    def header(self, fields: List[Tuple[str, str, Any]]) -> bytes:
+        return b""
+
+    def stream(self, rows: Iterable[Any], fields: List[Tuple[str, str, Any]], chunk_size: int,
+               row_dict: Optional[Callable[[Any], dict]] = None) -> Iterator[bytes]:
+        """Encoded chunks of rows, rows are mapped to response keys with row_dict (plain column reads by default)."""
+        if row_dict is None:
+            def row_dict(row):
+                return FastJsonPageEncoder.row_dict(row, fields)
+        header = self.header(fields)
+        if header:
+            yield header
+        rows = iter(rows)
+        while True:
+            chunk = [row_dict(row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield self.encode_rows(chunk, fields)
+
+
+class NdjsonRowEncoder(RowStreamEncoder):
+    """One json object per line, keys follow serializer aliases."""
+
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode_rows(self, rows: List[dict], fields: List[Tuple[str, str, Any]]) -> bytes:
+        return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+class CsvRowEncoder(RowStreamEncoder):
+    """Csv with a header row of serializer aliases, None is written as an empty value."""
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, dialect: str = "excel"):
+        self.dialect = dialect
+
+    @staticmethod
+    def csv_value(value: Any) -> Any:
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        return value
+
+    def _write(self, rows: List[list]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, dialect=self.dialect).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self, fields: List[Tuple[str, str, Any]]) -> bytes:
+        return self._write([[key for _, key, _ in fields]])
+
+    def encode_rows(self, rows: List[dict], fields: List[Tuple[str, str, Any]]) -> bytes:
+        return self._write([[self.csv_value(row[key]) for _, key, _ in fields] for row in rows])
+
+
+export_encoders = {
+    "ndjson": NdjsonRowEncoder(),
+    "csv": CsvRowEncoder(),
+}
+
+
+def get_export_encoder(export_format: Union[str, RowStreamEncoder]) -> RowStreamEncoder:
+    """Row stream encoder registered for export_format ('ndjson', 'csv'), encoders are passed through as is."""
+    if isinstance(export_format, RowStreamEncoder):
+        return export_format
+    if export_format not in export_encoders:
+        raise ValueError(f"unknown export format {export_format!r}, expected one of {list(export_encoders)}")
+    return export_encoders[export_format]
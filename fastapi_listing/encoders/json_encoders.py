@@ -0,0 +1,80 @@
+__all__ = ["FastJsonPageEncoder", "ValidatedPageEncoder", "serializer_fields"]
+
+from typing import Any, List, Tuple, Optional, Dict
+
+from fastapi_listing.encoders.base import PageEncoder, dumps
+from fastapi_listing.utils import IS_PYDANTIC_V2
+
+_fields_cache: Dict[Any, List[Tuple[str, str, Any]]] = {}
+_adapters_cache: Dict[Any, Any] = {}
+
+
+def serializer_fields(serializer) -> List[Tuple[str, str, Any]]:
+    """(field name, response key, default) of serializer fields, response keys honour aliases like response_model."""
+    if serializer not in _fields_cache:
+        fields = []
+        if IS_PYDANTIC_V2:
+            for name, field in serializer.model_fields.items():
+                default = None if field.is_required() else field.get_default(call_default_factory=True)
+                fields.append((name, field.serialization_alias or field.alias or name, default))
+        else:
+            for name, field in serializer.__fields__.items():
+                fields.append((name, field.alias or name, None if field.required else field.get_default()))
+        _fields_cache[serializer] = fields
+    return _fields_cache[serializer]
+
+
+class FastJsonPageEncoder(PageEncoder):
+    """
+    Renders page rows straight out of Row._mapping into json, no per row pydantic validation at all.
+
+    Response keys and defaults come from a field -> alias map precomputed once per serializer (defaults to the
+    pydantic_serializer given to FastapiListing), rows are encoded with orjson when it is installed.
+    Rows go out as fetched: serializer validators, nested models and computed fields are not applied, use it
+    for serializers mirroring selected columns.
+
+    page_encoder = FastJsonPageEncoder()
+    """
+
+    def get_fields(self, listing) -> List[Tuple[str, str, Any]]:
+        serializer = self.get_serializer(listing)
+        if serializer is not None:
+            return serializer_fields(serializer)
+        return [(name, name, None) for name in listing.fields_to_fetch]
+
+    @staticmethod
+    def row_dict(row, fields: List[Tuple[str, str, Any]]) -> dict:
+        mapping = getattr(row, "_mapping", None)
+        if mapping is None:
+            # orm instances and plain objects
+            return {key: getattr(row, name, default) for name, key, default in fields}
+        return {key: mapping.get(name, default) for name, key, default in fields}
+
+    def encode_data(self, listing, rows: list) -> bytes:
+        fields = self.get_fields(listing)
+        return dumps([self.row_dict(row, fields) for row in rows])
+
+
+class ValidatedPageEncoder(PageEncoder):
+    """
+    Validates the whole page against serializer with a single pydantic v2 TypeAdapter(List[serializer]) call and
+    dumps it to json in pydantic's rust core, instead of validating every row field by field through response_model.
+    Validators, nested models and computed fields are applied as usual.
+
+    page_encoder = ValidatedPageEncoder()
+    """
+
+    def get_adapter(self, serializer):
+        if serializer not in _adapters_cache:
+            from pydantic import TypeAdapter
+            _adapters_cache[serializer] = TypeAdapter(List[serializer])
+        return _adapters_cache[serializer]
+
+    def encode_data(self, listing, rows: list) -> bytes:
+        serializer: Optional[Any] = self.get_serializer(listing)
+        if serializer is None:
+            raise ValueError("ValidatedPageEncoder needs a serializer, pass it or set pydantic_serializer on listing")
+        if not IS_PYDANTIC_V2:
+            return dumps([serializer.from_orm(row).dict(by_alias=True) for row in rows])
+        adapter = self.get_adapter(serializer)
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True), by_alias=True)
@@ -0,0 +1,95 @@
+__all__ = ["EnrichedRow", "BaseBatchEnricher", "BatchEnricher"]
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+from fastapi_listing.abstracts import AbsBatchEnricher
+
+
+class EnrichedRow:
+    """
+    Page row with enriched values attached. Other attributes are read from the wrapped row so serializers (orm
+    mode/from_attributes) and page encoders see enriched values as regular row fields.
+    """
+
+    __slots__ = ("_row", "_values")
+
+    def __init__(self, row: Any, values: Dict[str, Any]):
+        if isinstance(row, EnrichedRow):
+            values = {**row._values, **values}
+            row = row._row
+        self._row = row
+        self._values = values
+
+    def __getattr__(self, name: str) -> Any:
+        if name in EnrichedRow.__slots__:
+            raise AttributeError(name)
+        if name in self._values:
+            return self._values[name]
+        return getattr(self._row, name)
+
+    @property
+    def _mapping(self) -> Dict[str, Any]:
+        # Row._mapping of wrapped row along with enriched values, orm rows don't have one
+        return {**self._row._mapping, **self._values}
+
+    def __reduce__(self):
+        return EnrichedRow, (self._row, self._values)
+
+    def __repr__(self) -> str:
+        return f"EnrichedRow({self._row!r}, {self._values!r})"
+
+
+class BaseBatchEnricher(AbsBatchEnricher):
+    """
+    Attaches values looked up once per page for all key_field values of its rows, e.g. titles of every emp_no
+    on the page with a single IN query instead of one query per row inside serializer validators.
+
+    load(listing, keys) returns {key: value} for page keys, rows get the value as attribute `field`
+    (default for keys load didn't return). Loaded values are kept in request's enrichment cache under name
+    (enricher class by default), enrichers sharing a name don't load the same keys twice.
+    Extend and implement load, or pass a loader callable to BatchEnricher.
+    """
+
+    def __init__(self, key_field: str, field: str, *, default: Any = None, name: Optional[Hashable] = None):
+        self.key_field = key_field
+        self.field = field
+        self.default = default
+        self.name = name if name is not None else type(self)
+
+    def missing_keys(self, rows: Iterable[Any], loaded: Dict[Any, Any]) -> List[Any]:
+        keys = dict.fromkeys(getattr(row, self.key_field, None) for row in rows)
+        return [key for key in keys if key is not None and key not in loaded]
+
+    def enrich(self, listing, rows: List[Any], cache: Dict[Any, Any]) -> List[Any]:
+        loaded = cache.setdefault(self.name, {})
+        missing = self.missing_keys(rows, loaded)
+        if missing:
+            found = self.load(listing, missing)
+            for key in missing:
+                loaded[key] = found.get(key, self.default)
+        return [EnrichedRow(row, {self.field: loaded.get(getattr(row, self.key_field, None), self.default)})
+                for row in rows]
+
+
+class BatchEnricher(BaseBatchEnricher):
+    """
+    Batch enricher looking keys up with loader(listing, keys) -> {key: value}, cached under loader by default
+    so enrichers sharing a loader don't load the same keys twice.
+
+    class EmployeeDao(GenericDao):
+        def get_titles(self, emp_nos) -> dict:
+            return dict(self._read_db.query(Title.emp_no, Title.title).filter(Title.emp_no.in_(emp_nos)))
+
+    MetaInfo(default_srt_on="emp_no",
+             enrichers=[BatchEnricher("emp_no", "title", lambda listing, keys: listing.dao.get_titles(keys))])
+
+    Enriched fields are not model columns, listings need custom_fields=True.
+    """
+
+    def __init__(self, key_field: str, field: str, loader: Callable[[Any, List[Any]], Dict[Any, Any]],
+                 *, default: Any = None, name: Optional[Hashable] = None):
+        super().__init__(key_field, field, default=default, name=name if name is not None else loader)
+        self.loader = loader
+
+    def load(self, listing, keys: List[Any]) -> Dict[Any, Any]:
+        return self.loader(listing, keys)
@@ -0,0 +1,248 @@
+__all__ = ["ExportJob", "ExportJobManager", "InMemoryExportJobStore", "FileExportJobStore"]
+
+import gzip
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from fastapi_listing.abstracts import AbsExportJobStore
+from fastapi_listing.cache.prewarm import ListingRecipe
+from fastapi_listing.encoders.export import RowStreamEncoder, get_export_encoder
+from fastapi_listing.middlewares import manager, SessionProvider
+
+logger = logging.getLogger(__name__)
+
+# job ids are secrets.token_urlsafe values, anything else never reaches the filesystem
+_JOB_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def is_valid_job_id(job_id: str) -> bool:
+    return isinstance(job_id, str) and _JOB_ID.fullmatch(job_id) is not None
+
+
+class ExportJob(NamedTuple):
+    """State of a background export job, status is one of pending, running, done or failed."""
+    job_id: str
+    status: str
+    export_format: str
+    filename: str
+    created_at: float
+    finished_at: Optional[float] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class InMemoryExportJobStore(AbsExportJobStore):
+    """Job state in process memory, for tests and single process deployments."""
+
+    def __init__(self):
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: ExportJob) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self._jobs.get(job_id)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class FileExportJobStore(AbsExportJobStore):
+    """Job state as json files in a directory, shared by processes (and hosts) seeing the same directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        if not is_valid_job_id(job_id):
+            raise ValueError(f"invalid export job id {job_id!r}")
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def save(self, job: ExportJob) -> None:
+        path = self._path(job.job_id)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(job._asdict(), file)
+        os.replace(f"{path}.tmp", path)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        if not is_valid_job_id(job_id):
+            return None
+        try:
+            with open(self._path(job_id)) as file:
+                return ExportJob(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def delete(self, job_id: str) -> None:
+        if not is_valid_job_id(job_id):
+            return
+        try:
+            os.remove(self._path(job_id))
+        except OSError:
+            pass
+
+
+class ExportJobManager:
+    """
+    Background exports of whole listings too large to stream within a load balancer timeout.
+
+    submit captures listing's filters and sort at submission time and returns a job right away, a worker pool
+    runs the regular listing pipeline on its own session and writes encoded rows chunk by chunk into a gzip
+    compressed spool file. Clients poll the job and download the spool file with http Range support so broken
+    downloads resume where they stopped. Job state lives in a pluggable AbsExportJobStore.
+
+    session_factory - session callable used by workers, typically the read replica one.
+    spool_dir - directory keeping spool files, share it between processes along with a FileExportJobStore.
+
+    export_jobs = ExportJobManager(get_replica, spool_dir="/var/spool/exports",
+                                   store=FileExportJobStore("/var/spool/exports/jobs"))
+
+    @app.post("/employees/exports")
+    def submit(request: Request):
+        job = FastapiListing(request, dao, pydantic_serializer=EmployeeListDetails).submit_export(
+            MetaInfo(default_srt_on="emp_no"), export_jobs, "csv")
+        return {"jobId": job.job_id}
+
+    @app.get("/employees/exports/{job_id}")
+    def download(job_id: str, request: Request):
+        return export_jobs.download_response(job_id, request)
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], *, spool_dir: str,
+                 store: Optional[AbsExportJobStore] = None, max_workers: int = 2, chunk_size: int = 5000,
+                 compress_level: int = 6, read_size: int = 64 * 1024):
+        self.session_factory = session_factory
+        self.spool_dir = spool_dir
+        self.store = store or InMemoryExportJobStore()
+        self.chunk_size = chunk_size
+        self.compress_level = compress_level
+        self.read_size = read_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fastapi-listing-export")
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def spool_path(self, job: ExportJob) -> str:
+        return os.path.join(self.spool_dir, f"{job.job_id}.{job.filename}.gz")
+
+    def submit(self, listing, listing_meta_data: dict, listing_meta_info,
+               export_format: Union[str, RowStreamEncoder] = "ndjson") -> ExportJob:
+        encoder = get_export_encoder(export_format)
+        recipe = ListingRecipe.capture(listing, listing_meta_data, listing_meta_info)
+        if recipe is None:
+            raise ValueError("client params of listing request can't be read")
+        job = ExportJob(job_id=secrets.token_urlsafe(16), status="pending",
+                        export_format=export_format if isinstance(export_format, str) else encoder.extension,
+                        filename=f"export.{encoder.extension}", created_at=time.time())
+        self.store.save(job)
+        self._executor.submit(self._run, job, recipe, encoder)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        if not is_valid_job_id(job_id):
+            return None
+        return self.store.get(job_id)
+
+    def _run(self, job: ExportJob, recipe: ListingRecipe, encoder: RowStreamEncoder):
+        self.store.save(job._replace(status="running"))
+        path = self.spool_path(job)
+        try:
+            with manager(self.session_factory, None, True, True):
+                listing = recipe.build_listing(recipe.dao_cls(read_db=SessionProvider.read_session))
+                with gzip.open(f"{path}.tmp", "wb", compresslevel=self.compress_level) as spool:
+                    for chunk in listing.iter_export(recipe.build_meta_data(), encoder, chunk_size=self.chunk_size):
+                        spool.write(chunk)
+            os.replace(f"{path}.tmp", path)
+            self.store.save(job._replace(status="done", finished_at=time.time(), size=os.path.getsize(path)))
+        except Exception as exc:  # noqa
+            logger.exception("export job %s failed", job.job_id)
+            self.store.save(job._replace(status="failed", finished_at=time.time(), error=str(exc)))
+            try:
+                os.remove(f"{path}.tmp")
+            except OSError:
+                pass
+
+    def delete(self, job_id: str) -> None:
+        """Forget a job and remove its spool file."""
+        job = self.get(job_id)
+        if job is not None:
+            try:
+                os.remove(self.spool_path(job))
+            except OSError:
+                pass
+        self.store.delete(job_id)
+
+    @staticmethod
+    def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+        """Inclusive (start, end) of a single byte range header, None for no (or an ignorable) range."""
+        match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header or "")
+        if match is None or match.group(1) == match.group(2) == "":
+            return None
+        if match.group(1) == "":
+            # suffix range, last n bytes
+            return max(size - int(match.group(2)), 0), size - 1
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        return start, end
+
+    def _read(self, path: str, start: int, end: int) -> Iterator[bytes]:
+        with open(path, "rb") as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = file.read(min(self.read_size, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def download_response(self, job_id: str, request: Optional[Request] = None) -> Response:
+        """
+        Spool file of a finished job (gzip compressed export), honours a single byte Range of request.
+        404 for unknown jobs, 409 with job state while the job is not done and 410 with job state once the spool
+        file of a done job is gone (cleaned up spool dir, another host without the shared spool dir).
+        """
+        job = self.get(job_id)
+        if job is None:
+            return Response(status_code=404)
+        if job.status != "done":
+            return Response(json.dumps(job._asdict()), status_code=409, media_type="application/json")
+        path = self.spool_path(job)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            logger.warning("spool file of export job %s is missing", job.job_id)
+            return Response(json.dumps(job._asdict()), status_code=410, media_type="application/json")
+        headers = {"Accept-Ranges": "bytes", "ETag": f'"{job.job_id}"',
+                   "Content-Disposition": f'attachment; filename="{job.filename}.gz"'}
+        byte_range = self.parse_range(request.headers.get("range") if request is not None else None, size)
+        if_range = request.headers.get("if-range") if request is not None else None
+        if byte_range is None or (if_range is not None and if_range != headers["ETag"]):
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(self._read(path, 0, size - 1), media_type="application/gzip", headers=headers)
+        start, end = byte_range
+        if start >= size or start > end:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+        return StreamingResponse(self._read(path, start, end), status_code=206, media_type="application/gzip",
+                                 headers=headers)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -66,3 +66,27 @@ class ListingMetaInfo(Protocol):
     @property
     def fire_count_qry(self) -> bool: # noqa
         pass
+
+    @property
+    def release_read_session(self) -> bool:  # noqa
+        ...
+
+    @property
+    def response_cache(self):  # noqa
+        ...
+
+    @property
+    def single_flight(self):  # noqa
+        ...
+
+    @property
+    def http_cache(self):  # noqa
+        ...
+
+    @property
+    def page_encoder(self):  # noqa
+        ...
+
+    @property
+    def enrichers(self):  # noqa
+        ...
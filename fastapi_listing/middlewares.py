@@ -1,7 +1,7 @@
-__all__ = ['DaoSessionBinderMiddleware']
+__all__ = ['DaoSessionBinderMiddleware', 'is_master_session', 'request_dao_registry']
 
 from contextvars import ContextVar, Token
-from typing import Optional, Callable
+from typing import Optional, Callable, Union, Sequence, Tuple, Dict, Any
 from contextlib import contextmanager
 from warnings import warn
 
@@ -12,31 +12,55 @@ from starlette.responses import Response
 from starlette.types import ASGIApp
 
 from fastapi_listing.errors import MissingSessionError
+from fastapi_listing.replicas import ReplicaSet, Replica
+from fastapi_listing.consistency import ReadYourWrites, ConsistencyState, _consistency_state
 
 _session: ContextVar[Optional[Session]] = ContextVar("_session", default=None)
 
 _replica_session: ContextVar[Optional[Session]] = ContextVar("_replica_session", default=None)
 
+# replica set and the replica that served current request read session
+_replica_route: ContextVar[Optional[Tuple[ReplicaSet, Replica]]] = ContextVar("_replica_route", default=None)
+
+# dao objects created by dao_factory during current request, lives as long as request sessions live
+_dao_registry: ContextVar[Optional[Dict[Any, Any]]] = ContextVar("_dao_registry", default=None)
+
 
 class DaoSessionBinderMiddleware(BaseHTTPMiddleware):
     def __init__(
             self,
             app: ASGIApp, *,
             master: Callable[[], Session] = None,
-            replica: Callable[[], Session] = None,
+            replica: Union[Callable[[], Session], Sequence[Callable[[], Session]], ReplicaSet] = None,
             session_close_implicit: bool = False,
             suppress_warnings: bool = False,
+            consistency: Optional[ReadYourWrites] = None,
     ):
         super().__init__(app)
         self.close_implicit = session_close_implicit
         self.master = master
+        if isinstance(replica, (list, tuple)):
+            # multiple read replicas, balance them round-robin
+            replica = ReplicaSet(replica)
         self.read = replica
         self.suppress_warnings = suppress_warnings
+        self.consistency = consistency
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         # TODO: lazy sessions
-        with manager(self.read, self.master, self.close_implicit, self.suppress_warnings):
-            response = await call_next(request)
+        token_consistency: Optional[Token] = None
+        if self.consistency is not None:
+            token_consistency = _consistency_state.set(
+                ConsistencyState(self.consistency, self.consistency.read_token(request)))
+        try:
+            with manager(self.read, self.master, self.close_implicit, self.suppress_warnings):
+                response = await call_next(request)
+            state = _consistency_state.get()
+            if state is not None and state.written:
+                self.consistency.attach_token(response, state.position)
+        finally:
+            if token_consistency is not None:
+                _consistency_state.reset(token_consistency)
         return response
 
 
@@ -47,6 +71,15 @@ class SessionProviderMeta(type):
         read_replica_session = _replica_session.get()
         if read_replica_session is None:
             raise MissingSessionError
+        master_session = _session.get()
+        state = _consistency_state.get()
+        if (state is not None and state.position and master_session is not None
+                and master_session is not read_replica_session):
+            # read-your-writes, stick to master until replica has caught up with client's last write
+            if state.replica_caught_up is None:
+                state.replica_caught_up = state.policy.replica_caught_up(state.position, read_replica_session)
+            if not state.replica_caught_up:
+                return master_session
         return read_replica_session
 
     @property
@@ -56,18 +89,47 @@ class SessionProviderMeta(type):
             raise MissingSessionError
         return master_session
 
+    @property
+    def replica_set(cls) -> Optional[ReplicaSet]:
+        route = _replica_route.get()
+        return route[0] if route else None
+
+    @property
+    def replica(cls) -> Optional[Replica]:
+        route = _replica_route.get()
+        return route[1] if route else None
+
 
 class SessionProvider(metaclass=SessionProviderMeta):
     pass
 
 
+def is_master_session(session: Optional[Session]) -> bool:
+    """Tells if given session is the master session bound to the current request context."""
+    return session is not None and session is _session.get()
+
+
+def request_dao_registry() -> Optional[Dict[Any, Any]]:
+    """Request scoped dao registry, None when not in a request context."""
+    return _dao_registry.get()
+
+
+def _open_read_session(read_ses: Union[Callable[[], Session], ReplicaSet]) -> Tuple[Session, Optional[Token]]:
+    if isinstance(read_ses, ReplicaSet):
+        replica, sess = read_ses.acquire()
+        return sess, _replica_route.set((read_ses, replica))
+    return read_ses(), None
+
+
 @contextmanager
-def manager(read_ses: Callable[[], Session], master: Callable[[], Session], implicit_close: bool,
+def manager(read_ses: Union[Callable[[], Session], ReplicaSet], master: Callable[[], Session], implicit_close: bool,
             suppress_warnings: bool):
     global _session
     global _replica_session
+    token_route: Optional[Token] = None
     if read_ses and master:
-        token_read_session: Token = _replica_session.set(read_ses())
+        read_session, token_route = _open_read_session(read_ses)
+        token_read_session: Token = _replica_session.set(read_session)
         token_master_session: Token = _session.set(master())
     elif master:
         sess = master()
@@ -77,13 +139,24 @@ def manager(read_ses: Callable[[], Session], master: Callable[[], Session], impl
             warn("Only 'master' session is provided. dao will use master for read executes."
                  "To suppress this warning add 'suppress_warnings=True'")
     elif read_ses:
-        token_read_session: Token = _replica_session.set(read_ses())
+        read_session, token_route = _open_read_session(read_ses)
+        token_read_session: Token = _replica_session.set(read_session)
     else:
         raise ValueError("Error with DaoSessionBinderMiddleware! "
                          "Please provide either args read or master session callables.")
+    token_dao_registry: Token = _dao_registry.set({})
+    error: Optional[BaseException] = None
     try:
         yield
+    except BaseException as e:
+        error = e
+        raise
     finally:
+        _dao_registry.reset(token_dao_registry)
+        if token_route is not None:
+            replica_set, replica = _replica_route.get()
+            replica_set.release(replica, failed=ReplicaSet.is_health_failure(error))
+            _replica_route.reset(token_route)
         if implicit_close:
             if _session.get():
                 _session.get().close()
@@ -1,4 +1,20 @@
-__all__ = ["ListingPage", "BaseListingPage", "PaginationStrategy", "ListingPageWithoutCount"]
+__all__ = ["ListingPage", "BaseListingPage", "PaginationStrategy", "ListingPageWithoutCount", "HedgedPaginationStrategy",
+           "CountCachingPaginationStrategy", "ListingPageWithCountAge",
+           "CountTokenPaginationStrategy", "ListingPageWithCountToken",
+           "IdHydratingPaginationStrategy",
+           "IdSnapshotPaginationStrategy", "ListingPageWithSnapshot", "ListingPageWithoutCountWithSnapshot",
+           "HighWaterMarkPaginationStrategy", "ListingPageWithPageToken",
+           "BoundaryIndexPaginationStrategy", "DatabaseJsonPaginationStrategy"]
 
 from fastapi_listing.paginator.page_builder import PaginationStrategy
-from fastapi_listing.paginator.default_page_format import ListingPage, BaseListingPage, ListingPageWithoutCount
+from fastapi_listing.paginator.hedged import HedgedPaginationStrategy
+from fastapi_listing.paginator.count_cache import CountCachingPaginationStrategy
+from fastapi_listing.paginator.count_token import CountTokenPaginationStrategy
+from fastapi_listing.paginator.hydrating import IdHydratingPaginationStrategy
+from fastapi_listing.paginator.snapshot import IdSnapshotPaginationStrategy
+from fastapi_listing.paginator.high_water_mark import HighWaterMarkPaginationStrategy
+from fastapi_listing.paginator.boundary_index import BoundaryIndexPaginationStrategy
+from fastapi_listing.paginator.database_json import DatabaseJsonPaginationStrategy
+from fastapi_listing.paginator.default_page_format import ListingPage, BaseListingPage, ListingPageWithoutCount, \
+    ListingPageWithCountAge, ListingPageWithCountToken, ListingPageWithSnapshot, ListingPageWithPageToken, \
+    ListingPageWithoutCountWithSnapshot
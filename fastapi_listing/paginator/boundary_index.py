@@ -0,0 +1,129 @@
+__all__ = ["BoundaryIndexPaginationStrategy"]
+
+from typing import Optional, List, Tuple, Sequence, Any, NamedTuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+from fastapi_listing.cache.generations import model_generations
+from fastapi_listing.ctyping import SqlAlchemyQuery, BasePage
+from fastapi_listing.paginator.count_cache import filter_set_key
+from fastapi_listing.paginator.hydrating import IdHydratingPaginationStrategy
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.utils import fingerprint
+
+
+class BoundaryIndex(NamedTuple):
+    """(sort keys..., pk) of every stride-th row of a filtered and sorted listing, plus its total count."""
+    boundaries: List[tuple]
+    count: int
+
+
+class BoundaryIndexPaginationStrategy(PaginationStrategy):
+    """
+    Opt-in paginator keeping random page jumps cheap on huge listings.
+
+    Deep offsets make the database walk and throw away every skipped row. This paginator lazily builds a sparse
+    boundary index per filter and sort combination, recording (sort keys, pk) of every stride-th row with a single
+    window function query, and caches it with a ttl. A page at offset o seeks straight to the nearest boundary
+    b = o // stride with `WHERE (sort keys, pk) >= boundary` and skips at most stride - 1 rows from there.
+    Index carries the total count as well, deep pages cost a single page query while the index lives.
+
+    Primary key is appended to the sort order as a tie breaker so boundaries are unique. Index is keyed by model
+    generation so dao writes rebuild it, other writes show up after index_ttl, add models joined by query strategy
+    to depends_on. Pages before the first stride, mixed sort directions and composite primary keys are paginated
+    the default way.
+
+    register and use:
+    strategy_factory.register_strategy("boundary_index_paginator", BoundaryIndexPaginationStrategy) # registered by default
+    paginate_strategy = "boundary_index_paginator"
+
+    Extend and overwrite stride, index_backend (shared store for multiple workers) and index_ttl to tune it.
+    """
+
+    stride: int = 1000
+    index_backend: AbsCacheBackend = InMemoryCacheBackend(max_entries=256)
+    index_ttl: float = 300.0
+    depends_on: Sequence[Any] = ()
+    scope_key: str = "cache_scope"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index: Optional[BoundaryIndex] = None
+        self.seek_keys: Optional[List[Any]] = None
+        self.descending = False
+
+    @staticmethod
+    def get_seek_keys(query: SqlAlchemyQuery) -> Optional[Tuple[List[Any], bool]]:
+        """Plain columns query is ordered by and their common direction, None when they can't be seeked on."""
+        keys, directions = [], set()
+        for clause in query._order_by_clauses:  # noqa
+            if not isinstance(clause, UnaryExpression) or clause.modifier not in (operators.asc_op,
+                                                                                  operators.desc_op):
+                return None
+            keys.append(clause.element)
+            directions.add(clause.modifier)
+        if not keys or len(directions) != 1:
+            return None
+        return keys, directions.pop() is operators.desc_op
+
+    def get_index_key(self, model) -> Optional[str]:
+        filter_hash = filter_set_key(self.extra_context, self.scope_key)
+        if filter_hash is None:
+            return None
+        return fingerprint([filter_hash, (self.extra_context or {}).get("applied_sorts"), self.stride,
+                            model_generations.get_many((model,) + tuple(self.depends_on))])
+
+    def build_index(self, query: SqlAlchemyQuery) -> BoundaryIndex:
+        order = [key.desc() if self.descending else key.asc() for key in self.seek_keys]
+        columns = [key.label(f"fl_key_{pos}") for pos, key in enumerate(self.seek_keys)]
+        rows = query.limit(None).offset(None).order_by(None).with_entities(
+            *columns,
+            func.row_number().over(order_by=order).label("fl_row"),
+            func.count().over().label("fl_total")).subquery()
+        boundary_query = query.session.query(*[rows.c[column.name] for column in columns], rows.c.fl_total
+                                             ).filter((rows.c.fl_row - 1) % self.stride == 0).order_by(rows.c.fl_row)
+        boundaries = [tuple(row) for row in boundary_query.all()]
+        return BoundaryIndex([row[:-1] for row in boundaries], boundaries[0][-1] if boundaries else 0)
+
+    def load_index(self, query: SqlAlchemyQuery, key: str) -> BoundaryIndex:
+        cache_key = f"fl:boundaries:{key}"
+        index = self.index_backend.get(cache_key)
+        if index is None:
+            index = self.build_index(query)
+            self.index_backend.set(cache_key, index, ttl=self.index_ttl)
+        return index
+
+    def get_count(self, query: SqlAlchemyQuery) -> int:
+        if self.index is not None:
+            return self.index.count
+        return super().get_count(query)
+
+    def page(self, query: SqlAlchemyQuery) -> BasePage:
+        model, pk_attr = IdHydratingPaginationStrategy.get_primary_key(query)
+        seek = self.get_seek_keys(query) if pk_attr is not None else None
+        if seek is not None:
+            self.seek_keys, self.descending = seek
+            pk = getattr(model, pk_attr)
+            if not any(key.compare(pk.expression) for key in self.seek_keys):
+                # unique order, boundaries must identify a single row
+                self.seek_keys.append(pk.expression)
+                query = query.order_by(pk.desc() if self.descending else pk.asc())
+            index_key = self.get_index_key(model)
+            if index_key is not None and (self.page_num - 1) * self.page_size >= self.stride:
+                self.index = self.load_index(query, index_key)
+        return super().page(query)
+
+    def _slice_query(self, query: SqlAlchemyQuery) -> SqlAlchemyQuery:
+        if self.index is None or not self.index.boundaries:
+            return super()._slice_query(query)
+        offset = (self.page_num - 1) * self.page_size
+        position = min(offset // self.stride, len(self.index.boundaries) - 1)
+        boundary = tuple_(*self.seek_keys)
+        query = query.filter(boundary <= self.index.boundaries[position] if self.descending
+                             else boundary >= self.index.boundaries[position])
+        limit = self.page_size if self.fire_count_qry else self.page_size + 1
+        return query.limit(limit).offset(offset - position * self.stride)
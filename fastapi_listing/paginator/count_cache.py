@@ -0,0 +1,62 @@
+__all__ = ["CountCachingPaginationStrategy", "filter_set_key"]
+
+from typing import Optional
+
+from fastapi_listing.cache.count import CountCache
+from fastapi_listing.ctyping import SqlAlchemyQuery, PageWithCountAge
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.utils import canonical_json, fingerprint
+
+
+def filter_set_key(extra_context: Optional[dict], scope_key: str = "cache_scope") -> Optional[str]:
+    """
+    Hash identifying the filtered row set of current listing request, i.e. everything total count depends on:
+    listing (dao and query strategy), normalized filters and the optional scope read from extra_context[scope_key].
+    None when paginator is used outside of listing pipeline and there is nothing reliable to key on.
+    """
+    extra_context = extra_context or {}
+    if "listing_key" not in extra_context:
+        return None
+    filters = sorted(extra_context.get("applied_filters") or [], key=canonical_json)
+    return fingerprint([extra_context["listing_key"], filters, extra_context.get(scope_key)])
+
+
+class CountCachingPaginationStrategy(PaginationStrategy):
+    """
+    Opt-in paginator that reuses total counts while a user pages through the same filter set.
+    Page data is always fetched fresh, only the count query is skipped on a cache hit.
+
+    Counts are keyed by listing (dao and query strategy), normalized filters and the optional scope read from
+    extra_context[scope_key]. Set a scope when query strategy narrows rows per user or tenant.
+    Response carries countAge, seconds since the returned totalCount was computed.
+
+    register and use:
+    strategy_factory.register_strategy("count_cache_paginator", CountCachingPaginationStrategy) # registered by default
+    paginate_strategy = "count_cache_paginator"
+
+    Extend and overwrite count_cache to tune ttl, jitter and size or to use a shared backend.
+    """
+
+    count_cache: CountCache = CountCache()
+    scope_key: str = "cache_scope"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_age = 0.0
+
+    def get_count_key(self) -> Optional[str]:
+        return filter_set_key(self.extra_context, self.scope_key)
+
+    def get_count(self, query: SqlAlchemyQuery) -> int:
+        key = self.get_count_key()
+        if key is None:
+            return super().get_count(query)
+        cached = self.count_cache.get(key)
+        if cached is None:
+            cached = self.count_cache.set(key, super().get_count(query))
+        self.count_age = round(cached.age, 3)
+        return cached.count
+
+    def _get_page(self, *args, **kwargs) -> PageWithCountAge:
+        page = super()._get_page(*args, **kwargs)
+        return PageWithCountAge(**page, countAge=self.count_age)
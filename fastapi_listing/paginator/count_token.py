@@ -0,0 +1,72 @@
+__all__ = ["CountTokenPaginationStrategy"]
+
+import time
+from typing import Optional, Tuple
+
+from fastapi_listing.ctyping import SqlAlchemyQuery, BasePage, PageWithCountToken
+from fastapi_listing.paginator.count_cache import filter_set_key
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.paginator.tokens import SignedTokenMixin
+
+
+class CountTokenPaginationStrategy(SignedTokenMixin, PaginationStrategy):
+    """
+    Opt-in paginator that lets clients carry the total count between pages, no shared server side state needed.
+
+    Pages come with a countToken, an hmac signed (filter hash, count, timestamp). When client sends it back
+    with the next page request {"page": 2, "pageSize": 10, "countToken": "<token>"} and filters are unchanged
+    the count query is skipped. Tokens older than max_age, signed with another secret or issued for different
+    filters are ignored and count is recomputed.
+
+    All workers serving the listing must share the same secret, so it is not registered by default.
+
+    class MyCountTokenPaginator(CountTokenPaginationStrategy):
+        secret = settings.COUNT_TOKEN_SECRET
+        max_age = 300
+
+    strategy_factory.register_strategy("my_count_token_paginator", MyCountTokenPaginator)
+    """
+
+    max_age: float = 300.0
+    scope_key: str = "cache_scope"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received_token: Optional[str] = None
+        self.count_token: Optional[str] = None
+
+    def sign(self, filter_hash: str, count: int, issued_at: int) -> str:
+        return self.sign_payload([filter_hash, count, issued_at])
+
+    def unsign(self, token: str) -> Optional[Tuple[str, int, int]]:
+        """Verified (filter hash, count, issued at) of a token, None for a tampered or malformed token."""
+        payload = self.unsign_payload(token)
+        if payload is None or len(payload) != 3:
+            return None
+        filter_hash, count, issued_at = payload
+        return filter_hash, count, issued_at
+
+    def paginate(self, query: SqlAlchemyQuery, pagination_params: dict, extra_context: dict) -> BasePage:
+        token = pagination_params.get("countToken")
+        self.received_token = token if isinstance(token, str) else None
+        return super().paginate(query, pagination_params, extra_context)
+
+    def get_count(self, query: SqlAlchemyQuery) -> int:
+        filter_hash = filter_set_key(self.extra_context, self.scope_key)
+        if filter_hash is None:
+            return super().get_count(query)
+        if self.received_token:
+            verified = self.unsign(self.received_token)
+            if verified is not None:
+                token_filter_hash, count, issued_at = verified
+                if token_filter_hash == filter_hash and 0 <= time.time() - issued_at <= self.max_age:
+                    # hand back the same token, count can't outlive max_age by getting re-signed
+                    self.count_token = self.received_token
+                    return count
+        count = super().get_count(query)
+        self.count_token = self.sign(filter_hash, count, int(time.time()))
+        return count
+
+    def _get_page(self, *args, **kwargs) -> PageWithCountToken:
+        page = super()._get_page(*args, **kwargs)
+        return PageWithCountToken(**page, countToken=self.count_token)
@@ -0,0 +1,136 @@
+__all__ = ["DatabaseJsonPaginationStrategy"]
+
+from typing import Optional, Any, List, Dict, Tuple
+
+from sqlalchemy import func, cast, literal, null, select, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from fastapi_listing.ctyping import SqlAlchemyQuery, PageWithoutCount
+from fastapi_listing.encoders.base import RawJson
+from fastapi_listing.encoders.json_encoders import serializer_fields
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+
+
+class DatabaseJsonPaginationStrategy(PaginationStrategy):
+    """
+    Opt-in paginator for read-only listings letting the database emit page json itself.
+
+    Every row of the ordered and limited page query becomes a json object built by the database (json_build_object
+    on postgres, JSON_OBJECT on mysql, json_object on sqlite) keyed by serializer aliases, and the database
+    aggregates them into the page array (json_agg, JSON_ARRAYAGG, json_group_array). A single value per page
+    is spliced straight into the response envelope: no orm rows, dicts or per row validation in python.
+    Postgres orders the aggregate by row position explicitly, mysql and sqlite aggregate rows in the order of the
+    limited page subquery. Drop a dialect from json_array_functions to have rows joined in python instead.
+
+    register and use:
+    strategy_factory.register_strategy("database_json_paginator", DatabaseJsonPaginationStrategy) # registered by default
+    paginate_strategy = "database_json_paginator"
+
+    class MyDatabaseJsonPaginator(DatabaseJsonPaginationStrategy):
+        serializer = EmployeeListDetails  # response keys follow its aliases, selected field names otherwise
+
+    Values are rendered by database json functions (booleans, datetime and decimal formats follow the database) and
+    serializer validators are not applied. Listings on other databases are paginated the default way.
+    """
+
+    serializer: Optional[Any] = None
+    json_object_functions: Dict[str, str] = {
+        "postgresql": "json_build_object",
+        "mysql": "json_object",
+        "mariadb": "json_object",
+        "sqlite": "json_object",
+    }
+    json_array_functions: Dict[str, str] = {
+        "postgresql": "json_agg",
+        "mysql": "json_arrayagg",
+        "mariadb": "json_arrayagg",
+        "sqlite": "json_group_array",
+    }
+
+    def get_fields(self) -> List[tuple]:
+        if self.serializer is not None:
+            return serializer_fields(self.serializer)
+        return [(name, name, None) for name in (self.extra_context or {}).get("field_list") or []]
+
+    def row_object(self, query: SqlAlchemyQuery):
+        """Json object expression of a page row, None when database can't build one."""
+        function = self.json_object_functions.get(query.session.get_bind().dialect.name)
+        fields = self.get_fields()
+        if function is None or not fields:
+            return None
+        columns = {column.key: column for column in query.statement.selected_columns}
+        arguments = []
+        for name, key, default in fields:
+            column = columns.get(name)
+            if column is None:
+                column = null() if default is None else literal(default)
+            arguments.extend((literal(key), column))
+        return getattr(func, function)(*arguments)
+
+    def page_json(self, query: SqlAlchemyQuery, page_size: int) -> Optional[Tuple[RawJson, int]]:
+        """
+        Json array of the first page_size rows of the page query aggregated by the database, along with the number
+        of rows the page query returned (it may read one more to tell whether a next page exists).
+        None when database can't aggregate one.
+        """
+        dialect = query.session.get_bind().dialect.name
+        function = self.json_array_functions.get(dialect)
+        row_object = self.row_object(query)
+        if function is None or row_object is None:
+            return None
+        position = func.row_number().over(order_by=query._order_by_clauses)  # noqa
+        rows = query.with_entities(row_object.label("fl_row_json"), position.label("fl_row_pos")).cte("fl_page_rows")
+        page = select(rows.c.fl_row_json, rows.c.fl_row_pos).order_by(rows.c.fl_row_pos).limit(page_size).subquery()
+        element = page.c.fl_row_json
+        if dialect == "sqlite":
+            # json subtype of json_object doesn't survive the subquery, objects would be aggregated as strings
+            element = func.json(element)
+        elif dialect == "postgresql":
+            element = aggregate_order_by(element, page.c.fl_row_pos)
+        fetched = select(func.count()).select_from(rows).scalar_subquery()
+        data, count = query.session.execute(
+            select(cast(getattr(func, function)(element), Text), fetched).select_from(page)).one()
+        # aggregates of no rows are NULL
+        return RawJson((data or "[]").encode()), count
+
+    def fetch_json_rows(self, query: SqlAlchemyQuery) -> Optional[List[str]]:
+        """Json text of every page row, fallback for databases without a json array aggregate."""
+        row_object = self.row_object(query)
+        if row_object is None:
+            return None
+        return [row[0] for row in query.with_entities(cast(row_object, Text).label("fl_row_json")).all()]
+
+    @staticmethod
+    def join_rows(rows: List[str]) -> RawJson:
+        return RawJson(b"[" + ",".join(rows).encode() + b"]")
+
+    def get_data(self, query: SqlAlchemyQuery) -> list:
+        aggregated = self.page_json(query, self.page_size)
+        if aggregated is not None:
+            return aggregated[0]
+        rows = self.fetch_json_rows(query)
+        if rows is None:
+            return super().get_data(query)
+        return self.join_rows(rows)
+
+    def _get_page_without_count(self, *args, **kwargs) -> PageWithoutCount:
+        query = args[0]
+        aggregated = self.page_json(query, self.page_size)
+        if aggregated is not None:
+            data, fetched = aggregated
+            self.set_count(fetched)
+            return PageWithoutCount(
+                hasNext=self.is_next_page_exists(),
+                currentPageSize=self.page_size,
+                currentPageNumber=self.page_num,
+                data=data)
+        rows = self.fetch_json_rows(query)
+        if rows is None:
+            return super()._get_page_without_count(*args, **kwargs)
+        self.set_count(len(rows))
+        has_next = self.is_next_page_exists()
+        return PageWithoutCount(
+            hasNext=has_next,
+            currentPageSize=self.page_size,
+            currentPageNumber=self.page_num,
+            data=self.join_rows(rows[: self.count - 1] if has_next else rows))
@@ -1,4 +1,4 @@
-from typing import Sequence, TypeVar, Generic
+from typing import Sequence, TypeVar, Generic, Optional
 import warnings
 from fastapi_listing.utils import HAS_PYDANTIC, IS_PYDANTIC_V2
 
@@ -33,3 +33,23 @@ class ListingPageWithoutCount(BaseListingPage[T], Generic[T]):
     hasNext: bool = Field(alias="hasNext")
     currentPageSize: int = Field(alias="currentPageSize")
     currentPageNumber: int = Field(alias="currentPageNumber")
+
+
+class ListingPageWithCountAge(ListingPage[T], Generic[T]):
+    countAge: float = Field(alias="countAge")
+
+
+class ListingPageWithCountToken(ListingPage[T], Generic[T]):
+    countToken: Optional[str] = Field(alias="countToken")
+
+
+class ListingPageWithSnapshot(ListingPage[T], Generic[T]):
+    snapshot: str = Field(alias="snapshot")
+
+
+class ListingPageWithoutCountWithSnapshot(ListingPageWithoutCount[T], Generic[T]):
+    snapshot: str = Field(alias="snapshot")
+
+
+class ListingPageWithPageToken(ListingPage[T], Generic[T]):
+    pageToken: str = Field(alias="pageToken")
@@ -0,0 +1,193 @@
+__all__ = ["HedgedPaginationStrategy", "LatencyTracker"]
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError, wait, FIRST_COMPLETED
+from typing import Callable, Optional, Dict, List, Any
+
+from sqlalchemy.orm import Session
+
+from fastapi_listing.consistency import consistency_state
+from fastapi_listing.ctyping import SqlAlchemyQuery
+from fastapi_listing.middlewares import SessionProvider
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.replicas import ReplicaSet, Replica
+
+
+class LatencyTracker:
+    """Rolling window of observed query latencies (seconds) answering percentile lookups."""
+
+    def __init__(self, window: int = 512):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(int(round(pct / 100 * (len(samples) - 1))), len(samples) - 1)
+        return samples[index]
+
+
+class _Attempt:
+    """A single execution of a read statement against one replica."""
+
+    def __init__(self, replica_set: ReplicaSet, replica: Replica, session: Session):
+        self.replica_set = replica_set
+        self.replica = replica
+        self.session = session
+        self.dbapi_connection = None
+        self.cancelled = False
+        self.future: Optional[Future] = None
+        # orders publishing the connection against cancel, one of them always sees the other
+        self._lock = threading.Lock()
+
+    def run(self, query: SqlAlchemyQuery, executor: Callable[[SqlAlchemyQuery], Any], tracker: LatencyTracker):
+        error: Optional[BaseException] = None
+        started = time.monotonic()
+        try:
+            # hold on to raw connection so a losing attempt can be cancelled from another thread
+            dbapi_connection = self.session.connection().connection.dbapi_connection
+            with self._lock:
+                self.dbapi_connection = dbapi_connection
+                cancelled = self.cancelled
+            if cancelled:
+                # lost while checking out the connection, don't send the statement at all
+                raise CancelledError()
+            result = executor(query.with_session(self.session))
+            tracker.record(time.monotonic() - started)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.session.close()
+            # a statement we cancelled ourselves says nothing about replica health
+            self.replica_set.release(self.replica,
+                                     failed=not self.cancelled and ReplicaSet.is_health_failure(error))
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            dbapi_connection = self.dbapi_connection
+        if self.future.cancel():
+            # never started, give back the replica slot we reserved
+            self.session.close()
+            self.replica_set.release(self.replica)
+            return
+        # statement is in flight, drivers like psycopg support cancelling it from another thread.
+        # for the rest result gets discarded and session is closed once it completes.
+        cancel = getattr(dbapi_connection, "cancel", None)
+        if callable(cancel):
+            try:
+                cancel()
+            except Exception:  # noqa
+                pass
+
+
+class HedgedPaginationStrategy(PaginationStrategy):
+    """
+    Opt-in paginator that hedges count and page data queries over read replicas to cut tail latency.
+
+    The read-only statement is sent to one replica, if it hasn't answered within the hedge delay the same
+    statement is sent to a second replica. Whichever answers first wins and the other one is cancelled.
+    The hedge delay follows the observed latency percentile (hedge_percentile) so only the slow tail
+    gets duplicated.
+
+    Replicas come from the ReplicaSet routed by DaoSessionBinderMiddleware or from replica_set class attribute.
+    Without at least two replicas queries run exactly as the default paginator runs them.
+
+    register and use:
+    strategy_factory.register_strategy("hedged_paginator", HedgedPaginationStrategy) # registered by default
+    paginate_strategy = "hedged_paginator"
+
+    Extend and overwrite class attributes to tune it.
+    """
+
+    replica_set: Optional[ReplicaSet] = None
+    hedge_percentile: float = 95.0
+    # delay used until enough latencies are observed to trust the percentile
+    initial_hedge_delay: float = 0.05
+    min_hedge_delay: float = 0.005
+    min_samples: int = 20
+    max_workers: int = 16
+
+    _trackers: Dict[str, LatencyTracker] = {}
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=cls.max_workers,
+                                                       thread_name_prefix="fastapi-listing-hedge")
+        return cls._executor
+
+    @classmethod
+    def get_tracker(cls, kind: str) -> LatencyTracker:
+        key = f"{cls.__qualname__}.{kind}"
+        if key not in cls._trackers:
+            cls._trackers.setdefault(key, LatencyTracker())
+        return cls._trackers[key]
+
+    def get_replica_set(self) -> Optional[ReplicaSet]:
+        return self.replica_set or SessionProvider.replica_set
+
+    def hedge_delay(self, tracker: LatencyTracker) -> float:
+        if len(tracker) < self.min_samples:
+            return self.initial_hedge_delay
+        return max(tracker.percentile(self.hedge_percentile), self.min_hedge_delay)
+
+    def _launch(self, replica_set: ReplicaSet, exclude: List[Replica], query: SqlAlchemyQuery,
+                executor: Callable[[SqlAlchemyQuery], Any], tracker: LatencyTracker) -> _Attempt:
+        replica, session = replica_set.acquire(exclude)
+        attempt = _Attempt(replica_set, replica, session)
+        attempt.future = self.get_executor().submit(attempt.run, query, executor, tracker)
+        return attempt
+
+    def hedge(self, kind: str, query: SqlAlchemyQuery, executor: Callable[[SqlAlchemyQuery], Any]) -> Any:
+        replica_set = self.get_replica_set()
+        if replica_set is None or len(replica_set.replicas) < 2:
+            return executor(query)
+        state = consistency_state()
+        if state is not None and state.replica_caught_up is False:
+            # client reads are pinned to master until replicas catch up with its last write
+            return executor(query)
+        tracker = self.get_tracker(kind)
+        attempts = [self._launch(replica_set, [], query, executor, tracker)]
+        done, _ = wait([attempts[0].future], timeout=self.hedge_delay(tracker))
+        if not done or attempts[0].future.exception() is not None:
+            try:
+                attempts.append(self._launch(replica_set, [attempts[0].replica], query, executor, tracker))
+            except Exception:  # noqa
+                # no second replica could be routed, stick with the first one
+                pass
+        pending = {attempt.future for attempt in attempts}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for attempt in attempts:
+                        if attempt.future is not future and not attempt.future.done():
+                            attempt.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def get_count(self, query: SqlAlchemyQuery) -> int:
+        return self.hedge("count", query, lambda qry: qry.count())
+
+    def get_data(self, query: SqlAlchemyQuery) -> list:
+        return self.hedge("data", query, lambda qry: qry.all())
@@ -0,0 +1,98 @@
+__all__ = ["HighWaterMarkPaginationStrategy"]
+
+import datetime
+import time
+from typing import Optional, Any, Tuple
+
+from sqlalchemy import func, DateTime
+
+from fastapi_listing.ctyping import SqlAlchemyQuery, BasePage, PageWithPageToken
+from fastapi_listing.paginator.count_cache import filter_set_key
+from fastapi_listing.paginator.hydrating import IdHydratingPaginationStrategy
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.paginator.tokens import SignedTokenMixin
+
+
+class HighWaterMarkPaginationStrategy(SignedTokenMixin, PaginationStrategy):
+    """
+    Opt-in paginator freezing the result set of a browsing session at a high-water mark.
+
+    With offset paging over a table receiving inserts users see duplicates and gaps as rows shift between pages.
+    First page records a high-water mark (max primary key, or max of hwm_column e.g. a commit timestamp) in an hmac
+    signed pageToken. Requests sending it back {"page": 2, "pageSize": 10, "pageToken": "<token>"} add
+    `hwm_column <= :hwm` so rows inserted later never shift pages, and reuse the count carried by the token as the
+    frozen set doesn't grow. Tokens older than max_age or issued for other filters start a new session.
+
+    Not registered by default as it needs a secret, extend it and register your own:
+
+    class MyHighWaterMarkPaginator(HighWaterMarkPaginationStrategy):
+        secret = settings.PAGE_TOKEN_SECRET
+        hwm_column = None  # defaults to primary key, must only grow for new rows
+
+    strategy_factory.register_strategy("my_hwm_paginator", MyHighWaterMarkPaginator)
+    paginate_strategy = "my_hwm_paginator"
+
+    Listings over composite primary keys without hwm_column are paginated the default way.
+    """
+
+    hwm_column: Optional[str] = None
+    max_age: float = 3600.0
+    scope_key: str = "cache_scope"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.received_token: Optional[str] = None
+        self.page_token: Optional[str] = None
+        self.frozen_count: Optional[int] = None
+
+    def paginate(self, query: SqlAlchemyQuery, pagination_params: dict, extra_context: dict) -> BasePage:
+        token = pagination_params.get("pageToken")
+        self.received_token = token if isinstance(token, str) else None
+        return super().paginate(query, pagination_params, extra_context)
+
+    def get_hwm_column(self, query: SqlAlchemyQuery):
+        model, pk_attr = IdHydratingPaginationStrategy.get_primary_key(query)
+        attr = self.hwm_column or pk_attr
+        if model is None or attr is None:
+            return None
+        return getattr(model, attr)
+
+    @staticmethod
+    def decode_hwm(column, value: Any) -> Any:
+        if value is not None and isinstance(column.type, DateTime):
+            return datetime.datetime.fromisoformat(value)
+        return value
+
+    def read_token(self, column, filter_hash: str) -> Optional[Tuple[Any, Optional[int], int]]:
+        """(hwm, frozen count, issued at) of a valid token for current filters."""
+        if not self.received_token:
+            return None
+        payload = self.unsign_payload(self.received_token)
+        if payload is None or len(payload) != 4 or payload[0] != filter_hash:
+            return None
+        _, hwm, count, issued_at = payload
+        if not 0 <= time.time() - issued_at <= self.max_age:
+            return None
+        return self.decode_hwm(column, hwm), count, issued_at
+
+    def get_count(self, query: SqlAlchemyQuery) -> int:
+        if self.frozen_count is None:
+            self.frozen_count = super().get_count(query)
+        return self.frozen_count
+
+    def page(self, query: SqlAlchemyQuery) -> BasePage:
+        column = self.get_hwm_column(query)
+        filter_hash = filter_set_key(self.extra_context, self.scope_key)
+        if column is None or filter_hash is None:
+            return super().page(query)
+        state = self.read_token(column, filter_hash)
+        if state is None:
+            # new browsing session, highest key of the table is cheap to find through its index
+            hwm, issued_at = query.session.query(func.max(column)).scalar(), int(time.time())
+        else:
+            hwm, self.frozen_count, issued_at = state
+        if hwm is not None:
+            query = query.filter(column <= hwm)
+        page = super().page(query)
+        self.page_token = self.sign_payload([filter_hash, hwm, self.frozen_count, issued_at])
+        return PageWithPageToken(**page, pageToken=self.page_token)
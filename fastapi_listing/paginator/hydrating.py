@@ -0,0 +1,122 @@
+__all__ = ["IdHydratingPaginationStrategy"]
+
+from typing import Optional, Tuple, Sequence, Any, List, Callable, Dict
+
+from sqlalchemy import inspect
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from fastapi_listing.cache.generations import model_generations, model_key
+from fastapi_listing.cache.rows import RowCache
+from fastapi_listing.ctyping import SqlAlchemyQuery, SqlAlchemyModel
+from fastapi_listing.paginator.page_builder import PaginationStrategy
+from fastapi_listing.utils import fingerprint
+
+
+class IdHydratingPaginationStrategy(PaginationStrategy):
+    """
+    Opt-in paginator for listings over mostly static rows where transferring and building full rows costs more
+    than finding which rows are on the page.
+
+    Page query selects primary keys only, rows are hydrated from a per model row cache and the misses are loaded
+    with a single IN query, then reassembled in page order. Cached rows are keyed by model generation so dao writes
+    invalidate them, add models joined by query strategy to depends_on so their writes invalidate rows as well.
+    Hydrated rows are shaped like the listing's own rows (orm instances for entity queries, the selected columns
+    otherwise). Orm instances are cached as plain column values and merged into the requesting session on a hit,
+    never shared between sessions.
+
+    register and use:
+    strategy_factory.register_strategy("id_hydrating_paginator", IdHydratingPaginationStrategy) # registered by default
+    paginate_strategy = "id_hydrating_paginator"
+
+    Extend and overwrite row_cache/depends_on to tune it. Listings over composite primary keys are paginated
+    the default way.
+    """
+
+    row_cache: RowCache = RowCache()
+    depends_on: Sequence[Any] = ()
+
+    @staticmethod
+    def get_primary_key(query: SqlAlchemyQuery) -> Tuple[Optional[SqlAlchemyModel], Optional[str]]:
+        """Primary model of query and attribute name of its single column primary key."""
+        entity = query.column_descriptions[0].get("entity") if query.column_descriptions else None
+        if entity is None:
+            return None, None
+        mapper = inspect(entity)
+        if len(mapper.primary_key) != 1:
+            return entity, None
+        return entity, mapper.get_property_by_column(mapper.primary_key[0]).key
+
+    def row_keys(self, query: SqlAlchemyQuery, model: SqlAlchemyModel, ids: List[Any]) -> List[str]:
+        # rows of different select lists must not mix
+        shape = fingerprint([[str(column) for column in query.statement.selected_columns],
+                             model_generations.get_many((model,) + tuple(self.depends_on))])
+        return [f"fl:row:{model_key(model)}:{shape}:{pk}" for pk in ids]
+
+    @staticmethod
+    def is_entity_query(query: SqlAlchemyQuery, model: SqlAlchemyModel) -> bool:
+        descriptions = query.column_descriptions
+        return len(descriptions) == 1 and descriptions[0].get("expr") is model
+
+    @staticmethod
+    def dump_entity(instance: Any) -> Dict[str, Any]:
+        """Loaded column values of an orm instance, what row cache keeps instead of the session bound instance."""
+        state = inspect(instance)
+        return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+    @staticmethod
+    def load_entity(session: Session, model: SqlAlchemyModel, values: Dict[str, Any]) -> Any:
+        """Instance of a cached row attached to session, columns left out of the cache lazy load as usual."""
+        instance = inspect(model).class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(instance, key, value)
+        make_transient_to_detached(instance)
+        return session.merge(instance, load=False)
+
+    @staticmethod
+    def keyed_query(query: SqlAlchemyQuery, model: SqlAlchemyModel, pk_attr: str
+                    ) -> Tuple[SqlAlchemyQuery, Callable[[Any], Any], Optional[Callable[[Any], Any]]]:
+        """
+        Query reading rows along with their primary key, primary key getter of its rows and a callable turning
+        them back into rows of query (None when rows are already shaped like them).
+        """
+        descriptions = query.column_descriptions
+        if IdHydratingPaginationStrategy.is_entity_query(query, model) or \
+                pk_attr in {column["name"] for column in descriptions}:
+            # orm instances or rows selecting the primary key already carry it
+            return query, lambda row: getattr(row, pk_attr), None
+        make_row = result_tuple([column["name"] for column in descriptions])
+        keyed = query.add_columns(getattr(model, pk_attr).label("fl_row_pk"))
+        return keyed, lambda row: row[-1], lambda row: make_row(tuple(row)[:-1])
+
+    def hydrate(self, query: SqlAlchemyQuery, model: SqlAlchemyModel, pk_attr: str, ids: List[Any]) -> list:
+        """Rows of given ids in given order, out of row cache and a single IN query over query for the misses."""
+        if not ids:
+            return []
+        pk = getattr(model, pk_attr)
+        keys = dict(zip(ids, self.row_keys(query, model, ids)))
+        cached = self.row_cache.get_many(keys.values())
+        entities = self.is_entity_query(query, model)
+        if entities:
+            # cached orm rows are column values, turn them into instances of this request's session
+            cached = {key: self.load_entity(query.session, model, values) for key, values in cached.items()}
+        misses = [pk_value for pk_value in dict.fromkeys(ids) if keys[pk_value] not in cached]
+        if misses:
+            hydrate_query, get_pk, to_row = self.keyed_query(
+                query.limit(None).offset(None).order_by(None).filter(pk.in_(misses)), model, pk_attr)
+            loaded = {}
+            for row in hydrate_query.all():
+                if get_pk(row) not in loaded:
+                    loaded[get_pk(row)] = to_row(row) if to_row is not None else row
+            self.row_cache.set_many({keys[pk_value]: self.dump_entity(row) if entities else row
+                                     for pk_value, row in loaded.items()})
+            cached.update((keys[pk_value], row) for pk_value, row in loaded.items())
+        return [cached[keys[pk_value]] for pk_value in ids if keys[pk_value] in cached]
+
+    def get_data(self, query: SqlAlchemyQuery) -> list:
+        model, pk_attr = self.get_primary_key(query)
+        if pk_attr is None:
+            return super().get_data(query)
+        ids = [row[0] for row in query.with_entities(getattr(model, pk_attr)).all()]
+        return self.hydrate(query, model, pk_attr, ids)
@@ -12,8 +12,14 @@ class PaginationStrategy(AbsPaginatingStrategy):
     spawn processing.
     Clients are advised to use any adapter in their listing service for refactoring page response as per
     their needs or having a different response structure.
+
+    Set allow_count_opt_out on a paginator to let clients skip the total count per request with
+    {"page": 2, "pageSize": 10, "count": false}. Such requests get a page without totalCount so only do it for
+    listings declaring a response model that accepts one.
     """
 
+    allow_count_opt_out: bool = False
+
     def __init__(self, request: Optional[FastapiRequest] = None, fire_count_qry: bool = True):
         self.request = request
         self.page_num = 0
@@ -32,6 +38,13 @@ class PaginationStrategy(AbsPaginatingStrategy):
         """
         return query.count()
 
+    def get_data(self, query: SqlAlchemyQuery) -> list:
+        """
+        Materialize rows of an already sliced page query.
+        Override this method to fetch page rows in a different manner.
+        """
+        return query.all()
+
     def is_next_page_exists(self) -> bool:
         """expression results in bool val if count query allowed else None"""
         if self.fire_count_qry:
@@ -52,6 +65,12 @@ class PaginationStrategy(AbsPaginatingStrategy):
         if page_num < 1 or page_size < 1:
             raise ListingPaginatorError("page param(s) is less than 1")
 
+    @staticmethod
+    def is_count_opted_out(pagination_params: dict) -> bool:
+        """Client opts out of total count with {"page": 2, "pageSize": 10, "count": false}"""
+        count = pagination_params.get("count", True)
+        return count is False or str(count).lower() in ("false", "0")
+
     def set_page_num(self, page_num: int):
         self.page_num = page_num
 
@@ -76,6 +95,9 @@ class PaginationStrategy(AbsPaginatingStrategy):
         self.set_page_num(page_num)
         self.set_page_size(page_size)
         self.set_extra_context(extra_context)
+        if self.allow_count_opt_out and self.is_count_opted_out(pagination_params):
+            # client doesn't need total count for this request, serve a page without count
+            self.fire_count_qry = False
         return self.page(query)
 
     def page(self, query: SqlAlchemyQuery) -> BasePage:
@@ -102,12 +124,12 @@ class PaginationStrategy(AbsPaginatingStrategy):
             totalCount=total_count,
             currentPageSize=self.page_size,
             currentPageNumber=self.page_num,
-            data=query.all())
+            data=self.get_data(query))
 
     def _get_page_without_count(self, *args, **kwargs) -> PageWithoutCount:
         """Get Page without total count for avoiding slow count query"""
         query = args[0]
-        data = query.all()
+        data = self.get_data(query)
         self.set_count(len(data))
         has_next = self.is_next_page_exists()
         return PageWithoutCount(
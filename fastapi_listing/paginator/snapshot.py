@@ -0,0 +1,110 @@
+__all__ = ["IdSnapshotPaginationStrategy"]
+
+import secrets
+from array import array
+from typing import Optional, Union, List, Any
+
+from fastapi_listing.abstracts import AbsCacheBackend
+from fastapi_listing.cache.backends import InMemoryCacheBackend
+from fastapi_listing.ctyping import SqlAlchemyQuery, BasePage, PageWithSnapshot, PageWithoutCountWithSnapshot
+from fastapi_listing.paginator.count_cache import filter_set_key
+from fastapi_listing.paginator.hydrating import IdHydratingPaginationStrategy
+from fastapi_listing.utils import fingerprint
+
+
+class IdSnapshotPaginationStrategy(IdHydratingPaginationStrategy):
+    """
+    Opt-in paginator for expensive (multi join filtering) listings that users flip through.
+
+    First request runs the filtered and sorted query once selecting primary keys only and keeps the ordered ids
+    compactly (array('q') for integer keys) in a cache under a snapshot token returned with the page.
+    Requests sending it back {"page": 5, "pageSize": 10, "snapshot": "<token>"} slice the id array and only fetch rows
+    of the page by id, count and pagination are O(1) while the snapshot lives.
+
+    Pages stay stable while browsing a snapshot, rows are always fetched fresh so deleted rows drop out of pages.
+    A token issued for other filters or sorting is ignored and a new snapshot is taken. Listings with more than
+    max_snapshot_size rows or composite primary keys are paginated the default way.
+    Requests opting out of count ({"count": false}) browse a snapshot they send back without totalCount and never
+    take a new one, reading all ids costs as much as the count they skipped.
+
+    register and use:
+    strategy_factory.register_strategy("id_snapshot_paginator", IdSnapshotPaginationStrategy) # registered by default
+    paginate_strategy = "id_snapshot_paginator"
+
+    Extend and overwrite snapshot_backend (shared store for multiple workers), snapshot_ttl and
+    max_snapshot_size to tune it.
+    """
+
+    snapshot_backend: AbsCacheBackend = InMemoryCacheBackend(max_entries=256)
+    snapshot_ttl: float = 300.0
+    max_snapshot_size: int = 1_000_000
+    scope_key: str = "cache_scope"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot_token: Optional[str] = None
+
+    def paginate(self, query: SqlAlchemyQuery, pagination_params: dict, extra_context: dict) -> BasePage:
+        token = pagination_params.get("snapshot")
+        self.snapshot_token = token if isinstance(token, str) else None
+        return super().paginate(query, pagination_params, extra_context)
+
+    def get_snapshot_identity(self) -> Optional[str]:
+        filter_hash = filter_set_key(self.extra_context, self.scope_key)
+        if filter_hash is None:
+            return None
+        return fingerprint([filter_hash, (self.extra_context or {}).get("applied_sorts")])
+
+    @staticmethod
+    def pack(ids: List[Any]) -> Union[array, List[Any]]:
+        try:
+            return array("q", ids)
+        except (TypeError, OverflowError):
+            # non integer primary keys
+            return ids
+
+    def take_snapshot(self, query: SqlAlchemyQuery, pk) -> Optional[Union[array, List[Any]]]:
+        ids = [row[0] for row in query.with_entities(pk).limit(self.max_snapshot_size + 1)]
+        if len(ids) > self.max_snapshot_size:
+            return None
+        return self.pack(ids)
+
+    def load_snapshot(self, query: SqlAlchemyQuery, pk, identity: str) -> Optional[Union[array, List[Any]]]:
+        if self.snapshot_token:
+            entry = self.snapshot_backend.get(f"fl:snapshot:{self.snapshot_token}")
+            if entry is not None and entry[0] == identity:
+                return entry[1]
+        if not self.fire_count_qry:
+            return None
+        ids = self.take_snapshot(query, pk)
+        if ids is None:
+            return None
+        self.snapshot_token = secrets.token_urlsafe(16)
+        self.snapshot_backend.set(f"fl:snapshot:{self.snapshot_token}", (identity, ids), ttl=self.snapshot_ttl)
+        return ids
+
+    def page(self, query: SqlAlchemyQuery) -> BasePage:
+        model, pk_attr = self.get_primary_key(query)
+        identity = self.get_snapshot_identity()
+        ids = None
+        if pk_attr is not None and identity is not None:
+            ids = self.load_snapshot(query, getattr(model, pk_attr), identity)
+        if ids is None:
+            return super().page(query)
+        self.set_count(len(ids))
+        start = (self.page_num - 1) * self.page_size
+        page_ids = list(ids[start:start + self.page_size])
+        if not self.fire_count_qry:
+            return PageWithoutCountWithSnapshot(
+                hasNext=start + self.page_size < self.count,
+                currentPageSize=self.page_size,
+                currentPageNumber=self.page_num,
+                data=self.hydrate(query, model, pk_attr, page_ids),
+                snapshot=self.snapshot_token)
+        return PageWithSnapshot(
+            hasNext=start + self.page_size < self.count,
+            totalCount=self.count,
+            currentPageSize=self.page_size,
+            currentPageNumber=self.page_num,
+            data=self.hydrate(query, model, pk_attr, page_ids),
+            snapshot=self.snapshot_token)
@@ -0,0 +1,42 @@
+__all__ = ["SignedTokenMixin"]
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from typing import Optional, Union
+
+
+class SignedTokenMixin:
+    """
+    hmac signed, url safe page tokens for paginators keeping their state on the client.
+    All workers serving a listing must share the same secret.
+    """
+
+    secret: Optional[Union[str, bytes]] = None
+
+    def _key(self) -> bytes:
+        if not self.secret:
+            raise ValueError(f"{type(self).__name__}.secret is not set, extend the paginator and set a secret!")
+        return self.secret.encode() if isinstance(self.secret, str) else self.secret
+
+    def _signature(self, payload: str) -> str:
+        digest = hmac.new(self._key(), payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    def sign_payload(self, payload: list) -> str:
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":"), default=str).encode()).decode().rstrip("=")
+        return f"{encoded}.{self._signature(encoded)}"
+
+    def unsign_payload(self, token: str) -> Optional[list]:
+        """Verified payload of a token, None for a tampered or malformed token."""
+        encoded, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, self._signature(encoded)):
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        except (binascii.Error, ValueError, TypeError):
+            return None
+        return payload if isinstance(payload, list) else None
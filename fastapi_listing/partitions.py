@@ -0,0 +1,135 @@
+__all__ = ["PartitionedScan"]
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, Integer
+from sqlalchemy.orm import Session
+
+from fastapi_listing.ctyping import SqlAlchemyQuery
+from fastapi_listing.paginator.hydrating import IdHydratingPaginationStrategy
+
+_DONE = object()
+
+
+class PartitionedScan:
+    """
+    Full scan of a filtered listing split into primary key ranges scanned in parallel.
+
+    Partition bounds come from min/max of the primary key for integer keys (split="range") or from exact quantiles
+    computed with ntile() over the primary key index (split="quantiles", used for other keys and skewed ids).
+    Every partition is walked with keyset iteration (pk > last seen, ORDER BY pk LIMIT batch_size) on its own
+    session in a thread pool, batches are yielded as soon as any partition produces them so batch order is not
+    deterministic. A bounded queue keeps fast partitions from running ahead of the consumer.
+
+    Without session_factory partitions are scanned one after another on the query's own session.
+    """
+
+    def __init__(self, query: SqlAlchemyQuery, *, partitions: int = 4, batch_size: int = 1000,
+                 session_factory: Optional[Callable[[], Session]] = None, max_workers: Optional[int] = None,
+                 split: str = "auto"):
+        if partitions < 1 or batch_size < 1:
+            raise ValueError("partitions and batch_size should be at least 1")
+        if split not in ("auto", "range", "quantiles"):
+            raise ValueError(f"unknown split {split!r}, expected 'auto', 'range' or 'quantiles'")
+        model, pk_attr = IdHydratingPaginationStrategy.get_primary_key(query)
+        if pk_attr is None:
+            raise ValueError("partitioned scans need a listing over a model with a single column primary key")
+        self.query = query.order_by(None).limit(None).offset(None)
+        self.pk = getattr(model, pk_attr)
+        self.pk_attr = pk_attr
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.max_workers = max_workers or partitions
+        self.split = split
+        # keyset iteration needs the pk of every row, read along with rows that don't carry it
+        self.query, self.get_pk, self.to_row = IdHydratingPaginationStrategy.keyed_query(self.query, model, pk_attr)
+
+    def partition_starts(self) -> List[Any]:
+        """Lowest primary key of every non empty partition, ascending."""
+        low, high = self.query.with_entities(func.min(self.pk), func.max(self.pk)).one()
+        if low is None:
+            return []
+        split = self.split
+        if split == "auto":
+            split = "range" if isinstance(self.pk.type, Integer) else "quantiles"
+        if split == "range":
+            step = -(-(high - low + 1) // self.partitions)
+            return list(range(low, high + 1, step))
+        tile = func.ntile(self.partitions).over(order_by=self.pk).label("fl_tile")
+        tiles = self.query.with_entities(self.pk.label("fl_pk"), tile).subquery()
+        start = func.min(tiles.c.fl_pk)
+        return [row[0] for row in self.query.session.query(start).group_by(tiles.c.fl_tile).order_by(start)]
+
+    def partition_bounds(self) -> List[Tuple[Any, Optional[Any]]]:
+        """(inclusive low, exclusive high) primary key bounds of partitions, last one is open ended."""
+        starts = self.partition_starts()
+        return [(start, starts[pos + 1] if pos + 1 < len(starts) else None) for pos, start in enumerate(starts)]
+
+    def scan_partition(self, query: SqlAlchemyQuery, low: Any, high: Optional[Any]) -> Iterator[list]:
+        query = query.filter(self.pk >= low)
+        if high is not None:
+            query = query.filter(self.pk < high)
+        last = None
+        while True:
+            batch_query = query if last is None else query.filter(self.pk > last)
+            batch = batch_query.order_by(self.pk).limit(self.batch_size).all()
+            if not batch:
+                return
+            yield batch if self.to_row is None else [self.to_row(row) for row in batch]
+            if len(batch) < self.batch_size:
+                return
+            last = self.get_pk(batch[-1])
+
+    @staticmethod
+    def _put(results: queue.Queue, stop: threading.Event, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _work(self, low: Any, high: Optional[Any], results: queue.Queue, stop: threading.Event):
+        session = self.session_factory()
+        try:
+            for batch in self.scan_partition(self.query.with_session(session), low, high):
+                if not self._put(results, stop, batch):
+                    return
+        except BaseException as exc:  # noqa
+            self._put(results, stop, exc)
+        finally:
+            session.close()
+            self._put(results, stop, _DONE)
+
+    def __iter__(self) -> Iterator[list]:
+        bounds = self.partition_bounds()
+        if self.session_factory is None:
+            for low, high in bounds:
+                yield from self.scan_partition(self.query, low, high)
+            return
+        results: queue.Queue = queue.Queue(maxsize=self.max_workers * 2)
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fastapi-listing-scan")
+        futures = [executor.submit(self._work, low, high, results, stop) for low, high in bounds]
+        pending = len(bounds)
+        try:
+            while pending:
+                item = results.get()
+                if item is _DONE:
+                    pending -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # consumer stopped early or a partition failed, let remaining workers quit
+            stop.set()
+            # partitions still queued would open a session and run a query nobody reads
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
@@ -0,0 +1,232 @@
+__all__ = [
+    "Replica",
+    "ReplicaSet",
+    "RoundRobinPolicy",
+    "LeastOutstandingPolicy",
+    "WeightedPolicy",
+    "latency_injected",
+]
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Sequence, Union, Tuple, Optional, List, Iterator, Dict, Type
+
+from sqlalchemy import exc as sa_exc, event
+from sqlalchemy.orm import Session
+
+from fastapi_listing.abstracts import AbsReplicaPolicy
+
+
+class Replica:
+    """
+    A single read replica known to a ReplicaSet.
+    Keeps the bookkeeping needed by routing policies and passive health checks.
+    """
+
+    def __init__(self, factory: Callable[[], Session], weight: int = 1, name: Optional[str] = None):
+        if weight < 1:
+            raise ValueError(f"replica weight should be a positive integer, got {weight!r}")
+        self.factory = factory
+        self.weight = weight
+        self.name = name or getattr(factory, "__name__", repr(factory))
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        # running value used by smooth weighted round-robin
+        self.current_weight = 0
+
+    def is_available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def __repr__(self):
+        return f"Replica({self.name!r}, weight={self.weight}, outstanding={self.outstanding})"
+
+
+class RoundRobinPolicy(AbsReplicaPolicy):
+    """Hands out replicas one after another."""
+
+    def __init__(self):
+        self._counter = 0
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        replica = replicas[self._counter % len(replicas)]
+        self._counter += 1
+        return replica
+
+
+class LeastOutstandingPolicy(AbsReplicaPolicy):
+    """Picks the replica serving the least number of in flight requests, ties are broken by position."""
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        return min(replicas, key=lambda replica: replica.outstanding)
+
+
+class WeightedPolicy(AbsReplicaPolicy):
+    """
+    Smooth weighted round-robin (same as nginx upstreams).
+    A replica with weight 3 gets three times the traffic of a replica with weight 1
+    without sending bursts of consecutive requests to the heavier one.
+    """
+
+    def choose(self, replicas: Sequence[Replica]) -> Replica:
+        total = 0
+        best = None
+        for replica in replicas:
+            replica.current_weight += replica.weight
+            total += replica.weight
+            if best is None or replica.current_weight > best.current_weight:
+                best = replica
+        best.current_weight -= total
+        return best
+
+
+_policies: Dict[str, Type[AbsReplicaPolicy]] = {
+    "round_robin": RoundRobinPolicy,
+    "least_outstanding": LeastOutstandingPolicy,
+    "weighted": WeightedPolicy,
+}
+
+
+class ReplicaSet:
+    """
+    Balances read sessions over a group of read replicas.
+
+    replicas - session factories or (session factory, weight) tuples.
+    policy - one of 'round_robin', 'least_outstanding', 'weighted' or an AbsReplicaPolicy instance.
+    failure_threshold - consecutive failures after which a replica gets ejected.
+    cooldown - seconds an ejected replica stays out of rotation.
+
+    Health checking is passive, a replica is marked failed when creating its session fails or
+    when a request routed to it ends with a disconnect (an error that invalidated the connection).
+    After cooldown a replica gets back in rotation on probation, a single failure ejects it again.
+
+    e.g.
+    app.add_middleware(DaoSessionBinderMiddleware, master=get_db,
+                       replica=ReplicaSet([get_replica_1, (get_replica_2, 2)], policy="weighted"))
+    """
+
+    def __init__(
+            self,
+            replicas: Sequence[Union[Callable[[], Session], Tuple[Callable[[], Session], int]]],
+            *,
+            policy: Union[str, AbsReplicaPolicy] = "round_robin",
+            failure_threshold: int = 3,
+            cooldown: float = 30.0,
+    ):
+        if not replicas:
+            raise ValueError("ReplicaSet expects at least one replica session factory!")
+        self.replicas: List[Replica] = []
+        for item in replicas:
+            if isinstance(item, Replica):
+                self.replicas.append(item)
+            elif type(item) is tuple:
+                self.replicas.append(Replica(*item))
+            elif callable(item):
+                self.replicas.append(Replica(item))
+            else:
+                raise ValueError(f"Invalid replica {item!r}, expects a session callable or (callable, weight)")
+        if isinstance(policy, str):
+            if policy not in _policies:
+                raise ValueError(f"Unknown replica policy {policy!r}, allowed {list(_policies)}")
+            policy = _policies[policy]()
+        elif not isinstance(policy, AbsReplicaPolicy):
+            raise ValueError(f"Invalid replica policy {policy!r}, expects a subclass of AbsReplicaPolicy")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold should be at least 1")
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_health_failure(error: Optional[BaseException]) -> bool:
+        """
+        Only disconnects count against a replica. Other operational errors (lock waits, deadlocks, statement
+        timeouts) and bad sql are not the replica's fault.
+        """
+        if error is None:
+            return False
+        if isinstance(error, sa_exc.DisconnectionError):
+            return True
+        return bool(getattr(error, "connection_invalidated", False))
+
+    def _candidates(self, exclude: Sequence[Replica]) -> List[Replica]:
+        now = time.monotonic()
+        candidates = [replica for replica in self.replicas if replica not in exclude]
+        healthy = [replica for replica in candidates if replica.is_available(now)]
+        # when everyone is ejected keep trying all of them instead of failing the request right away
+        return healthy or candidates
+
+    def acquire(self, exclude: Sequence[Replica] = ()) -> Tuple[Replica, Session]:
+        """
+        Route a new read session. Replicas whose session factory fails are marked and the next one is tried.
+        Every acquired replica must be handed back with release().
+        """
+        tried: List[Replica] = list(exclude)
+        last_error: Optional[BaseException] = None
+        while True:
+            with self._lock:
+                candidates = self._candidates(tried)
+                if not candidates:
+                    break
+                replica = self.policy.choose(candidates)
+                replica.outstanding += 1
+            try:
+                return replica, replica.factory()
+            except Exception as e:
+                last_error = e
+                tried.append(replica)
+                self.release(replica, failed=True)
+        if last_error is not None:
+            raise last_error
+        raise ValueError("No replica left to route the read session!")
+
+    def release(self, replica: Replica, failed: bool = False):
+        with self._lock:
+            replica.outstanding = max(replica.outstanding - 1, 0)
+            if failed:
+                replica.consecutive_failures += 1
+                if replica.consecutive_failures >= self.failure_threshold:
+                    replica.ejected_until = time.monotonic() + self.cooldown
+                    # probation, one more failure after cooldown ejects it again
+                    replica.consecutive_failures = self.failure_threshold - 1
+            else:
+                replica.consecutive_failures = 0
+
+    @contextmanager
+    def session(self, exclude: Sequence[Replica] = (), close: bool = True) -> Iterator[Session]:
+        """Routed read session for use outside of a request context like background jobs."""
+        replica, sess = self.acquire(exclude)
+        error: Optional[BaseException] = None
+        try:
+            yield sess
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if close:
+                sess.close()
+            self.release(replica, failed=self.is_health_failure(error))
+
+
+def latency_injected(factory: Callable[[], Session], delay: Union[float, Callable[[], float]]) -> Callable[[], Session]:
+    """
+    Wraps a session callable so that sessions it produces sleep for delay seconds before executing any orm statement.
+    delay could also be a callable returning seconds, to simulate jittery replicas.
+    A local stand-in for a slow replica, handy to exercise routing and hedged reads without real replicas.
+
+    e.g.
+    ReplicaSet([get_db, latency_injected(get_db, 0.5)])
+    """
+    def _factory() -> Session:
+        sess = factory()
+
+        @event.listens_for(sess, "do_orm_execute")
+        def _slow_down(orm_execute_state):
+            time.sleep(delay() if callable(delay) else delay)
+
+        return sess
+
+    _factory.__name__ = f"latency_injected_{getattr(factory, '__name__', 'replica')}"
+    return _factory
@@ -1,8 +1,10 @@
-from typing import Type, Optional, Dict, List
+from typing import Type, Optional, Dict, List, Tuple, Union, Callable, Iterator
 from warnings import warn
 
-from fastapi import Request
-from sqlalchemy.orm import Query
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Query, Session
 
 from fastapi_listing.dao.generic_dao import GenericDao
 from fastapi_listing.errors import FastapiListingRequestSemanticApiException, \
@@ -13,7 +15,12 @@ from fastapi_listing.ctyping import BasePage
 from fastapi_listing.utils import HAS_PYDANTIC, BaseModel
 from fastapi_listing.utils import IS_PYDANTIC_V2
 from fastapi_listing.service.config import ListingMetaData
+from fastapi_listing.service.adapters import BodyListingParamsAdapter
 from fastapi_listing.abstracts import ListingBase
+from fastapi_listing.encoders import RawJson, FastJsonPageEncoder
+from fastapi_listing.encoders.export import RowStreamEncoder, iter_query_rows, get_export_encoder, \
+    validated_fields, validated_row_dict
+from fastapi_listing.partitions import PartitionedScan
 
 
 class FastapiListing(ListingBase):
@@ -33,9 +40,13 @@ class FastapiListing(ListingBase):
     def __init__(self, request: Optional[Request] = None, dao: GenericDao = None,
                  *, pydantic_serializer: Optional[Type[BaseModel]] = None,
                  fields_to_fetch: Optional[List[str]] = None,
-                 custom_fields: Optional[bool] = False) -> None:
+                 custom_fields: Optional[bool] = False,
+                 response: Optional[Response] = None) -> None:
         self.request = request
         self.dao = dao
+        # router's response, used to emit caching headers
+        self.response = response
+        self.pydantic_serializer = pydantic_serializer
         if HAS_PYDANTIC and pydantic_serializer:
             if IS_PYDANTIC_V2:
                 self.fields_to_fetch = list(pydantic_serializer.model_fields.keys())
@@ -46,21 +57,27 @@ class FastapiListing(ListingBase):
         else:
             self.fields_to_fetch = []
         self.custom_fields = custom_fields
+        # lookups of page enrichers, shared by enrichers for the lifetime of the listing request
+        self.enrichment_cache: Dict = {}
 
     @staticmethod
     def _replace_aliases(mapper: Dict[str, str], req_params: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # params parsed by the adapter are shared within the request, aliases are replaced on copies
+        replaced = []
         for param in req_params:
             if type(mapper[param["field"]]) is tuple:
-                param["field"] = mapper[param["field"]][0]
+                replaced.append(dict(param, field=mapper[param["field"]][0]))
             elif type(mapper[param["field"]]) is str:
-                param["field"] = mapper[param["field"]]
+                replaced.append(dict(param, field=mapper[param["field"]]))
             else:
                 raise ValueError("invalid field mapper")
-        return req_params
+        return replaced
 
     def _apply_sorting(self, query: Query, listing_meta_info: ListingMetaInfo) -> Query:
         try:
             sorting_params: List[dict] = listing_meta_info.feature_params_adapter.get("sort")
+        except FastapiListingRequestSemanticApiException:
+            raise
         except Exception:
             raise FastapiListingRequestSemanticApiException(status_code=422, detail="Crap! Sorting went wrong.")
         temp = set(item.get("field") for item in sorting_params) - set(
@@ -72,6 +89,7 @@ class FastapiListing(ListingBase):
             sorting_params = self._replace_aliases(listing_meta_info.sorting_column_mapper, sorting_params)
         else:
             sorting_params = [listing_meta_info.default_sort_val]
+        self._set_vals_in_extra_context(listing_meta_info.extra_context, applied_sorts=sorting_params)
 
         def launch_mechanics(qry):
             mecha: str = listing_meta_info.sorter_mechanic
@@ -86,6 +104,8 @@ class FastapiListing(ListingBase):
     def _apply_filters(self, query: Query, listing_meta_info: ListingMetaInfo) -> Query:
         try:
             fltrs: List[dict] = listing_meta_info.feature_params_adapter.get("filter")
+        except FastapiListingRequestSemanticApiException:
+            raise
         except Exception:
             raise FastapiListingRequestSemanticApiException(status_code=422,
                                                             detail="Crap! Filtering went wrong.")
@@ -95,6 +115,7 @@ class FastapiListing(ListingBase):
                 status_code=409, detail=f"Filter(s) not registered with listing: {temp}, Did you forget to do it?")
 
         fltrs = self._replace_aliases(listing_meta_info.filter_column_mapper, fltrs)
+        self._set_vals_in_extra_context(listing_meta_info.extra_context, applied_filters=fltrs)
 
         def launch_mechanics(qry):
             mecha_obj = interceptor_factory.create(listing_meta_info.filter_mechanic)
@@ -108,17 +129,16 @@ class FastapiListing(ListingBase):
     def _paginate(self, query: Query, listing_meta_info: ListingMetaInfo) -> BasePage:
         try:
             raw_params: List[dict] = listing_meta_info.feature_params_adapter.get("pagination")
-            page_params = raw_params if raw_params else {"page": 1, "pageSize": listing_meta_info.default_page_size}
+            # copied, page size gets capped below
+            page_params = {"page": 1, "pageSize": listing_meta_info.default_page_size, **(raw_params or {})}
             paginator_params: dict = page_params
+        except FastapiListingRequestSemanticApiException:
+            raise
         except Exception:
             raise FastapiListingRequestSemanticApiException(status_code=422,
                                                             detail="Crap! Pagination went wrong.")
         if page_params["pageSize"] > listing_meta_info.max_page_size:
-            warn(f"""requested page size is greater than 'max_page_size', overwriting requested page size
-            from {page_params['pageSize']} to {listing_meta_info.max_page_size}""",
-                 FastAPIListingWarning,
-                 stacklevel=3,
-                 )
+            # caller was warned by get_response
             page_params["pageSize"] = listing_meta_info.max_page_size
 
         page = listing_meta_info.paginating_strategy.paginate(query,
@@ -132,6 +152,11 @@ class FastapiListing(ListingBase):
                                                                        extra_context=listing_meta_info.extra_context)
         if base_query is None or not base_query:
             raise ValueError("query strategy returned nothing Query object is expected!")
+        dao_cls, query_strategy_cls = type(self.dao), type(listing_meta_info.query_strategy)
+        # identifies the base query, strategies caching anything query dependent key on it
+        self._set_vals_in_extra_context(
+            listing_meta_info.extra_context,
+            listing_key=f"{dao_cls.__module__}.{dao_cls.__qualname__}:{query_strategy_cls.__qualname__}")
         fltr_query: Query = self._apply_filters(base_query,
                                                 listing_meta_info)
         srtd_query: Query = self._apply_sorting(fltr_query, listing_meta_info)
@@ -167,17 +192,246 @@ class FastapiListing(ListingBase):
                 self.default_page_size = meta_data["default_page_size"]
                 self.max_page_size = meta_data["max_page_size"]
                 self.fire_count_qry = meta_data["allow_count_query_by_paginator"]
+                self.release_read_session = meta_data.get("release_read_session", False)
+                self.response_cache = meta_data.get("response_cache")
+                self.single_flight = meta_data.get("single_flight")
+                self.http_cache = meta_data.get("http_cache")
+                self.page_encoder = meta_data.get("page_encoder")
+                self.enrichers = meta_data.get("enrichers")
                 self.paginating_strategy = strategy_factory.create(
                     meta_data["paginating_strategy"], request=outer_instance.request, fire_count_qry=self.fire_count_qry)
 
         return MetaInfo(self)  # type: ignore
 
-    def get_response(self, listing_meta_data: ListingMetaData) -> BasePage:
+    def _get_conditional_response(self, listing_meta_info: ListingMetaInfo
+                                  ) -> Tuple[Optional[Response], Optional[Query]]:
+        """304 response when client's copy is still valid along with the query prepared to validate it if any."""
+        if listing_meta_info.http_cache is None:
+            return None, None
+        prepared: List[Query] = []
+
+        def get_query() -> Query:
+            if not prepared:
+                prepared.append(self._prepare_query(listing_meta_info))
+            return prepared[0]
+
+        not_modified = listing_meta_info.http_cache.evaluate(self, listing_meta_info, get_query)
+        return not_modified, prepared[0] if prepared else None
+
+    def _get_cached_page(self, listing_meta_data: ListingMetaData,
+                         listing_meta_info: ListingMetaInfo) -> Tuple[Optional[str], Optional[BasePage]]:
+        if listing_meta_info.response_cache is None:
+            return None, None
+        cache_key, cached = listing_meta_info.response_cache.fetch(self, listing_meta_data, listing_meta_info)
+        return cache_key, listing_meta_info.response_cache.copy_page(cached) if cached is not None else None
+
+    def _encode_page(self, listing_meta_info: ListingMetaInfo, page: BasePage) -> Union[BasePage, Response]:
+        encoder = listing_meta_info.page_encoder
+        if encoder is None and isinstance(page.get("data"), RawJson):
+            # page assembled by the database, response_model can't handle it
+            encoder = FastJsonPageEncoder()
+        if encoder is None:
+            return page
+        return encoder.encode(self, page)
+
+    def _get_flight_key(self, listing_meta_info: ListingMetaInfo) -> Optional[str]:
+        if listing_meta_info.single_flight is None:
+            return None
+        return listing_meta_info.single_flight.build_key(self, listing_meta_info)
+
+    def _encode_flight_page(self, listing_meta_info: ListingMetaInfo, page: BasePage,
+                            shared: bool) -> Union[BasePage, Response]:
+        # page dict is shared with other callers, hand out a copy
+        return self._encode_page(listing_meta_info, dict(page) if shared else page)
+
+    @staticmethod
+    def _warn_page_size(listing_meta_info: ListingMetaInfo, stacklevel: int) -> None:
+        """
+        Warn about a requested page size greater than max_page_size, _paginate caps it.
+        Raised from entry points as pages may be built on another thread (single flight, threadpool) or not at all
+        (cache hits), stacklevel counts frames up to the caller of the entry point.
+        """
+        try:
+            page_size = (listing_meta_info.feature_params_adapter.get("pagination") or {}).get("pageSize")
+            too_big = page_size is not None and page_size > listing_meta_info.max_page_size
+        except Exception:
+            # malformed params are reported by _paginate
+            return
+        if too_big:
+            warn(f"""requested page size is greater than 'max_page_size', overwriting requested page size
+            from {page_size} to {listing_meta_info.max_page_size}""",
+                 FastAPIListingWarning,
+                 stacklevel=stacklevel + 1,
+                 )
+
+    def get_response(self, listing_meta_data: ListingMetaData) -> Union[BasePage, Response]:
+        self._set_vals_in_extra_context(listing_meta_data["extra_context"],
+                                        field_list=self.fields_to_fetch,
+                                        custom_fields=self.custom_fields
+                                        )
+        listing_meta_info = self._build_from_meta_data(listing_meta_data)
+        self._warn_page_size(listing_meta_info, stacklevel=2)
+        not_modified, query = self._get_conditional_response(listing_meta_info)
+        if not_modified is not None:
+            return not_modified
+        cache_key, cached = self._get_cached_page(listing_meta_data, listing_meta_info)
+        if cached is not None:
+            return self._encode_page(listing_meta_info, cached)
+        flight_key = self._get_flight_key(listing_meta_info)
+        if not flight_key:
+            return self._encode_page(listing_meta_info, self._build_page(listing_meta_info, cache_key, query))
+        return self._encode_flight_page(listing_meta_info, *listing_meta_info.single_flight.do(
+            flight_key, self._build_page, listing_meta_info, cache_key, query))
+
+    async def aget_response(self, listing_meta_data: ListingMetaData) -> Union[BasePage, Response]:
+        """
+        Async entry point for async routers. Listing runs in threadpool so the event loop stays free,
+        identical concurrent calls are coalesced without blocking the loop when single_flight is set.
+        """
+        return await self._aget_response(listing_meta_data)
+
+    async def _aget_response(self, listing_meta_data: ListingMetaData) -> Union[BasePage, Response]:
         self._set_vals_in_extra_context(listing_meta_data["extra_context"],
                                         field_list=self.fields_to_fetch,
                                         custom_fields=self.custom_fields
                                         )
         listing_meta_info = self._build_from_meta_data(listing_meta_data)
-        fnl_query: Query = self._prepare_query(listing_meta_info)
+        # _aget_response is awaited by a public entry point
+        self._warn_page_size(listing_meta_info, stacklevel=3)
+        not_modified, query = await run_in_threadpool(self._get_conditional_response, listing_meta_info)
+        if not_modified is not None:
+            return not_modified
+        cache_key, cached = await run_in_threadpool(self._get_cached_page, listing_meta_data,
+                                                      listing_meta_info)
+        if cached is not None:
+            return self._encode_page(listing_meta_info, cached)
+        flight_key = self._get_flight_key(listing_meta_info)
+        if not flight_key:
+            response = await run_in_threadpool(self._build_page, listing_meta_info, cache_key, query)
+            return self._encode_page(listing_meta_info, response)
+        return self._encode_flight_page(listing_meta_info, *await listing_meta_info.single_flight.do_async(
+            flight_key, run_in_threadpool, self._build_page, listing_meta_info, cache_key, query))
+
+    async def aget_body_response(self, listing_meta_data: ListingMetaData) -> Union[BasePage, Response]:
+        """
+        Async entry point for POST listing queries, filter, sort and pagination are read from json request body.
+        Params adapters other than BodyListingParamsAdapter (and its subclasses) are swapped for it.
+        Body goes into a copy of extra_context, the one passed in may be shared between requests.
+        """
+        adapter_cls = listing_meta_data["feature_params_adapter"]
+        if not issubclass(adapter_cls, BodyListingParamsAdapter):
+            adapter_cls = BodyListingParamsAdapter
+        body = await adapter_cls.read_body(self.request)
+        listing_meta_data = ListingMetaData(listing_meta_data, feature_params_adapter=adapter_cls,  # type: ignore
+                                            extra_context=dict(listing_meta_data["extra_context"],
+                                                               **{adapter_cls.body_key: body}))
+        return await self._aget_response(listing_meta_data)
+
+    def warm_response(self, listing_meta_data: ListingMetaData) -> BasePage:
+        """Build a fresh page skipping response cache lookup and store it in response cache. Used by prewarmers."""
+        self._set_vals_in_extra_context(listing_meta_data["extra_context"],
+                                        field_list=self.fields_to_fetch,
+                                        custom_fields=self.custom_fields
+                                        )
+        listing_meta_info = self._build_from_meta_data(listing_meta_data)
+        cache_key: Optional[str] = None
+        if listing_meta_info.response_cache is not None:
+            cache_key = listing_meta_info.response_cache.build_key(self, listing_meta_info)
+        return self._build_page(listing_meta_info, cache_key)
+
+    def iter_export(self, listing_meta_data: ListingMetaData, export_format: Union[str, RowStreamEncoder] = "ndjson",
+                    *, chunk_size: int = 1000, session_factory: Optional[Callable[[], Session]] = None
+                    ) -> Iterator[bytes]:
+        """Encoded chunks of the whole filtered and sorted listing, see export_response."""
+        encoder = get_export_encoder(export_format)
+        self._set_vals_in_extra_context(listing_meta_data["extra_context"],
+                                        field_list=self.fields_to_fetch,
+                                        custom_fields=self.custom_fields
+                                        )
+        listing_meta_info = self._build_from_meta_data(listing_meta_data)
+        query: Query = self._prepare_query(listing_meta_info)
+        rows = iter_query_rows(query, chunk_size, session_factory)
+        if self.custom_fields and self.pydantic_serializer is not None:
+            # custom fields are built by serializer validators and computed fields, rows go through it
+            return encoder.stream(rows, validated_fields(self.pydantic_serializer), chunk_size,
+                                  validated_row_dict(self.pydantic_serializer))
+        return encoder.stream(rows, FastJsonPageEncoder(self.pydantic_serializer).get_fields(self), chunk_size)
+
+    def export_response(self, listing_meta_data: ListingMetaData, export_format: Union[str, RowStreamEncoder] = "ndjson",
+                        *, chunk_size: int = 1000, session_factory: Optional[Callable[[], Session]] = None,
+                        filename: Optional[str] = None) -> StreamingResponse:
+        """
+        Stream the whole filtered and sorted listing as ndjson or csv (or any RowStreamEncoder), no pagination.
+
+        Filters and sorting run through the regular pipeline before streaming starts so bad params still fail
+        with a 4xx. Rows are fetched chunk_size at a time over a server side cursor and encoded incrementally,
+        memory stays constant however many rows are exported.
+        Rows are written as selected columns under serializer aliases, listings with custom_fields validate every row
+        through the serializer so validators and computed fields apply (slower).
+        Rows are read on dao's read session by default, it must stay open until the stream ends. Pass a
+        session_factory when sessions are closed along with the request (session_close_implicit).
+        """
+        encoder = get_export_encoder(export_format)
+        chunks = self.iter_export(listing_meta_data, encoder, chunk_size=chunk_size, session_factory=session_factory)
+        headers = {}
+        if filename:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}.{encoder.extension}"'
+        return StreamingResponse(chunks, media_type=encoder.media_type, headers=headers)
+
+    def submit_export(self, listing_meta_data: ListingMetaData, export_jobs,
+                      export_format: Union[str, RowStreamEncoder] = "ndjson"):
+        """
+        Submit a background export of the whole filtered and sorted listing to an ExportJobManager, returns the
+        ExportJob right away. Filters and sort are captured now, bad params fail here with a 4xx and not in the job.
+        """
+        self._set_vals_in_extra_context(listing_meta_data["extra_context"],
+                                        field_list=self.fields_to_fetch,
+                                        custom_fields=self.custom_fields
+                                        )
+        listing_meta_info = self._build_from_meta_data(listing_meta_data)
+        self._prepare_query(listing_meta_info)
+        return export_jobs.submit(self, listing_meta_data, listing_meta_info, export_format)
+
+    def iter_partitions(self, listing_meta_data: ListingMetaData, *, partitions: int = 4, batch_size: int = 1000,
+                        session_factory: Optional[Callable[[], Session]] = None, max_workers: Optional[int] = None,
+                        split: str = "auto") -> Iterator[list]:
+        """
+        Iterate every row of the filtered listing in batches for batch jobs, instead of paging with offsets.
+
+        Filtered rows are split into primary key ranges scanned in parallel with keyset iteration, each on its own
+        session out of session_factory (see PartitionedScan). Batches come out as partitions produce them, sorting
+        of the listing is not kept.
+
+        for batch in FastapiListing(dao=dao, pydantic_serializer=EmployeeListDetails).iter_partitions(
+                MetaInfo(default_srt_on="emp_no", **filters), partitions=8, session_factory=get_replica):
+            process(batch)
+        """
+        self._set_vals_in_extra_context(listing_meta_data["extra_context"],
+                                        field_list=self.fields_to_fetch,
+                                        custom_fields=self.custom_fields
+                                        )
+        listing_meta_info = self._build_from_meta_data(listing_meta_data)
+        query: Query = self._prepare_query(listing_meta_info)
+        return iter(PartitionedScan(query, partitions=partitions, batch_size=batch_size,
+                                    session_factory=session_factory, max_workers=max_workers, split=split))
+
+    def _enrich_page(self, listing_meta_info: ListingMetaInfo, page: BasePage) -> None:
+        if not listing_meta_info.enrichers or isinstance(page.get("data"), RawJson):
+            # page json assembled by the database can't be enriched
+            return
+        rows = list(page["data"])
+        for enricher in listing_meta_info.enrichers:
+            rows = enricher.enrich(self, rows, self.enrichment_cache)
+        page["data"] = rows
+
+    def _build_page(self, listing_meta_info: ListingMetaInfo, cache_key: Optional[str] = None,
+                    query: Optional[Query] = None) -> BasePage:
+        fnl_query: Query = query if query is not None else self._prepare_query(listing_meta_info)
         response: BasePage = self._paginate(fnl_query, listing_meta_info)
+        self._enrich_page(listing_meta_info, response)
+        if listing_meta_info.release_read_session:
+            # page rows are materialized, no need to hold the connection while response gets serialized.
+            self.dao.release_read_session()
+        if cache_key:
+            listing_meta_info.response_cache.set(cache_key, response)
         return response
@@ -1,17 +1,29 @@
-from typing import Optional, List
+import re
+from array import array
+from typing import Optional, List, Any, Dict, Iterable, Tuple, AsyncIterator
+from urllib.parse import quote
 
 try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 from fastapi import Request
 
 from fastapi_listing import utils
 from fastapi_listing.abstracts import AbstractListingFeatureParamsAdapter
+from fastapi_listing.errors import FastapiListingRequestSemanticApiException
 
 __all__ = [
-    "CoreListingParamsAdapter"
+    "CoreListingParamsAdapter",
+    "CompactListingParamsAdapter",
+    "BodyListingParamsAdapter",
+    "build_compact_query"
 ]
 
 
@@ -43,17 +55,343 @@ class CoreListingParamsAdapter(AbstractListingFeatureParamsAdapter):
 
     pagination:
     {"pageSize": <integer page size>, "page": <integer page number 1 based>}
+    optionally with "count": false to skip total count for this request (paginators allowing count opt out).
 
+    Every param is parsed once per request (with orjson when installed) and rejected before parsing when longer
+    than max_param_bytes (413) or after parsing when holding more than max_param_items values (422).
+    Subclass to change limits, None disables a limit.
 
     """
+    max_param_bytes: Optional[int] = 64 * 1024
+    max_param_items: Optional[int] = 10_000
+    request_token_keys = ("countToken", "snapshot", "pageToken")
+    """Per request paginator tokens, left out of canonical params so they don't split caches."""
+
     def __init__(self, request: Optional[Request], extra_context):
         self.request = request
         self.extra_context = extra_context
         self.dependency = self.request.query_params if self.request else self.extra_context
+        self._parsed: Dict[str, Any] = {}
+
+    @staticmethod
+    def count_items(value: Any, limit: int) -> int:
+        """Number of values nested in parsed param, counting stops once limit is exceeded."""
+        count, stack = 0, [value]
+        while stack and count <= limit:
+            item = stack.pop()
+            count += 1
+            if isinstance(item, dict):
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, array):
+                count += len(item)
+        return count
+
+    def parse(self, key: str, raw: Optional[str]):
+        if self.max_param_bytes is not None and raw and len(raw) > self.max_param_bytes:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=413, detail=f"{key} param is larger than {self.max_param_bytes} bytes")
+        value = utils.dictify_query_params(raw)
+        if self.max_param_items is not None and self.count_items(value, self.max_param_items) > self.max_param_items:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=422, detail=f"{key} param holds more than {self.max_param_items} values")
+        return value
 
     def get(self, key: Literal["sort", "filter", "pagination"]):
         """
         @param key: Literal["sort", "filter", "pagination"]
         @return: List[Optional[dict]] for filter/sort and dict for paginator
         """
-        return utils.dictify_query_params(self.dependency.get(key))
+        if key not in self._parsed:
+            self._parsed[key] = self.parse(key, self.dependency.get(key))
+        return self._parsed[key]
+
+    @staticmethod
+    def canonical_filter(param: dict) -> dict:
+        value = param.get("value")
+        if isinstance(value, dict) and isinstance(value.get("list"), (list, array)):
+            # list filters match any of the items, item order and duplicates don't change the result
+            items = {utils.canonical_json(item): item for item in value["list"]}
+            param = dict(param, value=dict(value, list=[items[key] for key in sorted(items)]))
+        return param
+
+    def canonical_params(self, default_page_size: Optional[int] = None) -> dict:
+        """
+        Parsed params in canonical form, filter and list filter item order doesn't matter. Requests producing
+        the same page get equal params, sort order is kept as it is significant. Paginator tokens
+        (request_token_keys) are left out, requests differing by them only share cached pages and flights.
+        """
+        filters = [self.canonical_filter(param) for param in self.get("filter") or []]
+        pagination = self.get("pagination") or {"page": 1, "pageSize": default_page_size}
+        return dict(filter=sorted(filters, key=utils.canonical_json),
+                    sort=self.get("sort") or [],
+                    pagination={key: value for key, value in pagination.items()
+                                if key not in self.request_token_keys})
+
+    def fingerprint(self, default_page_size: Optional[int] = None) -> str:
+        """Stable hash of canonical params, for caches and request coalescing."""
+        return utils.fingerprint(self.canonical_params(default_page_size))
+
+
+# compact filter operator -> filter value key used by generic filters, in canonical order
+_COMPACT_OPERATORS = {"search": "search", "in": "list", "start": "start", "end": "end"}
+_COMPACT_FILTER = re.compile(r"filter\[([^\[\]]+)\](?:\[([^\[\]]+)\])?")
+
+
+def _quote_item(item: Any) -> str:
+    if isinstance(item, bool):
+        item = "true" if item else "false"
+    return quote(str(item), safe="")
+
+
+def build_compact_query(filters: Optional[List[dict]] = None, sorts: Optional[List[dict]] = None,
+                        pagination: Optional[dict] = None) -> str:
+    """
+    Canonical compact query string of listing params (structures CoreListingParamsAdapter returns), equivalent
+    params always produce the same string: filters ordered by field, list items sorted and deduplicated.
+
+    build_compact_query([{"field": "gdr", "value": {"search": "M"}}], [{"field": "hdt", "type": "dsc"}],
+                        {"page": 2, "pageSize": 25})
+    'filter[gdr]=M&sort=-hdt&page=2&pageSize=25'
+    """
+    parts = []
+    for param in sorted(filters or [], key=lambda item: str(item["field"])):
+        field = quote(str(param["field"]), safe="")
+        value = param.get("value") or {}
+        for operator, value_key in _COMPACT_OPERATORS.items():
+            if value_key not in value:
+                continue
+            name = f"filter[{field}]" if operator == "search" else f"filter[{field}][{operator}]"
+            if operator == "in":
+                items = sorted({_quote_item(item) for item in value[value_key] or []})
+                parts.append(f"{name}={','.join(items)}")
+            else:
+                parts.append(f"{name}={_quote_item(value[value_key])}")
+    if sorts:
+        parts.append("sort=" + ",".join(("-" if param.get("type") == "dsc" else "") + quote(str(param["field"]), safe="")
+                                         for param in sorts))
+    for key in ("page", "pageSize", "count"):
+        if pagination and key in pagination:
+            parts.append(f"{key}={_quote_item(pagination[key])}")
+    return "&".join(parts)
+
+
+class CompactListingParamsAdapter(CoreListingParamsAdapter):
+    """
+    Reads listing params out of a compact query string grammar instead of url encoded json:
+
+    filter[gdr]=M                               -> {"field": "gdr", "value": {"search": "M"}}
+    filter[empno][in]=1,2,3                     -> {"field": "empno", "value": {"list": ["1", "2", "3"]}}
+    filter[hdt][start]=...&filter[hdt][end]=... -> {"field": "hdt", "value": {"start": "...", "end": "..."}}
+    sort=-hdt,fnm                               -> [{"field": "hdt", "type": "dsc"}, {"field": "fnm", "type": "asc"}]
+    page=2&pageSize=25&count=false              -> {"page": 2, "pageSize": 25, "count": False}
+
+    Values stay strings like in query params, list items can't contain a comma. Limits of CoreListingParamsAdapter
+    apply to all query values of a param together. canonical_query_string() gives the canonical url of request
+    params (see build_compact_query), redirect to it to keep shared caches from storing equivalent urls apart.
+
+    feature_params_adapter = CompactListingParamsAdapter
+    """
+    list_separator = ","
+
+    def items(self) -> Iterable[Tuple[str, str]]:
+        if hasattr(self.dependency, "multi_items"):
+            return self.dependency.multi_items()
+        return self.dependency.items()
+
+    def check_size(self, key: str, size: int):
+        if self.max_param_bytes is not None and size > self.max_param_bytes:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=413, detail=f"{key} param is larger than {self.max_param_bytes} bytes")
+
+    def parse_filters(self) -> List[dict]:
+        values: Dict[str, dict] = {}
+        size = 0
+        for name, raw in self.items():
+            match = _COMPACT_FILTER.fullmatch(name)
+            if match is None:
+                continue
+            size += len(raw)
+            self.check_size("filter", size)
+            field, operator = match.group(1), match.group(2) or "search"
+            if operator not in _COMPACT_OPERATORS:
+                raise ValueError(f"unknown filter operator {operator!r}")
+            if operator == "in":
+                raw = [item for item in raw.split(self.list_separator) if item] if raw else []
+            values.setdefault(field, {})[_COMPACT_OPERATORS[operator]] = raw
+        return [{"field": field, "value": value} for field, value in values.items()]
+
+    def parse_sorts(self) -> List[dict]:
+        raw = self.dependency.get("sort") or ""
+        self.check_size("sort", len(raw))
+        sorts = []
+        for item in raw.split(","):
+            item = item.strip()
+            if item:
+                sorts.append({"field": item[1:], "type": "dsc"} if item.startswith("-") else
+                             {"field": item, "type": "asc"})
+        return sorts
+
+    def parse_pagination(self) -> dict:
+        pagination: Dict[str, Any] = {}
+        for key in ("page", "pageSize"):
+            if self.dependency.get(key):
+                pagination[key] = int(self.dependency.get(key))
+        count = self.dependency.get("count")
+        if count:
+            if count.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(f"invalid count {count!r}")
+            pagination["count"] = count.lower() in ("true", "1")
+        return pagination
+
+    def parse(self, key: str, raw: Optional[str] = None):
+        value = {"filter": self.parse_filters, "sort": self.parse_sorts, "pagination": self.parse_pagination}[key]()
+        if self.max_param_items is not None and self.count_items(value, self.max_param_items) > self.max_param_items:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=422, detail=f"{key} param holds more than {self.max_param_items} values")
+        return value
+
+    def canonical_query_string(self) -> str:
+        return build_compact_query(self.get("filter"), self.get("sort"), self.get("pagination"))
+
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _is_int64(value: Any) -> bool:
+    return type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+
+
+class _BodyReader:
+    """File like async reader over request body chunks, enforces a size limit while reading."""
+
+    def __init__(self, chunks: AsyncIterator[bytes], max_bytes: Optional[int]):
+        self.chunks = chunks
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes the stream type with an empty read
+            return b""
+        async for chunk in self.chunks:
+            if not chunk:
+                continue
+            self.size += len(chunk)
+            if self.max_bytes is not None and self.size > self.max_bytes:
+                raise FastapiListingRequestSemanticApiException(
+                    status_code=413, detail=f"listing body is larger than {self.max_bytes} bytes")
+            return chunk
+        return b""
+
+
+class BodyListingParamsAdapter(CoreListingParamsAdapter):
+    """
+    Reads listing params out of a json request body, for filters too large for a url (long id lists, many ranges):
+
+    {"filter": [...], "sort": [...], "pagination": {"page": 1, "pageSize": 25}}
+
+    Param formats are the ones of CoreListingParamsAdapter so filter and sort mappers validate them as usual.
+    Body is read by FastapiListing.aget_body_response with read_body, incrementally with ijson when installed
+    (pip install fastapi-listing[ijson]), and rejected with 413 past max_body_bytes. Integer "list" values of
+    filters are decoded straight into array('q') keeping large id lists compact.
+
+    @app.post("/employees/search")
+    async def search(request: Request):
+        return await FastapiListing(request, dao, pydantic_serializer=EmployeeListDetails).aget_body_response(
+            MetaInfo(default_srt_on="emp_no", filter_mapper=emp_filter_mapper))
+    """
+    max_body_bytes: Optional[int] = 4 * 1024 * 1024
+    max_param_items: Optional[int] = 1_000_000
+    body_key = "listing_body"
+
+    def __init__(self, request: Optional[Request], extra_context):
+        super().__init__(request, extra_context)
+        self.dependency = self.extra_context.get(self.body_key) or {}
+
+    def parse(self, key: str, raw: Any):
+        value = raw if raw is not None else []
+        if self.max_param_items is not None and self.count_items(value, self.max_param_items) > self.max_param_items:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=422, detail=f"{key} param holds more than {self.max_param_items} values")
+        return value
+
+    @staticmethod
+    def compact_lists(body: Any) -> Any:
+        """Integer "list" values of filters as array('q'), for bodies decoded in one go."""
+        if isinstance(body, dict):
+            for param in body.get("filter") or []:
+                value = param.get("value") if isinstance(param, dict) else None
+                if isinstance(value, dict) and isinstance(value.get("list"), list) and \
+                        all(_is_int64(item) for item in value["list"]):
+                    value["list"] = array("q", value["list"])
+        return body
+
+    @staticmethod
+    async def parse_stream(reader: _BodyReader) -> Any:
+        """Builds body out of ijson events, integer items of "list" arrays go into array('q') as they arrive."""
+        stack: List[Any] = []
+        keys: List[Any] = []
+        root: List[Any] = []
+
+        def add(value):
+            # containers are attached to their parent once complete
+            if not stack:
+                root.append(value)
+            elif isinstance(stack[-1], dict):
+                stack[-1][keys[-1]] = value
+            else:
+                if isinstance(stack[-1], array) and not _is_int64(value):
+                    # not an id list after all
+                    stack[-1] = list(stack[-1])
+                stack[-1].append(value)
+
+        async for _, event, value in ijson.parse_async(reader, use_float=True):
+            if event == "map_key":
+                keys[-1] = value
+            elif event == "start_map":
+                stack.append({})
+                keys.append(None)
+            elif event == "start_array":
+                typed = bool(stack) and isinstance(stack[-1], dict) and keys[-1] == "list"
+                stack.append(array("q") if typed else [])
+                keys.append(None)
+            elif event in ("end_map", "end_array"):
+                keys.pop()
+                add(stack.pop())
+            else:
+                add(value)
+        return root[0] if root else None
+
+    @classmethod
+    async def read_body(cls, request: Request) -> dict:
+        """Listing params of a json request body, 413 past max_body_bytes and 422 for anything but a json object."""
+        length = request.headers.get("content-length")
+        if cls.max_body_bytes is not None and length and length.isdigit() and int(length) > cls.max_body_bytes:
+            raise FastapiListingRequestSemanticApiException(
+                status_code=413, detail=f"listing body is larger than {cls.max_body_bytes} bytes")
+        reader = _BodyReader(request.stream(), cls.max_body_bytes)
+        try:
+            if ijson is not None:
+                body = await cls.parse_stream(reader)
+            else:
+                chunks = []
+                chunk = await reader.read()
+                while chunk:
+                    chunks.append(chunk)
+                    chunk = await reader.read()
+                body = cls.compact_lists(utils.loads(b"".join(chunks))) if chunks else None
+        except FastapiListingRequestSemanticApiException:
+            raise
+        except Exception:
+            if not reader.size:
+                # empty body, listing defaults apply
+                return {}
+            raise FastapiListingRequestSemanticApiException(status_code=422, detail="listing body is not valid json")
+        if body is None:
+            return {}
+        if not isinstance(body, dict):
+            raise FastapiListingRequestSemanticApiException(status_code=422,
+                                                            detail="listing body should be a json object")
+        return body
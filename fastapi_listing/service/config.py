@@ -1,4 +1,4 @@
-from typing import Optional, Type
+from typing import Optional, Type, List
 
 try:
     from typing import Literal, TypedDict
@@ -6,6 +6,10 @@ except ImportError:
     from typing_extensions import Literal, TypedDict
 
 from fastapi_listing.service.adapters import CoreListingParamsAdapter
+from fastapi_listing.cache.response import ListingResponseCache
+from fastapi_listing.singleflight import SingleFlight
+from fastapi_listing.conditional import HttpCachePolicy
+from fastapi_listing.abstracts import AbsPageEncoder, AbsPageEnricher
 
 
 class ListingMetaData(TypedDict):
@@ -83,6 +87,48 @@ class ListingMetaData(TypedDict):
     Defaults to 'True'
     """
 
+    release_read_session: bool
+    """
+    Give the read session connection back to the pool as soon as the paginator has materialized page rows.
+    Connections are then held only for the database work and not while the page gets validated and encoded.
+    Loaded rows/objects stay readable but lazy relationships and deferred columns of returned entities raise
+    DetachedInstanceError when read afterwards (e.g. by the serializer), load what the page needs eagerly.
+    Defaults to 'False'
+    """
+
+    response_cache: Optional[ListingResponseCache]
+    """
+    Cache listing pages keyed by normalized client params, fields, a scope read from extra_context and
+    generations of involved models (bumped by dao writes).
+    Defaults to 'None'
+    """
+
+    single_flight: Optional[SingleFlight]
+    """
+    Coalesce identical concurrent listing requests, the first one executes and the rest share its page.
+    Defaults to 'None'
+    """
+
+    http_cache: Optional[HttpCachePolicy]
+    """
+    Answer conditional requests (If-None-Match/If-Modified-Since) with 304 without fetching the page and emit
+    ETag, Last-Modified, Cache-Control and surrogate key headers on FastapiListing's response.
+    Defaults to 'None'
+    """
+
+    page_encoder: Optional[AbsPageEncoder]
+    """
+    Render pages into a raw json response bypassing per row response_model validation,
+    e.g. FastJsonPageEncoder or ValidatedPageEncoder.
+    Defaults to 'None'
+    """
+
+    enrichers: Optional[List[AbsPageEnricher]]
+    """
+    Run batched lookups over the whole page rows before serialization, one per enricher e.g. BatchEnricher.
+    Defaults to 'None'
+    """
+
     extra_context: dict
     """
     A common datastructure used to store any context data that a user may wanna pass from router.
@@ -113,6 +159,12 @@ def MetaInfo(
         max_page_size: int = 50,
         feature_params_adapter=CoreListingParamsAdapter,
         allow_count_query_by_paginator: bool = True,
+        release_read_session: bool = False,
+        response_cache: Optional[ListingResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        http_cache: Optional[HttpCachePolicy] = None,
+        page_encoder: Optional[AbsPageEncoder] = None,
+        enrichers: Optional[List[AbsPageEnricher]] = None,
         **extra) -> ListingMetaData:
     """validate passed args"""
     if default_srt_ord not in ["asc", "dsc"]:
@@ -135,4 +187,10 @@ def MetaInfo(
                            max_page_size=max_page_size,
                            feature_params_adapter=feature_params_adapter,
                            allow_count_query_by_paginator=allow_count_query_by_paginator,
+                           release_read_session=release_read_session,
+                           response_cache=response_cache,
+                           single_flight=single_flight,
+                           http_cache=http_cache,
+                           page_encoder=page_encoder,
+                           enrichers=enrichers,
                            extra_context=extra_context)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 
 try:
     from typing import Literal
@@ -13,6 +13,10 @@ from fastapi_listing.dao import dao_factory
 from fastapi_listing.service.adapters import CoreListingParamsAdapter
 from fastapi_listing.errors import MissingSessionError
 from fastapi_listing.service.config import ListingMetaData
+from fastapi_listing.cache.response import ListingResponseCache
+from fastapi_listing.singleflight import SingleFlight
+from fastapi_listing.conditional import HttpCachePolicy
+from fastapi_listing.abstracts import AbsPageEncoder, AbsPageEnricher
 
 
 __all__ = [
@@ -37,6 +41,12 @@ class ListingService(ListingServiceBase):  # noqa
     default_dao: GenericDao = GenericDao
     feature_params_adapter = CoreListingParamsAdapter
     allow_count_query_by_paginator: bool = True
+    release_read_session: bool = False
+    response_cache: Optional[ListingResponseCache] = None
+    single_flight: Optional[SingleFlight] = None
+    http_cache: Optional[HttpCachePolicy] = None
+    page_encoder: Optional[AbsPageEncoder] = None
+    enrichers: Optional[List[AbsPageEnricher]] = None
 
     # pydantic_serializer: Type[BaseModel] = None
     # allowed_pydantic_custom_fields: bool = False
@@ -99,4 +109,12 @@ class ListingService(ListingServiceBase):  # noqa
                                max_page_size=self.max_page_size,
                                feature_params_adapter=self.feature_params_adapter,
                                allow_count_query_by_paginator=self.allow_count_query_by_paginator,
+                               release_read_session=self.release_read_session,
+                               response_cache=self.response_cache.for_listing(type(self))
+                               if self.response_cache else None,
+                               single_flight=self.single_flight.for_listing(type(self))
+                               if self.single_flight else None,
+                               http_cache=self.http_cache,
+                               page_encoder=self.page_encoder,
+                               enrichers=self.enrichers,
                                extra_context=self.extra_context)
@@ -0,0 +1,23 @@
+__all__ = ["register_write_listener", "unregister_write_listener", "notify_write"]
+
+from typing import Callable, List, Any
+
+# callables notified with the dao object every time a dao write method succeeds
+_write_listeners: List[Callable[[Any], None]] = []
+
+
+def register_write_listener(listener: Callable[[Any], None]) -> None:
+    if not callable(listener):
+        raise ValueError(f"write listener should be a callable, got {listener!r}")
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def unregister_write_listener(listener: Callable[[Any], None]) -> None:
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def notify_write(dao) -> None:
+    for listener in list(_write_listeners):
+        listener(dao)
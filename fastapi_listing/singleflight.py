@@ -0,0 +1,119 @@
+__all__ = ["SingleFlight"]
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future, CancelledError, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional, Tuple, Any, Awaitable
+
+from fastapi_listing.cache.keys import listing_request_key
+
+# result of a flight whose leader got cancelled, followers retry instead of sharing leader's cancellation
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent listing requests.
+
+    The first caller for a key executes, identical callers arriving while it is in flight wait on and share
+    its result (or its error) instead of firing the same count and page queries again.
+    Works for sync callers in threadpool and for asyncio callers, both wait on the same flight.
+
+    Keys are built out of canonical client params, fields, an optional scope read from extra_context[scope_key]
+    and generation of dao model, so a request arriving after a write never shares a flight started before it.
+
+    timeout - seconds a follower waits on the flight before executing on its own, None waits forever.
+    A leader cancelled (client went away) or interrupted abandons its flight, its followers join a new flight.
+
+    Coalescing is per process, every worker coalesces its own callers.
+    """
+
+    def __init__(self, *, timeout: Optional[float] = None, namespace: Optional[str] = None,
+                 scope_key: str = "cache_scope"):
+        self.timeout = timeout
+        self.namespace = namespace
+        self.scope_key = scope_key
+        self._flights: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def for_listing(self, listing_cls: type) -> "SingleFlight":
+        """Same flights (shared registry) namespaced for given listing service class."""
+        if self.namespace:
+            return self
+        bound = copy.copy(self)
+        bound.namespace = f"{listing_cls.__module__}.{listing_cls.__qualname__}"
+        return bound
+
+    def build_key(self, listing, listing_meta_info) -> Optional[str]:
+        return listing_request_key(listing, listing_meta_info, namespace=self.namespace, scope_key=self.scope_key)
+
+    def __len__(self):
+        return len(self._flights)
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Future()
+            return flight, True
+
+    def _land(self, key: str, flight: Future):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _settle(self, key: str, flight: Future, result: Any = None, error: Optional[BaseException] = None):
+        """Hand leader's outcome over to followers and land the flight."""
+        try:
+            if error is None:
+                flight.set_result(result)
+            elif isinstance(error, (asyncio.CancelledError, CancelledError)) or not isinstance(error, Exception):
+                # leader's own cancellation, not an outcome of the flight
+                flight.set_result(_ABANDONED)
+            else:
+                flight.set_exception(error)
+        finally:
+            self._land(key, flight)
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Execute fn once for concurrent callers of key.
+        Returns (result, shared), shared tells if result came from another caller's flight.
+        """
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    self._settle(key, flight, error=e)
+                    raise
+                self._settle(key, flight, result)
+                return result, False
+            try:
+                result = flight.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                return fn(*args, **kwargs), False
+            if result is not _ABANDONED:
+                return result, True
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """Same as do for coroutine functions, the event loop isn't blocked while waiting on a flight."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    self._settle(key, flight, error=e)
+                    raise
+                self._settle(key, flight, result)
+                return result, False
+            try:
+                result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(flight)), self.timeout)
+            except asyncio.TimeoutError:
+                return await fn(*args, **kwargs), False
+            if result is not _ABANDONED:
+                return result, True
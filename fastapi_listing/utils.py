@@ -1,12 +1,54 @@
-__all__ = ['dictify_query_params']
+__all__ = ['dictify_query_params', 'loads', 'canonical_json', 'fingerprint']
 
 import json
+import hashlib
+import re
+from array import array
 from urllib.parse import unquote
 from typing import Union, List, Optional, Type
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson reads integers wider than 64 bits as floats (older versions reject them), json keeps them exact
+_WIDE_INT = re.compile(r"[0-9]{19,}")
+_WIDE_INT_BYTES = re.compile(rb"[0-9]{19,}")
+
+
+def loads(data: Union[str, bytes]):
+    """json.loads, with orjson when it is installed and data holds no integer it can't read exactly."""
+    if orjson is not None:
+        wide_int = _WIDE_INT_BYTES if isinstance(data, (bytes, bytearray)) else _WIDE_INT
+        if not wide_int.search(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(data)
+
 
 def dictify_query_params(query_param_string: str) -> Union[dict, List[dict]]:
-    return json.loads(unquote(query_param_string or "") or "[]")
+    return loads(unquote(query_param_string or "") or "[]")
+
+
+def _canonical_default(value):
+    # typed arrays (id lists read from listing bodies) render like lists
+    if isinstance(value, array):
+        return value.tolist()
+    return str(value)
+
+
+def canonical_json(obj) -> str:
+    """Stable json representation, equal objects always serialize to the same string."""
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_canonical_default)
+
+
+def fingerprint(obj) -> str:
+    """Short stable hash of any json serializable object."""
+    return hashlib.sha256(canonical_json(obj).encode()).hexdigest()[:32]
 
 
 try:
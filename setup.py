@@ -65,5 +65,14 @@ setuptools.setup(
             "mysqlclient",
             "pytest-cov==4.1.0"
         ],
+        "orjson": [
+            "orjson>=3.6.0"
+        ],
+        "arrow": [
+            "pyarrow>=7.0.0"
+        ],
+        "ijson": [
+            "ijson>=3.1"
+        ],
     },
 )
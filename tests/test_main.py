@@ -3,6 +3,8 @@ import pytest
 from .fake_listing_setup import  \
     spawn_valueerror_for_strategy_registry, spawn_valueerror_for_filter_factory, invalid_type_factory_keys
 from .test_main_v2 import get_db
+from fastapi_listing.factory import filter_factory
+from fastapi_listing.filters import generic_filters
 import types
 
 app = FastAPI()
@@ -229,3 +231,1565 @@ def test_interceptor_factory():
 
 
 # write test for strategy class
+
+
+def test_dao_release_read_session():
+    from .dao_setup import TitleDao
+
+    class FakeSession:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    read, write = FakeSession(), FakeSession()
+    TitleDao(read_db=read, write_db=write).release_read_session()
+    assert read.closed is True and write.closed is False
+
+    shared = FakeSession()
+    TitleDao(read_db=shared, write_db=shared).release_read_session()
+    assert shared.closed is False
+
+
+def test_replica_set_policies_and_health():
+    from sqlalchemy.exc import OperationalError
+    from fastapi_listing.replicas import ReplicaSet
+
+    def replica_a():
+        return "a"
+
+    def replica_b():
+        return "b"
+
+    def broken():
+        raise OperationalError("select 1", {}, Exception("gone"))
+
+    rr = ReplicaSet([replica_a, replica_b])
+    picked = []
+    for _ in range(4):
+        replica, sess = rr.acquire()
+        picked.append(sess)
+        rr.release(replica)
+    assert picked == ["a", "b", "a", "b"]
+
+    weighted = ReplicaSet([(replica_a, 3), (replica_b, 1)], policy="weighted")
+    picked = []
+    for _ in range(8):
+        replica, sess = weighted.acquire()
+        picked.append(sess)
+        weighted.release(replica)
+    assert picked.count("a") == 6 and picked.count("b") == 2
+
+    least = ReplicaSet([replica_a, replica_b], policy="least_outstanding")
+    busy, _ = least.acquire()
+    assert least.acquire()[1] == "b"
+    least.release(busy)
+
+    # failing replica gets ejected and requests keep flowing to healthy one
+    healthy = ReplicaSet([broken, replica_b], failure_threshold=1, cooldown=60)
+    assert [healthy.acquire()[1] for _ in range(3)] == ["b", "b", "b"]
+    assert healthy.replicas[0].ejected_until > 0
+
+    from sqlalchemy.exc import DisconnectionError, ProgrammingError
+    disconnect = OperationalError("select 1", {}, Exception("gone"), connection_invalidated=True)
+    assert ReplicaSet.is_health_failure(disconnect)
+    assert ReplicaSet.is_health_failure(DisconnectionError("pool pre ping failed"))
+    # lock waits, deadlocks and timeouts don't eject a healthy replica
+    assert not ReplicaSet.is_health_failure(OperationalError("select 1", {}, Exception("lock wait timeout")))
+    assert not ReplicaSet.is_health_failure(ProgrammingError("select", {}, Exception("syntax")))
+    assert not ReplicaSet.is_health_failure(None)
+
+    with pytest.raises(ValueError) as e:
+        ReplicaSet([replica_a], policy="random")
+    assert e.value.args[0] == "Unknown replica policy 'random', allowed ['round_robin', 'least_outstanding', 'weighted']"
+
+
+def test_hedged_paginator_delay():
+    from fastapi_listing.paginator.hedged import LatencyTracker, HedgedPaginationStrategy
+
+    tracker = LatencyTracker(window=100)
+    strategy = HedgedPaginationStrategy()
+    assert tracker.percentile(95) is None
+    assert strategy.hedge_delay(tracker) == HedgedPaginationStrategy.initial_hedge_delay
+    for latency in range(1, 101):
+        tracker.record(latency / 1000)
+    assert tracker.percentile(50) == 0.051
+    assert strategy.hedge_delay(tracker) == 0.095
+    # no replica set routed, hedging falls back to a plain execution
+    assert strategy.hedge("count", "query", lambda qry: qry.upper()) == "QUERY"
+
+
+def test_dao_write_listeners_and_consistency_token():
+    from fastapi_listing import signals
+    from fastapi_listing.consistency import ReadYourWrites
+    from .dao_setup import TitleDao
+
+    written = []
+    signals.register_write_listener(written.append)
+    try:
+        dao = TitleDao()
+        dao.create({"title": "Engineer"})
+        dao.read({"emp_no": 1})
+        dao.delete([1])
+    finally:
+        signals.unregister_write_listener(written.append)
+    assert written == [dao, dao]
+
+    policy = ReadYourWrites(lag_window=5)
+    position = policy.write_position(dao)
+    assert policy.decode_token(policy.encode_token(position)) == position
+    assert policy.replica_caught_up(position, None) is False
+    assert policy.replica_caught_up("0", None) is True
+
+
+def test_dao_factory_request_scoped_cache():
+    from fastapi_listing.dao import dao_factory
+    from fastapi_listing.middlewares import manager
+    from .dao_setup import TitleDao
+
+    dao_factory.register_dao("title_3", TitleDao)
+    with manager(read_ses=object, master=object, implicit_close=False, suppress_warnings=True):
+        replica_dao = dao_factory.create("title_3", replica=True)
+        assert dao_factory.create("title_3", replica=True) is replica_dao
+        assert dao_factory.create("title_3", master=True) is not replica_dao
+        assert dao_factory.create("title_3", replica=True, fresh=True) is not replica_dao
+    with manager(read_ses=object, master=object, implicit_close=False, suppress_warnings=True):
+        assert dao_factory.create("title_3", replica=True) is not replica_dao
+
+
+def test_response_cache_backends_and_generations():
+    from fastapi_listing.cache import InMemoryCacheBackend, PickledCacheBackend, model_generations
+    from .dao_setup import TitleDao
+
+    backend = InMemoryCacheBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+    assert backend.get("b") is None and backend.get("a") == 1 and len(backend) == 2
+    backend.set("d", 4, ttl=-1)
+    assert backend.get("d") is None
+
+    pickled = PickledCacheBackend()
+    page = {"data": [1, 2]}
+    pickled.set("page", page)
+    assert pickled.get("page") == page and pickled.get("page") is not page
+
+    generation = model_generations.get(TitleDao.model)
+    TitleDao().create({"title": "Engineer"})
+    assert model_generations.get(TitleDao.model) == generation + 1
+    assert model_generations.get("titles") == generation + 1
+
+
+def test_count_caching_paginator():
+    from unittest.mock import MagicMock
+    from fastapi_listing.cache import CountCache
+    from fastapi_listing.paginator import CountCachingPaginationStrategy
+
+    cache = CountCache(ttl=10, jitter=0.2)
+    assert all(8 <= cache.entry_ttl() <= 12 for _ in range(100))
+    with pytest.raises(ValueError) as e:
+        CountCache(jitter=1)
+    assert e.value.args[0] == "jitter should be a fraction of ttl between 0 and 1"
+
+    class MyPaginator(CountCachingPaginationStrategy):
+        count_cache = cache
+
+    query = MagicMock()
+    query.count.return_value = 42
+    context = {"listing_key": "emp", "applied_filters": [{"field": "a", "value": 1}, {"field": "b", "value": 2}]}
+    first, second = MyPaginator(), MyPaginator()
+    first.set_extra_context(context)
+    second.set_extra_context(dict(context, applied_filters=context["applied_filters"][::-1]))
+    assert first.get_count(query) == 42 and second.get_count(query) == 42
+    assert query.count.call_count == 1
+    assert first.count_age == 0 and second.count_age >= 0
+
+
+def test_count_token_paginator_and_count_opt_out():
+    from unittest.mock import MagicMock
+    from fastapi_listing.paginator import CountTokenPaginationStrategy, PaginationStrategy
+    from fastapi_listing.paginator.count_cache import filter_set_key
+
+    assert PaginationStrategy.is_count_opted_out({"page": 1, "count": False})
+    assert PaginationStrategy.is_count_opted_out({"page": 1, "count": "false"})
+    assert not PaginationStrategy.is_count_opted_out({"page": 1})
+    # opting out of count is up to each paginator
+    assert not PaginationStrategy.allow_count_opt_out
+
+    with pytest.raises(ValueError) as e:
+        CountTokenPaginationStrategy().sign("hash", 1, 0)
+    assert e.value.args[0] == "CountTokenPaginationStrategy.secret is not set, extend the paginator and set a secret!"
+    # unconfigured token paginators can't be picked by name, they would fail every request
+    from fastapi_listing.factory import strategy_factory
+    assert not strategy_factory.aware_of("count_token_paginator") and not strategy_factory.aware_of("hwm_paginator")
+
+    class MyPaginator(CountTokenPaginationStrategy):
+        secret = "secret"
+
+    query = MagicMock()
+    query.count.return_value = 42
+    context = {"listing_key": "emp", "applied_filters": [{"field": "a", "value": 1}]}
+    first = MyPaginator()
+    first.set_extra_context(context)
+    assert first.get_count(query) == 42
+    token = first.count_token
+    assert first.unsign(token)[:2] == (filter_set_key(context), 42)
+
+    second = MyPaginator()
+    second.set_extra_context(context)
+    second.received_token = token
+    query.count.return_value = 43
+    assert second.get_count(query) == 42 and second.count_token == token
+    second.received_token = token[:-2] + "xx"
+    assert second.get_count(query) == 43
+    assert query.count.call_count == 2
+
+
+def test_single_flight_coalescing():
+    import asyncio
+    import threading
+    import time
+    from fastapi_listing.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.1)
+        return {"data": [value]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", slow, 1))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1] and len(flights) == 0
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+
+    async def aslow(value):
+        calls.append(value)
+        await asyncio.sleep(0.1)
+        return value
+
+    async def main():
+        return await asyncio.gather(*[flights.do_async("key", aslow, 2) for _ in range(5)])
+
+    assert [result for result, _ in asyncio.run(main())] == [2] * 5
+    assert calls == [1, 2]
+
+    with pytest.raises(ZeroDivisionError):
+        flights.do("key", lambda: 1 / 0)
+    assert len(flights) == 0
+
+    async def cancelled_leader():
+        started = asyncio.Event()
+
+        async def build(value):
+            calls.append(value)
+            started.set()
+            await asyncio.sleep(0.1)
+            return value
+
+        leader = asyncio.ensure_future(flights.do_async("key", build, "leader"))
+        await started.wait()
+        followers = [asyncio.ensure_future(flights.do_async("key", build, "follower")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # client of the leader went away, followers don't inherit its cancellation
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert sorted(asyncio.run(cancelled_leader())) == [("follower", False), ("follower", True), ("follower", True)]
+    assert calls[-2:] == ["leader", "follower"] and len(flights) == 0
+
+    class Interrupted(BaseException):
+        pass
+
+    def interrupted():
+        time.sleep(0.05)
+        raise Interrupted()
+
+    follower_results = []
+    leader_thread = threading.Thread(target=lambda: pytest.raises(Interrupted, flights.do, "key", interrupted))
+    leader_thread.start()
+    time.sleep(0.01)
+    follower_results.append(flights.do("key", slow, 3))
+    leader_thread.join()
+    assert follower_results == [({"data": [3]}, False)]
+
+
+def test_space_saving_hot_request_tracker():
+    from fastapi_listing.cache import SpaceSaving, ListingResponseCache
+
+    tracker = SpaceSaving(capacity=2)
+    for key in ["a", "a", "a", "b", "c"]:
+        tracker.offer(key, payload_factory=lambda: key.upper())
+    # c replaced the least frequent b and inherited its count as error
+    assert tracker.top(2) == [("a", 3, 0.0), ("c", 2, 1)]
+    assert tracker.payload("c") == "C" and "b" not in tracker
+    tracker.decay(0.2)
+    assert [key for key, _, _ in tracker.top(2)] == ["a"]
+
+    with pytest.raises(ValueError) as e:
+        ListingResponseCache(stale_ttl=10)
+    assert e.value.args[0] == "stale_ttl needs a prewarmer to revalidate stale pages"
+
+
+def test_http_cache_policy_conditional_checks():
+    import datetime
+    from starlette.requests import Request
+    from fastapi_listing.conditional import HttpCachePolicy
+
+    def request(**headers):
+        return Request({"type": "http", "headers": [(k.lower().replace("_", "-").encode(), v.encode())
+                                                    for k, v in headers.items()]})
+
+    modified = datetime.datetime(2024, 1, 1, 10, 0, 0, 500)
+    assert HttpCachePolicy.http_date(modified) == "Mon, 01 Jan 2024 10:00:00 GMT"
+    assert HttpCachePolicy.is_not_modified(request(If_None_Match='W/"abc", "def"'), "abc", None)
+    assert not HttpCachePolicy.is_not_modified(request(If_None_Match='"def"'), "abc", modified)
+    assert HttpCachePolicy.is_not_modified(request(If_Modified_Since="Mon, 01 Jan 2024 10:00:00 GMT"), "abc", modified)
+    assert not HttpCachePolicy.is_not_modified(request(If_Modified_Since="Mon, 01 Jan 2024 09:59:59 GMT"), "abc",
+                                               modified)
+    assert not HttpCachePolicy.is_not_modified(None, "abc", modified)
+
+
+def test_id_hydrating_paginator_keys():
+    from sqlalchemy.orm import Query
+    from fastapi_listing.paginator import IdHydratingPaginationStrategy
+    from fastapi_listing.cache import model_generations
+    from .dao_setup import Employee, DeptEmp, EmployeeDao
+
+    paginator = IdHydratingPaginationStrategy()
+    query = Query([Employee.first_name, Employee.last_name])
+    assert paginator.get_primary_key(query) == (Employee, "emp_no")
+    assert paginator.get_primary_key(Query([DeptEmp.emp_no])) == (DeptEmp, None)
+
+    keys = paginator.row_keys(query, Employee, [1, 2])
+    assert keys[0].startswith("fl:row:employees:") and keys[0].endswith(":1")
+    assert paginator.row_keys(Query([Employee.first_name]), Employee, [1])[0] != keys[0]
+    model_generations.bump(EmployeeDao.model)
+    assert paginator.row_keys(query, Employee, [1, 2]) != keys
+
+
+def test_id_snapshot_paginator_identity():
+    from array import array
+    from fastapi_listing.paginator import IdSnapshotPaginationStrategy
+
+    assert IdSnapshotPaginationStrategy.pack([3, 1, 2]) == array("q", [3, 1, 2])
+    assert IdSnapshotPaginationStrategy.pack(["d001", "d002"]) == ["d001", "d002"]
+
+    paginator = IdSnapshotPaginationStrategy()
+    assert paginator.get_snapshot_identity() is None
+    paginator.set_extra_context({"listing_key": "emp", "applied_filters": [],
+                                 "applied_sorts": [{"field": "emp_no", "type": "asc"}]})
+    identity = paginator.get_snapshot_identity()
+    paginator.extra_context["applied_sorts"] = [{"field": "emp_no", "type": "dsc"}]
+    assert paginator.get_snapshot_identity() != identity
+
+
+def test_high_water_mark_paginator_tokens():
+    import time
+    from fastapi_listing.paginator import HighWaterMarkPaginationStrategy, CountTokenPaginationStrategy
+
+    with pytest.raises(ValueError):
+        HighWaterMarkPaginationStrategy().sign_payload([1])
+
+    class Paginator(HighWaterMarkPaginationStrategy):
+        secret = "secret"
+
+    paginator = Paginator()
+    token = paginator.sign_payload(["filters", 10200, 300, 1700000000])
+    assert paginator.unsign_payload(token) == ["filters", 10200, 300, 1700000000]
+    assert paginator.unsign_payload(token[:-1]) is None
+    assert type("Other", (CountTokenPaginationStrategy,), {"secret": "other"})().unsign_payload(token) is None
+
+    paginator.received_token = paginator.sign_payload(["filters", 10200, 300, int(time.time())])
+    column = type("Column", (), {"type": None})()
+    assert paginator.read_token(column, "filters")[:2] == (10200, 300)
+    assert paginator.read_token(column, "other filters") is None
+    paginator.received_token = token
+    assert paginator.read_token(column, "filters") is None
+
+
+def test_boundary_index_paginator_seek_keys():
+    from sqlalchemy.orm import Query
+    from fastapi_listing.paginator import BoundaryIndexPaginationStrategy
+    from .dao_setup import Employee
+
+    query = Query([Employee.first_name])
+    assert BoundaryIndexPaginationStrategy.get_seek_keys(query) is None
+    keys, descending = BoundaryIndexPaginationStrategy.get_seek_keys(
+        query.order_by(Employee.hire_date.desc(), Employee.emp_no.desc()))
+    assert descending and [key.name for key in keys] == ["hire_date", "emp_no"]
+    assert BoundaryIndexPaginationStrategy.get_seek_keys(
+        query.order_by(Employee.hire_date.desc(), Employee.emp_no.asc())) is None
+
+    paginator = BoundaryIndexPaginationStrategy()
+    assert paginator.get_index_key(Employee) is None
+    paginator.set_extra_context({"listing_key": "emp", "applied_filters": [],
+                                 "applied_sorts": [{"field": "hire_date", "type": "dsc"}]})
+    key = paginator.get_index_key(Employee)
+    paginator.stride = 500
+    assert paginator.get_index_key(Employee) != key
+
+
+def test_page_encoders():
+    import datetime
+    import decimal
+    import json
+    from pydantic import BaseModel, Field
+    from starlette.responses import Response
+    from fastapi_listing.encoders import FastJsonPageEncoder, ValidatedPageEncoder, PageEncoder
+    from fastapi_listing.encoders.base import splice_page
+    from fastapi_listing.encoders.json_encoders import serializer_fields
+    from fastapi_listing.utils import IS_PYDANTIC_V2
+    if IS_PYDANTIC_V2:
+        from pydantic import ConfigDict
+
+    class Out(BaseModel):
+        emp_no: int = Field(alias="empid")
+        first_name: str
+        salary: decimal.Decimal
+        hired: datetime.date
+        note: str = "-"
+        if IS_PYDANTIC_V2:
+            model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+        else:
+            class Config:
+                orm_mode = True
+                allow_population_by_field_name = True
+
+    assert serializer_fields(Out) == [("emp_no", "empid", None), ("first_name", "first_name", None),
+                                      ("salary", "salary", None), ("hired", "hired", None), ("note", "note", "-")]
+    assert splice_page({"hasNext": False, "data": None}, b"[1]") == b'{"hasNext":false,"data":[1]}'
+    assert splice_page({"data": None}, b"[]") == b'{"data":[]}'
+
+    class NoDataEncoder(PageEncoder):
+        media_type = "application/x-rows"
+
+    # encoders without encode_data fail on construction, not while answering a request
+    with pytest.raises(TypeError):
+        NoDataEncoder()
+
+    row = type("Row", (), {"_mapping": {"emp_no": 1, "first_name": "a", "salary": decimal.Decimal("1.50"),
+                                        "hired": datetime.date(2020, 1, 2)}})()
+    listing = type("Listing", (), {"pydantic_serializer": Out, "response": None, "fields_to_fetch": []})()
+    page = {"hasNext": False, "totalCount": 1, "data": [row]}
+    expected = {"hasNext": False, "totalCount": 1,
+                "data": [{"empid": 1, "first_name": "a", "salary": "1.50", "hired": "2020-01-02", "note": "-"}]}
+    assert json.loads(FastJsonPageEncoder().encode(listing, page).body) == expected
+    assert json.loads(ValidatedPageEncoder().encode(
+        listing, dict(page, data=[type("Row", (), row._mapping)()])).body) == expected
+
+    listing.response = Response(headers={"ETag": '"abc"'})
+    listing.response.set_cookie("a", "1")
+    listing.response.set_cookie("b", "2")
+    response = FastJsonPageEncoder().encode(listing, page)
+    # every cookie is carried over, not just the last one
+    assert [value for key, value in response.raw_headers if key == b"set-cookie"] == [
+        value for key, value in listing.response.raw_headers if key == b"set-cookie"]
+    assert len(response.headers.getlist("set-cookie")) == 2 and response.headers["etag"] == '"abc"'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["content-length"] == str(len(response.body))
+
+
+def test_database_json_paginator():
+    import json
+    from pydantic import BaseModel, Field
+    from sqlalchemy import create_engine, event, Column, Integer, String
+    from sqlalchemy.orm import declarative_base, Session
+    from fastapi_listing.encoders import RawJson
+    from fastapi_listing.paginator import DatabaseJsonPaginationStrategy
+
+    Base = declarative_base()
+
+    class Item(Base):
+        __tablename__ = "items"
+        id = Column(Integer, primary_key=True)
+        name = Column(String(10))
+
+    class ItemOut(BaseModel):
+        id: int = Field(alias="itemId")
+        name: str
+        tag: str = "-"
+
+    class Paginator(DatabaseJsonPaginationStrategy):
+        serializer = ItemOut
+        allow_count_opt_out = True
+
+    class RowJoiningPaginator(Paginator):
+        json_array_functions = {}
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        session.add_all([Item(id=pos, name=f"n{pos}") for pos in range(1, 6)])
+        session.commit()
+        query = session.query(Item.id, Item.name).order_by(Item.id.desc())
+        statements.clear()
+        page = Paginator().paginate(query, {"page": 2, "pageSize": 2}, {})
+        assert isinstance(page["data"], RawJson) and page["totalCount"] == 5
+        assert json.loads(page["data"]) == [{"itemId": 3, "name": "n3", "tag": "-"},
+                                            {"itemId": 2, "name": "n2", "tag": "-"}]
+        # database hands over the whole page array as a single value
+        assert len(statements) == 2 and "json_group_array" in statements[1]
+        assert RowJoiningPaginator().paginate(query, {"page": 2, "pageSize": 2}, {})["data"] == page["data"]
+
+        page = Paginator().paginate(query, {"page": 2, "pageSize": 2, "count": False}, {"field_list": ["name"]})
+        assert json.loads(page["data"]) == [{"itemId": 3, "name": "n3", "tag": "-"},
+                                            {"itemId": 2, "name": "n2", "tag": "-"}] and page["hasNext"]
+        page = DatabaseJsonPaginationStrategy().paginate(query, {"page": 3, "pageSize": 2},
+                                                         {"field_list": ["name"]})
+        assert json.loads(page["data"]) == [{"name": "n1"}] and not page["hasNext"]
+        page = Paginator().paginate(query, {"page": 3, "pageSize": 2, "count": False}, {})
+        assert json.loads(page["data"]) == [{"itemId": 1, "name": "n1", "tag": "-"}] and not page["hasNext"]
+        assert Paginator().paginate(query, {"page": 9, "pageSize": 2}, {})["data"] == b"[]"
+
+
+def test_export_row_stream_encoders():
+    import datetime
+    from fastapi_listing.encoders import NdjsonRowEncoder, CsvRowEncoder
+    from fastapi_listing.encoders.export import RowStreamEncoder
+
+    fields = [("emp_no", "empid", None), ("hire_date", "hired", None), ("note", "note", None)]
+    rows = [type("Row", (), {"_mapping": {"emp_no": pos, "hire_date": datetime.date(2020, 1, pos)}})()
+            for pos in range(1, 4)]
+    chunks = list(NdjsonRowEncoder().stream(rows, fields, 2))
+    assert chunks == [b'{"empid":1,"hired":"2020-01-01","note":null}\n{"empid":2,"hired":"2020-01-02","note":null}\n',
+                      b'{"empid":3,"hired":"2020-01-03","note":null}\n']
+    chunks = list(CsvRowEncoder().stream(iter(rows), fields, 2))
+    assert len(chunks) == 3
+    assert b"".join(chunks).decode().splitlines() == ["empid,hired,note", "1,2020-01-01,", "2,2020-01-02,",
+                                                      "3,2020-01-03,"]
+    assert list(CsvRowEncoder().stream([], fields, 2)) == [b"empid,hired,note\r\n"]
+
+    class TsvRowEncoder(RowStreamEncoder):
+        media_type = "text/tab-separated-values"
+
+    # encoders without encode_rows fail on construction, not halfway through a stream
+    with pytest.raises(TypeError):
+        TsvRowEncoder()
+
+
+def test_negotiating_columnar_page_encoder():
+    import json
+    from fastapi_listing.encoders import NegotiatingPageEncoder, ColumnarJsonPageEncoder, FastJsonPageEncoder
+
+    assert NegotiatingPageEncoder.parse_accept("text/html;q=0.2, application/x-a, application/x-b;q=0.9, x/y;q=0") == [
+        "application/x-a", "application/x-b", "text/html"]
+    columnar, fast = ColumnarJsonPageEncoder(), FastJsonPageEncoder()
+    encoder = NegotiatingPageEncoder({ColumnarJsonPageEncoder.media_type: columnar}, default=fast)
+
+    def request(accept):
+        return type("Request", (), {"headers": {"accept": accept}})()
+
+    assert encoder.select(request(f"application/json, {ColumnarJsonPageEncoder.media_type}")) is fast
+    assert encoder.select(request(f"{ColumnarJsonPageEncoder.media_type}, application/json;q=0.5")) is columnar
+    assert encoder.select(None) is fast
+
+    row = type("Row", (), {"_mapping": {"emp_no": 1, "first_name": "a"}})()
+    listing = type("Listing", (), {"pydantic_serializer": None, "response": None, "request": request("*/*"),
+                                   "fields_to_fetch": ["emp_no", "first_name"]})()
+    page = {"hasNext": False, "totalCount": 1, "data": [row]}
+    response = columnar.encode(listing, page)
+    assert json.loads(response.body) == {"hasNext": False, "totalCount": 1,
+                                         "data": {"columns": ["emp_no", "first_name"], "values": [[1, "a"]]}}
+    assert NegotiatingPageEncoder().encode(listing, page) is page
+
+
+def test_partitioned_scan(tmp_path):
+    from sqlalchemy import create_engine, Column, Integer, String
+    from sqlalchemy.orm import declarative_base, Session, sessionmaker
+    from fastapi_listing.partitions import PartitionedScan
+
+    Base = declarative_base()
+
+    class Item(Base):
+        __tablename__ = "items"
+        id = Column(Integer, primary_key=True)
+        code = Column(String(10), unique=True)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'items.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Item(id=pos * 3, code=f"c{pos:03}") for pos in range(1, 101)])
+        session.commit()
+        query = session.query(Item.code).filter(Item.id > 30).order_by(Item.code.desc())
+        scan = PartitionedScan(query, partitions=4, batch_size=7)
+        assert scan.partition_bounds() == [(33, 100), (100, 167), (167, 234), (234, None)]
+        assert PartitionedScan(query, partitions=4, split="quantiles").partition_starts() == [33, 102, 171, 237]
+        for session_factory in (None, sessionmaker(engine)):
+            batches = list(PartitionedScan(query, partitions=3, batch_size=7, session_factory=session_factory))
+            assert max(len(batch) for batch in batches) == 7
+            assert sorted(row.code for batch in batches for row in batch) == [f"c{pos:03}" for pos in range(11, 101)]
+            assert {tuple(row._mapping) for batch in batches for row in batch} == {("code",)}
+            entity_batches = list(PartitionedScan(session.query(Item).filter(Item.id > 30), partitions=3,
+                                                  batch_size=7, session_factory=session_factory))
+            assert {type(row) for batch in entity_batches for row in batch} == {Item}
+            assert sorted(row.id for batch in entity_batches for row in batch) == list(range(33, 301, 3))
+    engine.dispose()
+
+
+def test_export_job_store_and_ranges(tmp_path):
+    from fastapi_listing.exports import ExportJob, ExportJobManager, FileExportJobStore
+
+    parse_range = ExportJobManager.parse_range
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-30", 100) == (70, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+
+    store = FileExportJobStore(str(tmp_path / "jobs"))
+    job = ExportJob(job_id="j1", status="done", export_format="csv", filename="export.csv", created_at=1.0, size=4)
+    store.save(job)
+    assert store.get("j1") == job and store.get("j1").is_finished
+    store.delete("j1")
+    assert store.get("j1") is None
+
+    manager = ExportJobManager(lambda: None, spool_dir=str(tmp_path / "spool"), store=store)
+    store.save(job)
+    with open(manager.spool_path(job), "wb") as file:
+        file.write(b"abcd")
+    request = type("Request", (), {"headers": {"range": "bytes=1-"}})()
+    response = manager.download_response("j1", request)
+    assert response.status_code == 206 and response.headers["content-range"] == "bytes 1-3/4"
+    assert manager.download_response("j2").status_code == 404
+    store.save(job._replace(job_id="j3", status="running"))
+    assert manager.download_response("j3").status_code == 409
+    manager.shutdown()
+
+
+def test_batch_enricher():
+    import pickle
+    from collections import namedtuple
+    from types import SimpleNamespace
+    from fastapi_listing.enrichers import BaseBatchEnricher, BatchEnricher, EnrichedRow
+
+    Row = namedtuple("Row", ["emp_no", "first_name"])
+    rows = [Row(1, "a"), Row(2, "b"), Row(1, "c"), Row(None, "d")]
+    calls = []
+
+    def load_titles(listing, keys):
+        calls.append(keys)
+        return {1: "engineer"}
+
+    cache = {}
+    titles = BatchEnricher("emp_no", "title", load_titles, default="-")
+    enriched = titles.enrich(None, rows, cache)
+    assert calls == [[1, 2]]
+    assert [(row.first_name, row.title) for row in enriched] == [("a", "engineer"), ("b", "-"), ("c", "engineer"),
+                                                                 ("d", "-")]
+    # keys loaded for the request are not looked up again
+    BatchEnricher("emp_no", "job", load_titles).enrich(None, rows[:2], cache)
+    assert calls == [[1, 2]]
+
+    class NoLoadEnricher(BaseBatchEnricher):
+        pass
+
+    class DeptEnricher(BaseBatchEnricher):
+        def load(self, listing, keys):
+            return {key: f"d{key}" for key in keys}
+
+    # enrichers without load fail on construction, not while enriching a page
+    with pytest.raises(TypeError):
+        NoLoadEnricher("emp_no", "dept")
+    assert [row.dept for row in DeptEnricher("emp_no", "dept").enrich(None, rows, cache)] == ["d1", "d2", "d1", None]
+
+    row = pickle.loads(pickle.dumps(EnrichedRow(EnrichedRow(SimpleNamespace(emp_no=1), {"title": "engineer"}),
+                                                {"dept": "d1"})))
+    assert (row.emp_no, row.title, row.dept) == (1, "engineer", "d1")
+    assert getattr(row, "_mapping", None) is None
+
+
+def test_params_adapter_parse_once_limits_and_fingerprint():
+    import json
+    import pytest
+    from fastapi_listing import utils
+    from fastapi_listing.errors import FastapiListingRequestSemanticApiException
+    from fastapi_listing.service.adapters import CoreListingParamsAdapter
+
+    filters = [{"field": "eno", "value": {"list": [3, 1, 2]}}, {"field": "gdr", "value": {"search": "M"}}]
+    adapter = CoreListingParamsAdapter(None, {"filter": json.dumps(filters)})
+    assert adapter.get("filter") == filters and adapter.get("filter") is adapter.get("filter")
+    assert adapter.get("sort") == []
+    reordered = [{"field": "gdr", "value": {"search": "M"}}, {"field": "eno", "value": {"list": [2, 3, 1, 3]}}]
+    assert adapter.fingerprint(10) == CoreListingParamsAdapter(None, {"filter": json.dumps(reordered)}).fingerprint(10)
+    assert adapter.fingerprint(10) != adapter.fingerprint(20)
+    # per request paginator tokens don't split caches and flights, count opt out does change the page
+    paged = {"filter": json.dumps(filters), "pagination": json.dumps({"page": 2, "pageSize": 5})}
+    fingerprint = CoreListingParamsAdapter(None, paged).fingerprint(10)
+    for token in ("countToken", "snapshot", "pageToken"):
+        assert CoreListingParamsAdapter(None, dict(paged, pagination=json.dumps(
+            {"page": 2, "pageSize": 5, token: "t1"}))).fingerprint(10) == fingerprint
+    assert CoreListingParamsAdapter(None, dict(paged, pagination=json.dumps(
+        {"page": 2, "pageSize": 5, "count": False}))).fingerprint(10) != fingerprint
+    # integers wider than 64 bits stay exact whichever json parser is installed
+    wide = [{"field": "eno", "value": {"list": [2 ** 70, -2 ** 64, 1]}}]
+    assert CoreListingParamsAdapter(None, {"filter": json.dumps(wide)}).get("filter") == wide
+    assert utils.loads(b"[18446744073709551616, 1.5]") == [18446744073709551616, 1.5]
+    assert utils.loads('{"a": [9223372036854775807]}') == {"a": [9223372036854775807]}
+
+    class SmallAdapter(CoreListingParamsAdapter):
+        max_param_bytes = 100
+        max_param_items = 10
+
+    with pytest.raises(FastapiListingRequestSemanticApiException) as exc:
+        SmallAdapter(None, {"filter": json.dumps([{"field": "eno", "value": {"list": list(range(50))}}])}).get("filter")
+    assert exc.value.status_code == 413
+    with pytest.raises(FastapiListingRequestSemanticApiException) as exc:
+        SmallAdapter(None, {"filter": json.dumps([{"field": "eno", "value": {"list": list(range(10))}}])}).get("filter")
+    assert exc.value.status_code == 422
+
+
+def test_compact_params_adapter():
+    import pytest
+    from fastapi_listing.service.adapters import CompactListingParamsAdapter, build_compact_query
+
+    params = {"filter[gdr]": "M", "filter[eno][in]": "3,1,2", "filter[hdt][start]": "1", "filter[hdt][end]": "2",
+              "sort": "-hdt,fnm", "page": "2", "pageSize": "25", "count": "false"}
+    adapter = CompactListingParamsAdapter(None, params)
+    assert adapter.get("filter") == [{"field": "gdr", "value": {"search": "M"}},
+                                     {"field": "eno", "value": {"list": ["3", "1", "2"]}},
+                                     {"field": "hdt", "value": {"start": "1", "end": "2"}}]
+    assert adapter.get("sort") == [{"field": "hdt", "type": "dsc"}, {"field": "fnm", "type": "asc"}]
+    assert adapter.get("pagination") == {"page": 2, "pageSize": 25, "count": False}
+    assert adapter.canonical_query_string() == ("filter[eno][in]=1,2,3&filter[gdr]=M&filter[hdt][start]=1"
+                                                "&filter[hdt][end]=2&sort=-hdt,fnm&page=2&pageSize=25&count=false")
+    reordered = dict(reversed(list(params.items())), **{"filter[eno][in]": "2,3,1,1"})
+    assert CompactListingParamsAdapter(None, reordered).canonical_query_string() == adapter.canonical_query_string()
+    assert CompactListingParamsAdapter(None, {}).get("pagination") == {}
+    assert build_compact_query([{"field": "lnm", "value": {"search": "a&b"}}]) == "filter[lnm]=a%26b"
+    with pytest.raises(ValueError):
+        CompactListingParamsAdapter(None, {"filter[gdr][unknown]": "M"}).get("filter")
+
+
+def test_body_params_adapter():
+    import asyncio
+    import json
+    import pytest
+    from array import array
+    from fastapi_listing.errors import FastapiListingRequestSemanticApiException
+    from fastapi_listing.service import adapters
+    from fastapi_listing.utils import canonical_json
+
+    class BodyRequest:
+        def __init__(self, body: bytes):
+            self.body = body
+            self.headers = {"content-length": str(len(body))}
+
+        async def stream(self):
+            for pos in range(0, len(self.body), 7):
+                yield self.body[pos:pos + 7]
+
+    body = {"filter": [{"field": "gdr", "value": {"search": "M"}}, {"field": "eno", "value": {"list": [3, 1, 2]}},
+                       {"field": "lnm", "value": {"list": ["a", 1]}}],
+            "sort": [{"field": "hdt", "type": "dsc"}], "pagination": {"page": 2, "pageSize": 5}}
+    read = adapters.BodyListingParamsAdapter.read_body
+    parsed = asyncio.run(read(BodyRequest(json.dumps(body).encode())))
+    assert parsed["filter"][1]["value"]["list"] == array("q", [3, 1, 2])
+    assert parsed["filter"][2]["value"]["list"] == ["a", 1]
+    assert json.loads(canonical_json(parsed)) == json.loads(canonical_json(body))
+    adapter = adapters.BodyListingParamsAdapter(None, {"listing_body": parsed})
+    assert adapter.get("sort") == body["sort"] and adapter.get("pagination") == body["pagination"]
+    assert adapter.count_items(adapter.get("filter"), 100) == 18
+    assert asyncio.run(read(BodyRequest(b""))) == {}
+
+    class TinyBodyAdapter(adapters.BodyListingParamsAdapter):
+        max_body_bytes = 10
+
+    for adapter_cls, payload, status_code in ((TinyBodyAdapter, json.dumps(body).encode(), 413),
+                                              (adapters.BodyListingParamsAdapter, b"[1, 2]", 422),
+                                              (adapters.BodyListingParamsAdapter, b"{bad", 422)):
+        with pytest.raises(FastapiListingRequestSemanticApiException) as exc:
+            asyncio.run(adapter_cls.read_body(BodyRequest(payload)))
+        assert exc.value.status_code == status_code
+
+
+def _sqlite_items(tmp_path, count=100):
+    """Sqlite engine with `count` items (id 3, 6, 9...) and their model."""
+    import datetime
+    from sqlalchemy import create_engine, Column, DateTime, Integer, String
+    from sqlalchemy.orm import declarative_base, Session
+
+    Base = declarative_base()
+
+    class Item(Base):
+        __tablename__ = "items"
+        id = Column(Integer, primary_key=True)
+        code = Column(String(10), unique=True)
+        updated_at = Column(DateTime, default=datetime.datetime(2024, 1, 1))
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'items.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([Item(id=pos * 3, code=f"c{pos:03}") for pos in range(1, count + 1)])
+        session.commit()
+    return engine, Item
+
+
+ITEM_FILTERS = {"itemCode": ("items.code", generic_filters.StringStartsWithFilter),
+                "itemId": ("items.id", generic_filters.InDataFilter)}
+filter_factory.register_filter_mapper(ITEM_FILTERS)
+ITEM_SORTS = {"itemId": "id"}
+
+
+def _item_listing(Item):
+    """Dao and aliased serializer listing sqlite items, filters on itemCode go through ITEM_FILTERS."""
+    from pydantic import BaseModel, Field
+    from fastapi_listing.dao import GenericDao
+    from fastapi_listing.utils import IS_PYDANTIC_V2
+    if IS_PYDANTIC_V2:
+        from pydantic import ConfigDict
+
+    class ItemDao(GenericDao):
+        name = "items"
+        model = Item
+
+    class ItemOut(BaseModel):
+        id: int = Field(alias="itemId")
+        code: str = Field(alias="itemCode")
+        if IS_PYDANTIC_V2:
+            model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+        else:
+            class Config:
+                orm_mode = True
+                allow_population_by_field_name = True
+
+    return ItemDao, ItemOut
+
+
+def test_id_hydrating_paginator_rows(tmp_path):
+    from sqlalchemy.orm import Session
+    from fastapi_listing.cache.rows import RowCache
+    from fastapi_listing.paginator import IdHydratingPaginationStrategy
+
+    engine, Item = _sqlite_items(tmp_path, 10)
+
+    class Paginator(IdHydratingPaginationStrategy):
+        row_cache = RowCache()
+
+    with Session(engine) as session:
+        entities = Paginator().get_data(session.query(Item).filter(Item.id > 20).order_by(Item.id.desc()))
+        assert [(type(row), row.id) for row in entities] == [(Item, 30), (Item, 27), (Item, 24), (Item, 21)]
+        columns = Paginator().get_data(session.query(Item.code).filter(Item.id > 20).order_by(Item.id.desc()))
+        assert [tuple(row) for row in columns] == [("c010",), ("c009",), ("c008",), ("c007",)]
+        assert dict(columns[0]._mapping) == {"code": "c010"}
+        # second page read comes out of row cache shaped the same way
+        assert [tuple(row) for row in Paginator().get_data(session.query(Item.code).filter(Item.id > 20)
+                                                               .order_by(Item.id.desc()))] == [tuple(row)
+                                                                                             for row in columns]
+        # expires the instances loaded above, they are detached once the session closes
+        session.commit()
+
+    with Session(engine) as session:
+        hits = Paginator().get_data(session.query(Item).filter(Item.id > 20).order_by(Item.id.desc()))
+        assert [(row.id, row.code, row.updated_at.year) for row in hits] == [
+            (30, "c010", 2024), (27, "c009", 2024), (24, "c008", 2024), (21, "c007", 2024)]
+        assert all(row in session for row in hits) and hits[0] is session.get(Item, 30)
+        # rows of another session's request are its own, cached values aren't touched by changes
+        hits[0].code = "x"
+        session.expire_all()
+        assert hits[1].code == "c009"
+    with Session(engine) as session:
+        assert Paginator().get_data(session.query(Item).filter(Item.id == 30))[0].code == "c010"
+    engine.dispose()
+
+
+def test_id_snapshot_paginator_pages(tmp_path):
+    from sqlalchemy.orm import Session
+    from fastapi_listing.cache.backends import InMemoryCacheBackend
+    from fastapi_listing.cache.rows import RowCache
+    from fastapi_listing.paginator import IdSnapshotPaginationStrategy
+
+    engine, Item = _sqlite_items(tmp_path, 10)
+
+    class Paginator(IdSnapshotPaginationStrategy):
+        snapshot_backend = InMemoryCacheBackend()
+        row_cache = RowCache()
+        allow_count_opt_out = True
+
+    context = {"listing_key": "items", "applied_filters": [], "applied_sorts": [{"field": "id", "type": "dsc"}]}
+    with Session(engine) as session:
+        query = session.query(Item.code).order_by(Item.id.desc())
+        first = Paginator().paginate(query, {"page": 1, "pageSize": 4}, dict(context))
+        assert [tuple(row) for row in first["data"]] == [("c010",), ("c009",), ("c008",), ("c007",)]
+        assert first["totalCount"] == 10 and first["hasNext"] and first["snapshot"]
+        # rows added after the snapshot don't shift pages browsed with its token
+        session.add(Item(id=1000, code="c999"))
+        session.commit()
+        second = Paginator().paginate(query, {"page": 3, "pageSize": 4, "snapshot": first["snapshot"]},
+                                      dict(context))
+        assert [tuple(row) for row in second["data"]] == [("c002",), ("c001",)]
+        assert second["totalCount"] == 10 and not second["hasNext"]
+        assert second["snapshot"] == first["snapshot"]
+
+        no_count = Paginator(fire_count_qry=True).paginate(
+            query, {"page": 2, "pageSize": 4, "snapshot": first["snapshot"], "count": False}, dict(context))
+        assert "totalCount" not in no_count and no_count["snapshot"] == first["snapshot"]
+        assert [tuple(row) for row in no_count["data"]] == [("c006",), ("c005",), ("c004",), ("c003",)]
+        # without a snapshot to browse, opting out of count doesn't take one
+        fresh = Paginator().paginate(query, {"page": 1, "pageSize": 4, "count": False}, dict(context))
+        assert "totalCount" not in fresh and "snapshot" not in fresh
+        assert [tuple(row) for row in fresh["data"]] == [("c999",), ("c010",), ("c009",), ("c008",)]
+    engine.dispose()
+
+
+def test_boundary_index_paginator_pages(tmp_path):
+    import json
+    from urllib.parse import urlencode
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import InMemoryCacheBackend
+    from fastapi_listing.errors import FastAPIListingWarning
+    from fastapi_listing.factory import strategy_factory
+    from fastapi_listing.paginator import BoundaryIndexPaginationStrategy
+
+    engine, Item = _sqlite_items(tmp_path, 23)
+    ItemDao, ItemOut = _item_listing(Item)
+    built = []
+
+    class Paginator(BoundaryIndexPaginationStrategy):
+        stride = 5
+        index_backend = InMemoryCacheBackend()
+        allow_count_opt_out = True
+
+        def build_index(self, query):
+            built.append(self.extra_context["applied_sorts"])
+            return super().build_index(query)
+
+    if not strategy_factory.aware_of("items_boundary_index_paginator"):
+        strategy_factory.register_strategy("items_boundary_index_paginator", Paginator)
+
+    def get_page(strategy, order, pagination):
+        query = urlencode({"sort": json.dumps([{"field": "itemCode", "type": order}]),
+                           "pagination": json.dumps(pagination)})
+        with Session(engine) as session:
+            page = FastapiListing(_listing_request(query), ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+                .get_response(MetaInfo(default_srt_on="items.id", sort_mapper={"itemCode": "code"},
+                                       paginating_strategy=strategy, max_page_size=6))
+        return page["hasNext"], page.get("totalCount"), [tuple(row) for row in page["data"]]
+
+    for order in ("asc", "dsc"):
+        for count in (True, False):
+            # 23 rows in pages of 4, deep pages seek from boundaries of every 5th row, last page holds 3 rows
+            for page_num in range(1, 8):
+                pagination = {"page": page_num, "pageSize": 4, "count": count}
+                has_next, total, rows = get_page("items_boundary_index_paginator", order, pagination)
+                expected = get_page("default_paginator", order, pagination)
+                assert rows == expected[2], (order, count, page_num)
+                # pages without count find the next page by reading one row more
+                assert (has_next, total) == ((expected[0], 23) if count else (page_num * 4 < 23, None))
+            assert len(rows) == 0 and len(expected[2]) == 0
+        assert get_page("items_boundary_index_paginator", order, {"page": 6, "pageSize": 4})[2][-1][1] == \
+            ("c023" if order == "asc" else "c001")
+    assert built == [[{"field": "code", "type": "asc"}], [{"field": "code", "type": "dsc"}]]
+
+    # page size above max_page_size is cut down before the paginator seeks
+    for order in ("asc", "dsc"):
+        for page_num in (1, 3, 4):
+            with pytest.warns(FastAPIListingWarning):
+                page = get_page("items_boundary_index_paginator", order, {"page": page_num, "pageSize": 50})
+            with pytest.warns(FastAPIListingWarning):
+                assert page == get_page("default_paginator", order, {"page": page_num, "pageSize": 50})
+            assert len(page[2]) == (6 if page_num < 4 else 5)
+    engine.dispose()
+
+
+def _listing_request(query_string: str = ""):
+    from starlette.requests import Request
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [],
+                    "query_string": query_string.encode()})
+
+
+def test_export_job_runs_listing(tmp_path):
+    import gzip
+    import os
+    import time
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.exports import ExportJobManager, FileExportJobStore
+    from fastapi.testclient import TestClient
+    from starlette.requests import Request
+
+    engine, Item = _sqlite_items(tmp_path, 30)
+    ItemDao, ItemOut = _item_listing(Item)
+    jobs = ExportJobManager(lambda: Session(engine), spool_dir=str(tmp_path / "spool"),
+                            store=FileExportJobStore(str(tmp_path / "jobs")), chunk_size=4)
+    export_app = FastAPI()
+
+    @export_app.post("/exports")
+    def submit(request: Request):
+        with Session(engine) as session:
+            job = FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut).submit_export(
+                MetaInfo(default_srt_on="items.id", filter_mapper=ITEM_FILTERS, sort_mapper=ITEM_SORTS), jobs,
+                "csv")
+        return {"jobId": job.job_id}
+
+    @export_app.get("/exports/{job_id}")
+    def download(job_id: str, request: Request):
+        return jobs.download_response(job_id, request)
+
+    client = TestClient(export_app)
+    job_id = client.post("/exports", params={"filter": '[{"field": "itemCode", "value": {"search": "c01"}}]',
+                                             "sort": '[{"field": "itemId", "type": "dsc"}]'}).json()["jobId"]
+    deadline = time.time() + 10
+    while jobs.get(job_id).status in ("pending", "running") and time.time() < deadline:
+        time.sleep(0.05)
+    assert jobs.get(job_id).status == "done"
+    assert client.get(f"/exports/{job_id}").status_code == 200
+    with gzip.open(jobs.spool_path(jobs.get(job_id))) as spool:
+        lines = spool.read().decode().splitlines()
+    assert lines[0] == "itemId,itemCode"
+    assert lines[1:] == [f"{pos * 3},c{pos:03}" for pos in range(19, 9, -1)]
+
+    # spool file of a done job cleaned up underneath the job store
+    os.remove(jobs.spool_path(jobs.get(job_id)))
+    gone = client.get(f"/exports/{job_id}", headers={"Range": "bytes=10-"})
+    assert gone.status_code == 410 and gone.json()["status"] == "done"
+
+    # job ids out of token_urlsafe alphabet never reach the filesystem
+    (tmp_path / "outside.json").write_text("{}")
+    jobs.delete("../outside")
+    assert (tmp_path / "outside.json").exists()
+    assert jobs.get("../outside") is None and jobs.download_response("../outside", None).status_code == 404
+    jobs._executor.shutdown()
+    engine.dispose()
+
+
+def test_prewarm_replays_params_past_core_limits(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.parse import urlencode
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import ListingResponseCache, Prewarmer
+    from fastapi_listing.service.adapters import CoreListingParamsAdapter
+
+    class WideParamsAdapter(CoreListingParamsAdapter):
+        max_param_bytes = None
+        max_param_items = None
+
+    engine, Item = _sqlite_items(tmp_path, 30)
+    ItemDao, ItemOut = _item_listing(Item)
+    prewarmer = Prewarmer(lambda: Session(engine))
+    cache = ListingResponseCache(prewarmer=prewarmer)
+    # 12 000 ids, past both limits of CoreListingParamsAdapter
+    query = urlencode({"filter": '[{"field": "itemId", "value": {"list": %s}}]' % list(range(50, 12050))})
+    with Session(engine) as session:
+        page = FastapiListing(_listing_request(query), ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+            .get_response(MetaInfo(default_srt_on="items.id", filter_mapper=ITEM_FILTERS, sort_mapper=ITEM_SORTS,
+                                   feature_params_adapter=WideParamsAdapter, response_cache=cache))
+    assert page["totalCount"] == 14
+    [(hot_key, _, _)] = prewarmer.tracker.top(1)
+    with ThreadPoolExecutor(1) as pool:
+        # refreshes run on prewarmer threads, outside of any request context
+        warmed = pool.submit(prewarmer.warm, prewarmer.tracker.payload(hot_key)).result()
+    assert warmed["totalCount"] == 14 and [tuple(row) for row in warmed["data"]] == [tuple(row)
+                                                                                    for row in page["data"]]
+    prewarmer.stop()
+    engine.dispose()
+
+
+def test_prewarmer_serves_stale_pages_and_replays_parsed_params(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.parse import urlencode
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import ListingResponseCache, Prewarmer
+
+    engine, Item = _sqlite_items(tmp_path, 30)
+    ItemDao, ItemOut = _item_listing(Item)
+    prewarmer = Prewarmer(lambda: Session(engine))
+    cache = ListingResponseCache(ttl=60, stale_ttl=60, prewarmer=prewarmer)
+    session = Session(engine)
+    # a literal % in filter value, starts with "c%30" matches c030 and not every c0..
+    query = urlencode({"filter": '[{"field": "itemCode", "value": {"search": "c%2530"}}]'})
+
+    def listing():
+        return FastapiListing(_listing_request(query), ItemDao(read_db=session), pydantic_serializer=ItemOut)
+
+    meta_info = dict(default_srt_on="items.id", filter_mapper=ITEM_FILTERS, sort_mapper=ITEM_SORTS,
+                     response_cache=cache)
+
+    def add_item(item_id, code):
+        # written around the dao, cached pages stay valid until they expire
+        with Session(engine) as writer:
+            writer.add(Item(id=item_id, code=code))
+            writer.commit()
+
+    assert listing().get_response(MetaInfo(**meta_info))["totalCount"] == 1
+    add_item(1000, "c930")
+    [(hot_key, _, _)] = prewarmer.tracker.top(1)
+    with ThreadPoolExecutor(1) as pool:
+        warmed = pool.submit(prewarmer.warm, prewarmer.tracker.payload(hot_key)).result()
+    assert warmed["totalCount"] == 2
+
+    # warm_response skips cache lookup and stores the fresh page
+    assert listing().warm_response(MetaInfo(**meta_info))["totalCount"] == 2
+    add_item(1001, "c830")
+    assert listing().get_response(MetaInfo(**meta_info))["totalCount"] == 2
+
+    for key in list(cache.backend._store):
+        page, _ = cache.backend.get(key)
+        cache.backend.set(key, (page, 0.0), ttl=60)
+    # expired page is served while a refresh gets scheduled
+    assert listing().get_response(MetaInfo(**meta_info))["totalCount"] == 2
+    prewarmer.close()
+    assert listing().get_response(MetaInfo(**meta_info))["totalCount"] == 3
+    assert not prewarmer.refresh(hot_key)
+    session.close()
+    engine.dispose()
+
+
+def test_body_listing_replays_and_shared_extra_context(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+    from starlette.requests import Request
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import ListingResponseCache, Prewarmer
+
+    engine, Item = _sqlite_items(tmp_path, 30)
+    ItemDao, ItemOut = _item_listing(Item)
+    prewarmer = Prewarmer(lambda: Session(engine))
+    cache = ListingResponseCache(prewarmer=prewarmer)
+    # meta data built once and shared by every request of the route
+    meta_data = MetaInfo(default_srt_on="items.id", filter_mapper=ITEM_FILTERS, sort_mapper=ITEM_SORTS,
+                         response_cache=cache, cache_scope="tenant")
+    body_app = FastAPI()
+
+    @body_app.post("/items/search")
+    async def search(request: Request):
+        with Session(engine) as session:
+            page = await FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+                .aget_body_response(meta_data)
+        return {"totalCount": page["totalCount"]}
+
+    # 12 000 ids, more values than CoreListingParamsAdapter accepts
+    body = {"filter": [{"field": "itemId", "value": {"list": list(range(50, 12050))}}]}
+    assert TestClient(body_app).post("/items/search", json=body).json() == {"totalCount": 14}
+    assert "listing_body" not in meta_data["extra_context"]
+    [(hot_key, _, _)] = prewarmer.tracker.top(1)
+    recipe = prewarmer.tracker.payload(hot_key)
+    assert "listing_body" not in recipe.meta_data["extra_context"]
+    with ThreadPoolExecutor(1) as pool:
+        assert pool.submit(prewarmer.warm, recipe).result()["totalCount"] == 14
+    prewarmer.close()
+    engine.dispose()
+
+
+def test_body_params_parse_stream():
+    import asyncio
+    import json
+    from array import array
+    from fastapi_listing.service.adapters import BodyListingParamsAdapter, _BodyReader
+    pytest.importorskip("ijson")
+
+    async def chunks(payload: bytes):
+        for pos in range(0, len(payload), 5):
+            yield payload[pos:pos + 5]
+
+    body = {"filter": [{"field": "eno", "value": {"list": [3, 1, 2 ** 40]}},
+                       {"field": "lnm", "value": {"list": [1, "a"]}}, {"field": "gdr", "value": {"search": "M"}}],
+            "sort": [{"field": "hdt", "type": "dsc"}], "pagination": {"page": 2, "pageSize": 5, "count": False}}
+    parsed = asyncio.run(BodyListingParamsAdapter.parse_stream(_BodyReader(chunks(json.dumps(body).encode()), None)))
+    assert parsed["filter"][0]["value"]["list"] == array("q", [3, 1, 2 ** 40])
+    assert parsed["filter"][1]["value"]["list"] == [1, "a"]
+    assert parsed["filter"][2] == body["filter"][2]
+    assert parsed["sort"] == body["sort"] and parsed["pagination"] == body["pagination"]
+
+
+def test_count_opt_out_on_listing_page_route(tmp_path):
+    import json
+    from typing import Union
+    from fastapi import Request
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.factory import strategy_factory
+    from fastapi_listing.paginator import ListingPage, ListingPageWithoutCount, PaginationStrategy
+
+    engine, Item = _sqlite_items(tmp_path, 7)
+    ItemDao, ItemOut = _item_listing(Item)
+
+    class CountOptOutPaginator(PaginationStrategy):
+        allow_count_opt_out = True
+
+    if not strategy_factory.aware_of("count_opt_out_items_paginator"):
+        strategy_factory.register_strategy("count_opt_out_items_paginator", CountOptOutPaginator)
+    item_app = FastAPI()
+
+    @item_app.get("/items", response_model=ListingPage[ItemOut])
+    def items(request: Request):
+        with Session(engine) as session:
+            return FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+                .get_response(MetaInfo(default_srt_on="items.id"))
+
+    @item_app.get("/opt-out-items", response_model=Union[ListingPage[ItemOut], ListingPageWithoutCount[ItemOut]])
+    def opt_out_items(request: Request):
+        with Session(engine) as session:
+            return FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+                .get_response(MetaInfo(default_srt_on="items.id",
+                                       paginating_strategy="count_opt_out_items_paginator"))
+
+    item_client = TestClient(item_app)
+    pagination = json.dumps({"page": 1, "pageSize": 5, "count": False})
+    # the param is ignored by listings that didn't opt in, their declared page keeps its count
+    response = item_client.get("/items", params={"pagination": pagination})
+    assert response.status_code == 200
+    assert response.json()["totalCount"] == 7 and len(response.json()["data"]) == 5
+    response = item_client.get("/opt-out-items", params={"pagination": pagination})
+    assert response.status_code == 200
+    assert "totalCount" not in response.json() and response.json()["hasNext"]
+    assert [row["itemId"] for row in response.json()["data"]] == [21, 18, 15, 12, 9]
+    engine.dispose()
+
+
+def test_release_read_session_pipeline(tmp_path):
+    import json
+    from fastapi import Request
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session, defer
+    from sqlalchemy.orm.exc import DetachedInstanceError
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.paginator import ListingPage
+
+    engine, Item = _sqlite_items(tmp_path, 7)
+    ItemDao, ItemOut = _item_listing(Item)
+    checkins, released = [], []
+    event.listen(engine, "checkin", lambda *args: checkins.append(args))
+    item_app = FastAPI()
+
+    @item_app.get("/items", response_model=ListingPage[ItemOut])
+    def items(request: Request):
+        session = Session(engine)
+        page = FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut).get_response(
+            MetaInfo(default_srt_on="items.id", release_read_session=True))
+        # connection is back in the pool before response_model validates and serializes the page
+        released.append((len(checkins), session.in_transaction()))
+        return page
+
+    response = TestClient(item_app).get("/items", params={"pagination": json.dumps({"page": 2, "pageSize": 5})})
+    assert response.status_code == 200 and released == [(1, False)]
+    assert response.json()["totalCount"] == 7
+    assert response.json()["data"] == [{"itemId": 6, "itemCode": "c002"}, {"itemId": 3, "itemCode": "c001"}]
+
+    # loaded attributes of entities stay readable, deferred ones can't be loaded once released
+    with Session(engine) as session:
+        entities = session.query(Item).options(defer(Item.updated_at)).order_by(Item.id).limit(2).all()
+        ItemDao(read_db=session).release_read_session()
+        assert [entity.code for entity in entities] == ["c001", "c002"]
+        with pytest.raises(DetachedInstanceError):
+            entities[0].updated_at
+    engine.dispose()
+
+
+def test_response_cache_keeps_its_own_page(tmp_path):
+    from sqlalchemy.orm import Session
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import ListingResponseCache
+
+    engine, Item = _sqlite_items(tmp_path, 5)
+    ItemDao, ItemOut = _item_listing(Item)
+    cache = ListingResponseCache()
+    with Session(engine) as session:
+        def get_page():
+            return FastapiListing(_listing_request(), ItemDao(read_db=session), pydantic_serializer=ItemOut) \
+                .get_response(MetaInfo(default_srt_on="items.id", response_cache=cache))
+
+        miss = get_page()
+        # callers post-processing their page don't touch the cached one
+        miss["data"].pop()
+        miss["totalCount"] = 0
+        hit = get_page()
+        assert hit["totalCount"] == 5 and len(hit["data"]) == 5
+        hit["data"].clear()
+        assert len(get_page()["data"]) == 5
+    engine.dispose()
+
+
+def test_http_cache_default_validator_sees_other_writers(tmp_path):
+    import datetime
+    from sqlalchemy.orm import Session
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.conditional import HttpCachePolicy
+
+    engine, Item = _sqlite_items(tmp_path, 5)
+    ItemDao, ItemOut = _item_listing(Item)
+    policy = HttpCachePolicy()
+
+    def get_response(etag=None):
+        headers = [(b"if-none-match", etag.encode())] if etag else []
+        request = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+        response = Response()
+        with Session(engine) as session:
+            page = FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut,
+                                  response=response).get_response(MetaInfo(default_srt_on="items.id",
+                                                                           http_cache=policy))
+        return page, response.headers.get("etag")
+
+    page, etag = get_response()
+    assert page["totalCount"] == 5 and etag
+    assert get_response(etag)[0].status_code == 304
+    # written by another worker, around daos
+    with Session(engine) as writer:
+        writer.get(Item, 3).updated_at = datetime.datetime(2024, 1, 2)
+        writer.commit()
+    page, new_etag = get_response(etag)
+    assert page["totalCount"] == 5 and new_etag != etag
+    engine.dispose()
+
+
+def test_export_response_filters_sorts_and_custom_fields(tmp_path):
+    import json
+    from fastapi.testclient import TestClient
+    from pydantic import Field
+    from sqlalchemy.orm import Session
+    from starlette.requests import Request
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.utils import IS_PYDANTIC_V2
+
+    if IS_PYDANTIC_V2:
+        from pydantic import computed_field
+    else:
+        from pydantic import validator
+
+    engine, Item = _sqlite_items(tmp_path, 30)
+    ItemDao, ItemOut = _item_listing(Item)
+
+    class ItemLabelOut(ItemOut):
+        code: str = Field(alias="itemCode", exclude=True)
+        if IS_PYDANTIC_V2:
+            @computed_field(alias="label")
+            @property
+            def label(self) -> str:
+                return f"{self.id}-{self.code}"
+        else:
+            label: str = Field("", alias="label")
+
+            @validator("label", pre=True, always=True)
+            def build_label(cls, v, values) -> str:
+                return f"{values['id']}-{values['code']}"
+
+    export_app = FastAPI()
+
+    @export_app.get("/items/export/{fmt}")
+    def export(fmt: str, request: Request, labels: bool = False):
+        with Session(engine) as session:
+            listing = FastapiListing(request, ItemDao(read_db=session),
+                                     pydantic_serializer=ItemLabelOut if labels else ItemOut, custom_fields=labels)
+            return listing.export_response(MetaInfo(default_srt_on="items.id", filter_mapper=ITEM_FILTERS,
+                                                    sort_mapper=ITEM_SORTS), fmt, chunk_size=4,
+                                           session_factory=lambda: Session(engine))
+
+    client = TestClient(export_app)
+    params = {"filter": '[{"field": "itemCode", "value": {"search": "c01"}}]',
+              "sort": '[{"field": "itemId", "type": "dsc"}]'}
+    csv_lines = client.get("/items/export/csv", params=params).text.splitlines()
+    assert csv_lines == ["itemId,itemCode"] + [f"{pos * 3},c{pos:03}" for pos in range(19, 9, -1)]
+    response = client.get("/items/export/ndjson", params=dict(params, labels="true"))
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"itemId": pos * 3, "label": f"{pos * 3}-c{pos:03}"} for pos in range(19, 9, -1)]
+    engine.dispose()
+
+
+def test_hedged_paginator_hedges_slow_replica(tmp_path):
+    import time
+    from concurrent.futures import CancelledError, Future
+    from sqlalchemy.orm import Session
+    from fastapi_listing.paginator.hedged import HedgedPaginationStrategy, LatencyTracker, _Attempt
+    from fastapi_listing.replicas import ReplicaSet, latency_injected
+
+    engine, Item = _sqlite_items(tmp_path, 10)
+    replica_set = ReplicaSet([latency_injected(lambda: Session(engine), 1.0), lambda: Session(engine)])
+    slow, fast = replica_set.replicas
+
+    class Paginator(HedgedPaginationStrategy):
+        initial_hedge_delay = 0.05
+
+    Paginator.replica_set = replica_set
+    with Session(engine) as session:
+        started = time.monotonic()
+        rows = Paginator().get_data(session.query(Item.code).filter(Item.id > 20).order_by(Item.id))
+    # slow replica got the statement first, hedge on the fast one answered well before it
+    assert [tuple(row) for row in rows] == [("c007",), ("c008",), ("c009",), ("c010",)]
+    assert time.monotonic() - started < 0.8
+    deadline = time.monotonic() + 5
+    while (slow.outstanding or fast.outstanding) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert slow.outstanding == fast.outstanding == 0 and slow.consecutive_failures == 0
+
+    # cancelled while its connection was being checked out, statement never runs
+    replica, attempt_session = replica_set.acquire()
+    attempt = _Attempt(replica_set, replica, attempt_session)
+    attempt.future = Future()
+    attempt.future.set_running_or_notify_cancel()
+    attempt.cancel()
+    executed = []
+    with pytest.raises(CancelledError):
+        attempt.run(attempt_session.query(Item), executed.append, LatencyTracker())
+    assert not executed and replica.outstanding == 0 and replica.consecutive_failures == 0
+    engine.dispose()
+
+
+def test_http_cache_etag_per_representation(tmp_path):
+    from sqlalchemy.orm import Session
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.conditional import HttpCachePolicy
+    from fastapi_listing.encoders import ColumnarJsonPageEncoder, FastJsonPageEncoder, NegotiatingPageEncoder
+
+    engine, Item = _sqlite_items(tmp_path, 5)
+    ItemDao, ItemOut = _item_listing(Item)
+    policy = HttpCachePolicy()
+    encoder = NegotiatingPageEncoder({ColumnarJsonPageEncoder.media_type: ColumnarJsonPageEncoder()},
+                                     default=FastJsonPageEncoder())
+
+    def get_response(accept, etag=None):
+        headers = [(b"accept", accept.encode())] + ([(b"if-none-match", etag.encode())] if etag else [])
+        request = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+        with Session(engine) as session:
+            return FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut,
+                                  response=Response()).get_response(
+                MetaInfo(default_srt_on="items.id", http_cache=policy, page_encoder=encoder))
+
+    json_etag = get_response("application/json").headers["etag"]
+    columnar = get_response(ColumnarJsonPageEncoder.media_type)
+    assert columnar.status_code == 200 and columnar.headers["etag"] != json_etag
+    # client's json copy doesn't validate a columnar one
+    assert get_response(ColumnarJsonPageEncoder.media_type, json_etag).status_code == 200
+    not_modified = get_response(ColumnarJsonPageEncoder.media_type, columnar.headers["etag"])
+    assert not_modified.status_code == 304
+    assert not_modified.headers["vary"] == columnar.headers["vary"] == "Accept"
+    assert get_response("application/json", json_etag).status_code == 304
+    engine.dispose()
+
+
+def test_http_cache_default_validator_without_updated_at(tmp_path):
+    from sqlalchemy import create_engine, Column, Integer, String
+    from sqlalchemy.orm import declarative_base, Session
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache.generations import model_generations
+    from fastapi_listing.conditional import HttpCachePolicy
+    from fastapi_listing.dao import GenericDao
+    from pydantic import BaseModel
+
+    Base = declarative_base()
+
+    class Tag(Base):
+        __tablename__ = "tags"
+        id = Column(Integer, primary_key=True)
+        name = Column(String(10))
+
+    class TagDao(GenericDao):
+        name = "tags"
+        model = Tag
+
+    class TagOut(BaseModel):
+        id: int
+        name: str
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    policy = HttpCachePolicy()
+
+    def get_response(etag=None):
+        headers = [(b"if-none-match", etag.encode())] if etag else []
+        request = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+        response = Response()
+        with Session(engine) as session:
+            page = FastapiListing(request, TagDao(read_db=session), pydantic_serializer=TagOut,
+                                  response=response).get_response(
+                MetaInfo(default_srt_on="tags.id", http_cache=policy))
+        return page, response.headers.get("etag")
+
+    # no updated_at column to aggregate, the page is validated by dao write generations
+    page, etag = get_response()
+    assert page["totalCount"] == 0 and etag
+    assert get_response(etag)[0].status_code == 304
+    model_generations.bump(Tag)
+    assert get_response(etag)[1] != etag
+    engine.dispose()
+
+
+def test_arrow_page_encoder():
+    pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import json
+    from fastapi_listing.encoders import ArrowPageEncoder
+
+    rows = [type("Row", (), {"_mapping": {"id": pos, "extra": extra}})() for pos, extra in
+            enumerate([1, "a", {"k": [1]}, None], start=1)]
+    listing = type("Listing", (), {"pydantic_serializer": None, "response": None, "request": None,
+                                   "fields_to_fetch": ["id", "extra"]})()
+    response = ArrowPageEncoder().encode(listing, {"hasNext": False, "totalCount": 4, "data": rows})
+    assert response.media_type == ArrowPageEncoder.media_type
+    table = pyarrow.ipc.open_stream(response.body).read_all()
+    assert json.loads(table.schema.metadata[ArrowPageEncoder.metadata_key]) == {"hasNext": False, "totalCount": 4}
+    assert table.column("id").to_pylist() == [1, 2, 3, 4]
+    # mixed value types can't make a typed arrow column, they go out json encoded instead of failing the request
+    assert table.column("extra").to_pylist() == ["1", "a", '{"k":[1]}', None]
+    empty = ArrowPageEncoder().encode(listing, {"hasNext": False, "totalCount": 0, "data": []})
+    assert pyarrow.ipc.open_stream(empty.body).read_all().column_names == ["id", "extra"]
+
+
+def test_page_size_warning_points_at_caller(tmp_path):
+    import asyncio
+    import json
+    from urllib.parse import urlencode
+    from sqlalchemy.orm import Session
+    from starlette.requests import Request
+    from fastapi_listing import FastapiListing, MetaInfo
+    from fastapi_listing.cache import ListingResponseCache
+    from fastapi_listing.errors import FastAPIListingWarning
+    from fastapi_listing.singleflight import SingleFlight
+
+    engine, Item = _sqlite_items(tmp_path, 5)
+    ItemDao, ItemOut = _item_listing(Item)
+    pagination = {"page": 1, "pageSize": 20}
+    meta = dict(default_srt_on="items.id", max_page_size=3)
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps({"pagination": pagination}).encode(), "more_body": False}
+
+    with Session(engine) as session:
+        def listing(request=None):
+            request = request or _listing_request(urlencode({"pagination": json.dumps(pagination)}))
+            return FastapiListing(request, ItemDao(read_db=session), pydantic_serializer=ItemOut)
+
+        cached = MetaInfo(**meta, response_cache=ListingResponseCache(), single_flight=SingleFlight())
+        # built page, then a cache hit, both blame the line calling get_response
+        for _ in range(2):
+            with pytest.warns(FastAPIListingWarning) as record:
+                page = listing().get_response(cached)
+            assert record[0].filename == __file__ and len(page["data"]) == 3
+        # awaited from a route coroutine, like an async endpoint would
+        async def route():
+            return await listing().aget_response(MetaInfo(**meta))
+
+        async def body_route(request):
+            return await listing(request).aget_body_response(MetaInfo(**meta))
+
+        with pytest.warns(FastAPIListingWarning) as record:
+            asyncio.run(route())
+        assert record[0].filename == __file__
+        body_request = Request({"type": "http", "method": "POST", "path": "/", "query_string": b"",
+                                "headers": [(b"content-type", b"application/json")]}, receive)
+        with pytest.warns(FastAPIListingWarning) as record:
+            asyncio.run(body_route(body_request))
+        assert record[0].filename == __file__
+    engine.dispose()
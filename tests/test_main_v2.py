@@ -170,6 +170,15 @@ def test_custom_serializer_field():
     assert response.json() == original_responses.test_employee_listing_with_custom_field
 
 
+def test_count_opt_out_ignored_on_listing_page():
+    # default paginator doesn't allow skipping count, ListingPage routes keep their declared page shape
+    response = client.get("/v1/employees", params={
+        "pagination": get_url_quoted_string({"pageSize": 1, "page": 1, "count": False})
+    })
+    assert response.status_code == 200
+    assert response.json()["totalCount"] == original_responses.test_default_employee_listing["totalCount"]
+
+
 def test_sorting_on_default_listing():
     response = client.get("/v1/employees", params={
         "sort": get_url_quoted_string([{"field": "cd", "type": "asc"}])